@@ -6,6 +6,7 @@ psuedo nodes."""
 import os
 import sys
 import arcpy
+from stage_timing import StageLog, timed
 
 class BfeCheck:
     """This script is designed to find errors with BFE lines.  It will find errors where the BFE is
@@ -16,6 +17,7 @@ class BfeCheck:
         """Constructor for the class"""
         self.workspace = workspace  # Data location
         self.output_folder = output_folder  # Output folder
+        self.stage_log = StageLog('BfeCheck', output_folder, workspace=workspace)  # Stage times
         self.extension = ""  # Entension used if the input are shapefiles
         self.linear_unit = linear_unit  # Linear snap distance
 
@@ -50,6 +52,7 @@ class BfeCheck:
             arcpy.AddError("An Advanced License is need to run this tool.")
             sys.exit(1)
 
+    @timed()
     def make_feature_layers(self):
         """Makes the required feature layers for processing"""
         # BFEs
@@ -79,6 +82,7 @@ class BfeCheck:
         self.political_poly_layer = arcpy.MakeFeatureLayer_management(
             self.dataset + 'S_POL_AR' + self.extension, 'political_poly_layer')
 
+    @timed()
     def check_missing_empty_tables(self):
         """Check for empty or missing tables"""
 
@@ -127,6 +131,7 @@ class BfeCheck:
         if error:
             sys.exit(1)
 
+    @timed()
     def remove_temporary_layers(self):
         """Remove the feature layers that were created"""
         if self.bfe_layer:
@@ -152,6 +157,7 @@ class BfeCheck:
         if arcpy.Exists(self.output_folder + os.sep + 'political_lines_dissolved.shp'):
             arcpy.Delete_management(self.output_folder + os.sep + 'political_lines_dissolved.shp')
 
+    @timed()
     def bfe_endpoint_check(self):
         """Checks if the end points of the bfe are snapped to appropriate lines"""
         # Convert BFE vertices to points
@@ -210,6 +216,7 @@ class BfeCheck:
         # Update spatial index
         arcpy.AddSpatialIndex_management(self.bfe_point_error_shapefile)
 
+    @timed()
     def bfe_static_area_check(self):
         """Checks to see if the bfe is crossing the wrong flood zone such as static flood zones"""
         arcpy.SelectLayerByLocation_management(
@@ -251,6 +258,7 @@ class BfeCheck:
 
         arcpy.Delete_management(political_polys_dissolved)
 
+    @timed()
     def delete_empty_error_files(self):
         """Removes the empty error files"""
         if arcpy.Exists(self.bfe_point_error_shapefile):
@@ -290,6 +298,7 @@ if __name__ == "__main__":
 
     finally:
         bfe_check.remove_temporary_layers()
+        bfe_check.stage_log.close()
 
 
 
@@ -0,0 +1,13 @@
+"""Process pools for the tools that run their jobs in worker processes.  Has no arcpy dependency."""
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+def worker_pool(max_workers):
+    """Returns a pool of worker processes.  ArcGIS Pro runs script tools inside its own executable, so
+    the workers are started with the Python interpreter that ships with it."""
+    if not os.path.basename(sys.executable).lower().startswith('python'):
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, 'pythonw.exe'))
+    return ProcessPoolExecutor(max_workers=max_workers)
@@ -1,13 +1,104 @@
 ﻿"""Updates the NULL values to match FEMA specs"""
 import arcpy
+import csv
+import json
 import os
+import socket
 import sys
+import time
+from array import array
+from concurrent.futures import as_completed
+from arc_workers import worker_pool
+from null_rules import NullRulePlan
+from stage_timing import StageLog, timed
+
+import dbf_tools
+
+# Without NumPy, shapefiles are filled with a cursor
+fill_dbf_nulls = dbf_tools.fill_dbf_nulls if dbf_tools.np is not None else None
+
+
+class NullChangeSet:
+    """The cells of one table that need a new NULL value.  Only the changed cells are kept, as an
+    array of OIDs per field for each (old value, new value) pair, so memory follows the number
+    of edits rather than the size of the table."""
+
+    def __init__(self, table, oid_field):
+        self.table = table  # Table path
+        self.oid_field = oid_field  # OBJECTID or FID
+        self.fields = {}  # Field name -> {(old value, new value): array of OIDs}
+        self.values = {}  # Interned old and new values
+
+        self.input_features = 0  # Rows read
+        self.update_features = 0  # Cells changed
+        self.fema_field_count = 0  # Applicable cells read
+        self.other_fields = 0  # Required cells read
+
+    def __len__(self):
+        return self.update_features
+
+    def add(self, field_name, oid, old_value, new_value):
+        """Records a cell that changes from the old value to the new value"""
+        change = (self.values.setdefault(old_value, old_value), self.values.setdefault(new_value, new_value))
+        field_changes = self.fields.setdefault(field_name, {})
+        if change not in field_changes:
+            field_changes[change] = array('q')
+        field_changes[change].append(oid)
+        self.update_features += 1
+
+    def field_names(self):
+        """Names of the fields with at least one change"""
+        return list(self.fields)
+
+    def row_updates(self):
+        """Returns a dictionary of OID -> {field name: new value} for the changed rows"""
+        updates = {}
+        for field_name, field_changes in self.fields.items():
+            for (old_value, new_value), oids in field_changes.items():
+                for oid in oids:
+                    updates.setdefault(oid, {})[field_name] = new_value
+        return updates
+
+
+class NullAuditWriter:
+    """Streams every NULL change to a CSV file as it is found, plus a summary row per table.  Nothing
+    is held in memory, so the audit of a run can be any size.  Text values are quoted and NULL values
+    are left empty, so an empty string and a NULL can be told apart when runs are diffed."""
+
+    def __init__(self, folder):
+        self.changes_path = os.path.join(folder, 'NULL_Changes.csv')
+        self.summary_path = os.path.join(folder, 'NULL_Summary.csv')
+        self.changes_file = open(self.changes_path, 'w', newline='')
+        self.summary_file = open(self.summary_path, 'w', newline='')
+        self.changes = csv.writer(self.changes_file, quoting=csv.QUOTE_NONNUMERIC)
+        self.summary = csv.writer(self.summary_file, quoting=csv.QUOTE_NONNUMERIC)
+        self.changes.writerow(['Table', 'Field', 'OID', 'Old Value', 'New Value'])
+        self.summary.writerow(['Table', 'Input Features', 'FEMA Field Count', 'Other Fields', 'Update Count'])
+
+    def change(self, table, field_name, oid, old_value, new_value):
+        """Writes one changed cell"""
+        self.changes.writerow([table, field_name, oid, old_value, new_value])
+
+    def field_changes(self, table, field_name, oids, old_value, new_value):
+        """Writes the changes of one field for many OIDs"""
+        self.changes.writerows([table, field_name, int(oid), old_value, new_value] for oid in oids)
+
+    def table_summary(self, table, input_features, fema_field_count, other_fields, update_count):
+        """Writes the summary row of a table"""
+        self.summary.writerow([table, input_features, fema_field_count, other_fields, update_count])
+
+    def close(self):
+        self.changes_file.close()
+        self.summary_file.close()
+        arcpy.AddMessage(f'Audit: {self.changes_path}, {self.summary_path}')
 
 
 class CalculateNull:
-    def __init__(self, tables=None):
-        """Constructor.  Expects a workspace."""
+    def __init__(self, tables=None, audit_folder=None, stage_log=None):
+        """Constructor.  Expects a workspace.  Writes an audit of the changes when given a folder."""
         self.tables = tables  # List of tables to update
+        self.audit = NullAuditWriter(audit_folder) if audit_folder else None
+        self.stage_log = stage_log or StageLog('CalculateNull')  # Stage times, only printed without a log
 
         # A list of fields the script can skip because they can't be updated
         self.skip_fields = ["OBJECTID", "SHAPE", "SHAPE_Length", "SHAPE_Area", "X_SCALE"]
@@ -100,6 +191,7 @@ class CalculateNull:
                             "L_Source_Cit", "L_Summary_Discharges", "L_Summary_Elevations", "L_Survey_Pt", "L_XS_Elev",
                             "L_XS_Struct"]
 
+    @timed(rows=lambda self, result: len(self.tables))
     def input_type(self):
 
         table_types = {}
@@ -112,155 +204,182 @@ class CalculateNull:
 
         self.table_types = table_types
 
+    def rule_plan(self, table_name, field_list):
+        """Compiles the NULL rules of the table's fields, in cursor order"""
+        return NullRulePlan(field_list, self.app_Dict[table_name], self.skip_fields)
+
+    @timed(rows=lambda self, result: sum(changes.input_features for changes in self.table_records.values()))
     def find_tables_fields_values(self):
 
         table_records_temp = {}
         # Go through each table entered
         for table in self.tables:
-            desc = arcpy.Describe(str(table).replace("'", ""))  # Name of the table
+            table_path = str(table).replace("'", "")
+            desc = arcpy.Describe(table_path)  # Name of the table
             arcpy.AddMessage(desc.baseName)
 
             # If the name of the table is one of the tables in the iter_tables list
             if desc.baseName in self.iter_tables:
+                oid_field = 'OBJECTID' if self.table_types[table] == "GDB" else 'FID'
+                changes = NullChangeSet(table, oid_field)
                 record_count = 0
                 record_updates = 0
                 relevant_fields = 0
                 non_fema_fields = 0
 
-                # Get a list of fields
-                field_list = arcpy.ListFields(str(table).replace("'", ""))
+                # Get the fields that can take a NULL value, the same as the single-pass modes
+                field_list = self.null_fields(table_path)
                 f_str_list = [f.name for f in field_list]
-                existing_fields_dict = {}
-                for i, fname in enumerate(f_str_list):
-                    existing_fields_dict[fname] = i
-                arcpy.AddMessage(f' Existing Fields: {existing_fields_dict}')
-
-                # Go through each row in the table
-                # Create an update cursor
-                cursor = arcpy.da.SearchCursor(str(table).replace("'", ""), f_str_list)
+                arcpy.AddMessage(f' Existing Fields: {len(f_str_list)}')
+                plan = self.rule_plan(desc.baseName, field_list)
+
+                # Go through each row in the table.  The OID is read last so the field indexes of
+                # the plan still line up.
+                cursor = arcpy.da.SearchCursor(table_path, f_str_list + ['OID@'])
                 for row in cursor:
                     record_count += 1
-                    if self.table_types[table] == "GDB":
-                        oid = row[existing_fields_dict['OBJECTID']]
-                    else:
-                        oid = row[existing_fields_dict['FID']]
-                    for field in field_list:
-                        update = True
-                        value = row[existing_fields_dict[field.name]]  # Value of the current field in the current row
-                        # If it's an applicable field and not in the skip fields list
-                        if field.name in self.app_Dict[desc.baseName] and field.name not in self.skip_fields:
-                            relevant_fields += 1
-                            correct_nulls = (None, "9/9/9999", '-9999')
-                            if field.type == 'String' and value in ["", " ", None]:
-                                if value not in correct_nulls:
-                                    record_updates += 1
-                                    new_value = None
-                                else:
-                                    new_value = value
-                            elif field.type == 'Date' and value in ["", " ", None]:
-                                if value not in correct_nulls:
-                                    record_updates += 1
-                                    new_value = "9/9/9999"
-                                else:
-                                    new_value = value
-                            elif field.type == 'Double' and value in ["", " ", None]:
-                                if value not in correct_nulls:
-                                    record_updates += 1
-                                    new_value = '-9999'
-                                else:
-                                    new_value = value
-                            else:
-                                new_value = value
-                                update = False
-                        # If it's a required field and not in the skip fields list
-                        elif field.name not in self.skip_fields:
-                            non_fema_fields += 1
-                            correct_nulls = ('U', "8/8/8888", '-8888', "NP", -8888)
-                            if field.type == 'String' and value in ["", " ", None]:
-                                if value not in correct_nulls:
-                                    record_updates += 1
-                                    if field.length == 1:  # True/false fields
-                                        new_value = "U"
-                                    else:
-                                        new_value = "NP"
-                                else:
-                                    new_value = value
-                            elif field.type == 'Date' and value in ["", " ", None]:
-                                if value not in correct_nulls:
-                                    record_updates += 1
-                                    new_value = "8/8/8888"
-                                else:
-                                    new_value = value
-                            elif field.type == 'Double' and value in ["", " ", None]:
-                                if value not in correct_nulls:
-                                    record_updates += 1
-                                    new_value = '-8888'
-                                else:
-                                    new_value = value
-                            else:
-                                new_value = value
-                                update = False
-                        else:
-                            update = False
-                            new_value = value
-
-                        if table not in table_records_temp:
-                            table_records_temp[table] = {}
-                        if field.name not in table_records_temp[table]:
-                            table_records_temp[table][field.name] = {}
-                        if oid not in table_records_temp[table][field.name]:
-                            table_records_temp[table][field.name][oid] = {}
-                        table_records_temp[table][field.name][oid] = {'Update': update,
-                                                                      'Old Value': value, 'New Value': new_value}
+                    oid = row[-1]
+                    relevant_fields += plan.applicable_count
+                    non_fema_fields += plan.required_count
+
+                    # Only keep the cells that change
+                    for i, value, new_value in plan.changes(row):
+                        record_updates += 1
+                        changes.add(f_str_list[i], oid, value, new_value)
+                        if self.audit:
+                            self.audit.change(table, f_str_list[i], oid, value, new_value)
                 del cursor
-                if table not in table_records_temp:
-                    table_records_temp[table] = {}
-                table_records_temp[table]['Update Features'] = record_updates
+                if self.audit:
+                    self.audit.table_summary(table, record_count, relevant_fields, non_fema_fields, record_updates)
                 arcpy.AddMessage(f'{table}:\n  - {record_updates}')
-                table_records_temp[table]['Input Features'] = record_count
-                table_records_temp[table]['FEMA Field Count'] = relevant_fields
-                table_records_temp[table]['Other Fields'] = non_fema_fields
+                changes.input_features = record_count
+                changes.fema_field_count = relevant_fields
+                changes.other_fields = non_fema_fields
+                table_records_temp[table] = changes
         self.table_records = table_records_temp
 
+    @timed()
     def update_nulls(self):
 
-        non_field_entries = ['Update Features', 'Input Features', 'FEMA Field Count', 'Other Fields']
         for table in self.tables:
-            number_updates = self.table_records[table]['Update Features']
-            if number_updates > 0:
-                desc = arcpy.Describe(str(table).replace("'", ""))  # Name of the table
+            changes = self.table_records.get(table)
+            if changes:
                 # Start an edit session
                 # with arcpy.da.Editor(CalculateNull.get_geodatabase_path(desc.path)):
-                table_dictionary = self.table_records[table]
-                update_fields = []
-                for key, dict_values in table_dictionary.items():
-                    if key not in non_field_entries:
-                        update_fields.append(key)
-
-                row_dict = {}
-                field_lookup = {}
-                for i, fname in enumerate(update_fields):
-                    row_dict[i] = fname
-                    field_lookup[fname] = i
-                arcpy.AddMessage(f'Row Dict: {row_dict}')
-                arcpy.AddMessage(f'Field Lookup: {field_lookup}')
+                update_fields = [changes.oid_field] + changes.field_names()
+                row_updates = changes.row_updates()
+                arcpy.AddMessage(f'Update Fields: {update_fields}')
                 with arcpy.da.UpdateCursor(table, update_fields) as update_cursor:
-                    for i in range(len(update_fields)):
-                        fname = row_dict[i]
-                        for urow in update_cursor:
-                            if self.table_types[table] == "GDB":
-                                oid = urow[field_lookup['OBJECTID']]
-                            else:
-                                oid = urow[field_lookup['FID']]
-                            if self.table_records[table][fname][oid]['Update']:
-                                new_value = self.table_records[table][oid]['New Value']
-
-                                row.setValue(fname, new_value)
+                    for urow in update_cursor:
+                        new_values = row_updates.get(urow[0])
+                        if new_values:
+                            for i, fname in enumerate(update_fields[1:], 1):
+                                if fname in new_values:
+                                    urow[i] = new_values[fname]
 
                             # Update the row
                             update_cursor.updateRow(urow)
                 del update_cursor
 
+    def find_workspace_tables(self, workspace):
+        """Returns the paths of the FIRM tables in a geodatabase or shapefile folder"""
+        arcpy.env.workspace = workspace
+        names = []
+        for dataset in arcpy.ListDatasets("*", "Feature") or []:
+            names += [os.path.join(dataset, fc) for fc in arcpy.ListFeatureClasses("*", "ALL", dataset)]
+        names += arcpy.ListFeatureClasses() or []
+        names += arcpy.ListTables() or []
+
+        tables = []
+        for name in names:
+            base_name = os.path.splitext(os.path.basename(name))[0]
+            if base_name in self.iter_tables:
+                tables.append(os.path.join(workspace, name))
+        return sorted(set(tables))
+
+    def null_fields(self, table_path):
+        """The fields of a table that can take a NULL value"""
+        return [f for f in arcpy.ListFields(table_path) if f.name not in self.skip_fields and
+                f.type not in ('OID', 'Geometry', 'Blob', 'Raster', 'GlobalID')]
+
+    def cursor_fill(self, table_path, field_list, plan, dry_run=False):
+        """Finds and writes the NULL values of a table with a single update cursor pass.  Returns
+        the record count and the number of values changed per field."""
+        field_changes = dict((field.name, 0) for field in field_list)
+        record_count = 0
+
+        # The OID is read last so the field indexes of the plan still line up
+        cursor_fields = [f.name for f in field_list] + ['OID@']
+        if dry_run:
+            cursor = arcpy.da.SearchCursor(table_path, cursor_fields)
+        else:
+            cursor = arcpy.da.UpdateCursor(table_path, cursor_fields)
+        with cursor:
+            for row in cursor:
+                record_count += 1
+                row_changes = plan.changes(row)
+                for i, value, new_value in row_changes:
+                    field_changes[field_list[i].name] += 1
+                    if self.audit:
+                        self.audit.change(table_path, field_list[i].name, row[-1], value, new_value)
+
+                # Update the row
+                if row_changes and not dry_run:
+                    row = list(row)
+                    for i, value, new_value in row_changes:
+                        row[i] = new_value
+                    cursor.updateRow(row)
+
+        return record_count, field_changes
+
+    @timed(rows=lambda self, result: sum(table_result['Rows'] for table_result in result))
+    def scan_and_update(self, dry_run=False):
+        """Finds and writes the NULL values in a single pass per table.  Shapefile tables are filled
+        in their .dbf with NumPy when it's available, other tables with an update cursor.  With
+        dry_run only the change report is written and the tables are left as they are.  Returns
+        the rows read, values changed and changes per field of each table."""
+        self.input_type()
+        results = []
+        for table in self.tables:
+            table_path = str(table).replace("'", "")
+            desc = arcpy.Describe(table_path)  # Name of the table
+            if desc.baseName not in self.iter_tables:
+                continue
+
+            field_list = self.null_fields(table_path)
+            plan = self.rule_plan(desc.baseName, field_list)
+            engine = 'dbf' if fill_dbf_nulls and self.table_types.get(table) == "SHP" else 'cursor'
+            with self.stage_log.stage('table', table=desc.baseName, engine=engine) as record:
+                if engine == 'dbf':
+                    # Shapefiles are filled directly in their .dbf without a cursor.  The FID of a
+                    # shapefile is its record number.
+                    dbf_path = os.path.splitext(desc.catalogPath)[0] + '.dbf'
+                    audit_changes = None
+                    if self.audit:
+                        def audit_changes(field_name, record_numbers, old_value, new_value):
+                            self.audit.field_changes(table_path, field_name, record_numbers, old_value, new_value)
+                    record_count, field_changes = fill_dbf_nulls(dbf_path, plan, [f.name for f in field_list],
+                                                                 dry_run, audit_changes)
+                else:
+                    record_count, field_changes = self.cursor_fill(table_path, field_list, plan, dry_run)
+                record_updates = sum(field_changes.values())
+                record['rows'] = record_count
+                record['updates'] = record_updates
+            if self.audit:
+                self.audit.table_summary(table_path, record_count, plan.applicable_count * record_count,
+                                         plan.required_count * record_count, record_updates)
+
+            # Change report
+            action = 'Would update' if dry_run else 'Updated'
+            arcpy.AddMessage(f'{desc.baseName}: {action} {record_updates} values in {record_count} rows')
+            for field_name, count in field_changes.items():
+                if count:
+                    arcpy.AddMessage(f'  - {field_name}: {count}')
+            results.append({'Table': desc.baseName, 'Rows': record_count, 'Updates': record_updates,
+                            'Fields': dict((name, count) for name, count in field_changes.items() if count)})
+
+        return results
+
     @staticmethod
     def get_geodatabase_path(input_table):
         """Return the Geodatabase path from the input table or feature class.
@@ -272,23 +391,216 @@ class CalculateNull:
         else:
             return os.path.dirname(workspace)
 
-    def run_calcnull(self):
+    @timed()
+    def run_calcnull(self, fused=False, dry_run=False):
 
         arcpy.AddMessage('Starting to iterate through tables...')
-        self.input_type()
-        self.find_tables_fields_values()
-        arcpy.AddMessage(f'Finished finding stuff in {len(self.tables)} tables')
+        try:
+            if fused or dry_run:
+                # Find and write the NULL values in one pass per table
+                self.scan_and_update(dry_run)
+                arcpy.AddMessage(f'Finished {"checking" if dry_run else "updating"} tables')
+                return
+
+            self.input_type()
+            self.find_tables_fields_values()
+            arcpy.AddMessage(f'Finished finding stuff in {len(self.tables)} tables')
+
+            for table, changes in self.table_records.items():
+                if changes.update_features > 0:
+                    arcpy.AddMessage(f"{table}:\n  - Updates: {changes.update_features}")
+
+            self.update_nulls()
+            arcpy.AddMessage(f'Finished updating tables')
+        finally:
+            # Keep the audit of the tables finished so far, even if a table fails
+            if self.audit:
+                self.audit.close()
+
+
+def process_running(pid):
+    """Tells if a process of this machine is still running"""
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # Running as another user
+        return True
+    return True
+
+
+def lock_owner(lock_path):
+    """Returns the owner of a workspace lock file as {'pid', 'host', 'started'}, or None if it can't
+    be read"""
+    try:
+        with open(lock_path) as lock_file:
+            return json.load(lock_file)
+    except (OSError, ValueError):
+        return None
+
+
+def lock_is_stale(lock_path, owner):
+    """Tells if a lock file was left by a process that's no longer running.  A lock without an owner
+    is only stale after a minute, as its owner may still be writing it.  The process of a lock taken on
+    another machine can't be checked, so that lock is never stale."""
+    if owner is None:
+        try:
+            return time.time() - os.path.getmtime(lock_path) > 60
+        except OSError:
+            return True
+    return owner.get('host') == socket.gethostname() and not process_running(owner.get('pid', 0))
+
+
+def acquire_lock(lock_path):
+    """Creates the lock file of a workspace with the PID, host and start time of this process.  A
+    stale lock is moved aside before it's replaced, so when two runs find the same stale lock only the
+    one that moves it takes over.  Returns the file handle, or None and the owner when another process
+    holds the lock."""
+    for attempt in range(2):
+        try:
+            lock_handle = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            owner = lock_owner(lock_path)
+            if attempt or not lock_is_stale(lock_path, owner):
+                return None, owner
+            stale_path = f'{lock_path}.{os.getpid()}.stale'
+            try:
+                os.rename(lock_path, stale_path)
+            except OSError:  # Moved aside by another process first
+                return None, lock_owner(lock_path)
+            if lock_owner(stale_path) != owner:
+                # Another process replaced the stale lock between the checks, so its lock is put back
+                try:
+                    os.rename(stale_path, lock_path)
+                except OSError:
+                    pass
+                return None, lock_owner(lock_path)
+            arcpy.AddWarning(f'Removed the stale lock {lock_path} of {owner}')
+            os.remove(stale_path)
+            continue
+        owner = {'pid': os.getpid(), 'host': socket.gethostname(), 'started': time.time()}
+        os.write(lock_handle, json.dumps(owner).encode())
+        return lock_handle, owner
+    return None, None
+
+
+def calc_null_workspace(workspace, dry_run=False, audit_folder=None):
+    """Runs the single-pass NULL calculation on every FIRM table in a workspace.  The workspace is
+    locked with a lock file next to it for the whole run, so two writers never work in the same
+    geodatabase, even from separate batch runs.  The lock holds the PID of its process, so a lock left
+    by a crashed run is replaced.  Writes an audit of the changes when given a folder.  Returns the
+    workspace, the table results and a status."""
+    lock_path = f"{os.path.normpath(workspace)}.calcnull.lock"
+    lock_handle, owner = acquire_lock(lock_path)
+    if lock_handle is None:
+        if owner:
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(owner.get('started', 0)))
+            return workspace, [], (f"Skipped: locked by {lock_path} (PID {owner.get('pid')} on {owner.get('host')} "
+                                   f"since {started}).  Delete the lock if that run is gone.")
+        return workspace, [], f'Skipped: locked by {lock_path}'
+
+    calc_null = None
+    try:
+        if audit_folder:
+            os.makedirs(audit_folder, exist_ok=True)
+        calc_null = CalculateNull(audit_folder=audit_folder)
+        calc_null.tables = calc_null.find_workspace_tables(workspace)
+        return workspace, calc_null.scan_and_update(dry_run), 'OK'
+    except Exception as e:
+        return workspace, [], f'Failed: {e}'
+    finally:
+        if calc_null and calc_null.audit:
+            calc_null.audit.close()
+        os.close(lock_handle)
+        os.remove(lock_path)
+
+
+def run_batch(workspaces, report_path, workers=1, dry_run=False, audit_folder=None):
+    """Runs the NULL calculation over many workspaces.  Each workspace is one job, so its tables
+    are written by a single worker while separate workspaces run in parallel.  Writes a CSV
+    report of the updates per table.  With an audit folder, each workspace writes its audit to a
+    subfolder named after it."""
+    # Drop repeated workspaces so the same geodatabase is never queued twice
+    workspaces = sorted(set(os.path.normpath(workspace) for workspace in workspaces))
+
+    # One audit subfolder per workspace.  Workspaces with the same name get a number.
+    audit_folders = {}
+    if audit_folder:
+        for workspace in workspaces:
+            name = os.path.splitext(os.path.basename(workspace))[0]
+            folder = os.path.join(audit_folder, name)
+            number = 1
+            while folder in audit_folders.values():
+                number += 1
+                folder = os.path.join(audit_folder, f'{name}_{number}')
+            audit_folders[workspace] = folder
+    workers = max(1, min(workers, len(workspaces)))
+    arcpy.AddMessage(f'Calculating NULLs in {len(workspaces)} workspaces with {workers} workers')
+    stage_log = StageLog('CalculateNull', os.path.dirname(os.path.abspath(report_path)), workers=workers)
+
+    results = []
+    with stage_log.stage('run_batch', workspaces=len(workspaces)) as batch_record:
+        if workers == 1:
+            for workspace in workspaces:
+                workspace, table_results, status = calc_null_workspace(workspace, dry_run,
+                                                                       audit_folders.get(workspace))
+                arcpy.AddMessage(f'{workspace}: {status}')
+                results.append((workspace, table_results, status))
+        else:
+            with worker_pool(workers) as executor:
+                futures = [executor.submit(calc_null_workspace, workspace, dry_run, audit_folders.get(workspace))
+                           for workspace in workspaces]
+                for future in as_completed(futures):
+                    workspace, table_results, status = future.result()
+                    arcpy.AddMessage(f'{workspace}: {status}')
+                    results.append((workspace, table_results, status))
+
+        batch_record['rows'] = sum(table_result['Rows'] for workspace, table_results, status in results
+                                   for table_result in table_results)
+    stage_log.close()
 
-        for table, dictionaries in self.table_records.items():
-            if dictionaries['Update Features'] > 0:
-                arcpy.AddMessage(f"{table}:\n  - Updates: {dictionaries['Update Features']}")
+    # Consolidated report of the updates per table
+    with open(report_path, 'w', newline='') as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(['Workspace', 'Table', 'Rows', 'Updates', 'Field Updates', 'Status'])
+        for workspace, table_results, status in sorted(results, key=lambda result: result[0]):
+            if not table_results:
+                writer.writerow([workspace, '', 0, 0, '', status])
+            for table_result in table_results:
+                field_updates = '; '.join(f'{name}: {count}' for name, count in table_result['Fields'].items())
+                writer.writerow([workspace, table_result['Table'], table_result['Rows'], table_result['Updates'],
+                                 field_updates, status])
 
-        self.update_nulls()
-        arcpy.AddMessage(f'Finished updating tables')
+    total_updates = sum(table_result['Updates'] for workspace, table_results, status in results
+                        for table_result in table_results)
+    arcpy.AddMessage(f'Finished {len(workspaces)} workspaces, {total_updates} updates.  Report: {report_path}')
+    return results
 
 
 if __name__ == '__main__':
     if sys.argv[1] and sys.argv[1] != '#':
         table_list = sorted(sys.argv[1].split(";"))
-        calc_null = CalculateNull(table_list)
-        calc_null.run_calcnull()
+        # Optional parameters.  They come as strings from ArcGIS and are a # when empty.
+        fused_pass = len(sys.argv) > 2 and sys.argv[2] in ['true', 'True']
+        dry_run_only = len(sys.argv) > 3 and sys.argv[3] in ['true', 'True']
+        audit = sys.argv[7] if len(sys.argv) > 7 and sys.argv[7] not in ['', '#'] else None
+        log_folder = os.path.dirname(CalculateNull.get_geodatabase_path(table_list[0].replace("'", "")))
+        calc_null = CalculateNull(table_list, audit, StageLog('CalculateNull', log_folder))
+        calc_null.run_calcnull(fused_pass, dry_run_only)
+        calc_null.stage_log.close()
+    elif len(sys.argv) > 5 and sys.argv[4] not in ['', '#']:
+        # Batch mode: a semicolon list of workspaces, the report file and the number of workers
+        dry_run_only = len(sys.argv) > 3 and sys.argv[3] in ['true', 'True']
+        worker_count = int(sys.argv[6]) if len(sys.argv) > 6 and sys.argv[6].isdigit() else 1
+        audit = sys.argv[7] if len(sys.argv) > 7 and sys.argv[7] not in ['', '#'] else None
+        run_batch(sys.argv[4].replace("'", "").split(";"), sys.argv[5], worker_count, dry_run_only, audit)
@@ -5,6 +5,7 @@ import sys
 import arcpy
 import string
 from arcpy.da import SearchCursor
+from concurrent.futures import as_completed
 
 try:
     import openpyxl
@@ -12,7 +13,17 @@ except ImportError:
     arcpy.AddError("Unable to import 'openpyxl'.  "
                    "Install 'openpyxl using PIP or contact the Software Developer.")
     sys.exit(1)
-from openpyxl.styles import Border, Side, PatternFill, Font, Alignment
+
+# The worker pool, DBF and stage timing modules are shared with the tools in the parent folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from arc_workers import worker_pool
+from dbf_tools import DbfField, write_dbf
+from stage_timing import StageLog, timed
+from qc_errors import ErrorSink
+from qc_excel import ErrorWorkbook, sheet_order
+from qc_indexes import CountingIndex, KeyIndexCache, SchemaCache
+from qc_rules import RuleRegistry, table_key
+from qc_table_scan import ColumnTable, StandardChecks, TableField, compile_domains
 
 # Contains dictionaries of the domains found in a standard FEMA DFIRM database.  The variable
 # name is the name of the domain.  The KEY is the coded value of the domain.  The VALUE is
@@ -849,15 +860,27 @@ Study_Info_domains = {
     'PROJ_UNIT': D_Proj_Unit, 'PROJ_SECND': D_Projection,
     'PROJ_SUNIT': D_Proj_Unit, 'PROJ_SZONE': D_Projzone,
     'CW_TF': D_TrueFalse, 'RTROFT_TF': D_TrueFalse}
+# Compile the domains into hash sets of their coded values and text values once at startup
+compile_domains([value for name, value in list(globals().items())
+                 if name.startswith('D_') and isinstance(value, dict)])
+
+# Fields of the DBF error tables
+ERROR_TABLE_FIELDS = [DbfField('Unique_ID', 'C', 25, 0), DbfField('Error', 'C', 254, 0),
+                      DbfField('Comment', 'C', 254, 0), DbfField('Response', 'C', 254, 0)]
+
+# QC rule of each table.  The check methods of QCChecks register themselves with their required
+# fields, the fields read by their specific checks, and the other tables they read.
+QC_RULES = RuleRegistry()
 
 
 class QCChecks:
     """Performs a QC check of the attributes of the database tables"""
 
     def __init__(self, in_workspace, in_folder, in_mip_task, in_schema, in_tables,
-                 in_coded_check, in_shp_export, in_excel_export):
+                 in_coded_check, in_shp_export, in_excel_export, in_workers=1):
         """Constructor: Receives the workspace, an output folder, the MIP task, schema, the tables
-           to check, and whether to check coded values or text values for the domain checks."""
+           to check, whether to check coded values or text values for the domain checks, and
+           the number of worker processes used to check the tables."""
         self.workspace = in_workspace  # Contains the feature classes and tables
         self.out_folder = in_folder  # The output folder to contain the error files
         self.mip_task = in_mip_task  # The MIP task to process
@@ -870,9 +893,12 @@ class QCChecks:
         self.dbf_ext = ''  # Extension for DBF tables if shapefiles are used
         self.shp_ext = ''  # Extension for Shapefiles if used
         self.dataset = ''  # Populated if a feature dataset is used
-        self.errors = []  # Hold the errors for the current table being processed
+        self.errors = ErrorSink()  # Hold the errors for the current table being processed
         self.total_errors = 0  # Total number of errors found
         self.missing_field = False  # Flag to determine if fields are missing
+        self.workers = 1  # Number of worker processes used to check the tables
+        self.error_workbook = None  # Excel file of the errors, open while the tables are checked
+        self.stage_log = StageLog('QCChecks', in_folder, workspace=in_workspace)  # Stage times
 
         # List of acceptable tables to check
         self.acceptable_tables = ['l_comm_info', 'l_comm_revis', 'l_cst_model', 'l_cst_struct',
@@ -893,6 +919,9 @@ class QCChecks:
         # Set the workspace
         arcpy.env.workspace = self.workspace
 
+        # Field descriptions of each table, read from the catalog once per run
+        self.schema_cache = SchemaCache(self.__list_fields)
+
         # Determine if shapefiles or databases are the workspace
         if not (in_workspace.lower().endswith('gdb') or in_workspace.lower().endswith('mdb')):
             self.dbf_ext = ".dbf"
@@ -946,53 +975,34 @@ class QCChecks:
         else:
             self.excel_export = False
 
-    def __applicable_null_checks(self, in_table, in_field, in_field_type, id_field):
-        """Checks for appropriate null values for applicable fields"""
-        # List to hold the unique id number and the error
-        error_list = []
-
-        # Check for missing fields
-        if in_field not in list(field.name for field in arcpy.ListFields(in_table)):
-            self.__printer(in_field + ' missing in ' + in_table, True)
-            return error_list
-
-        # Iterate through the rows
-        with SearchCursor(in_table, [id_field, in_field]) as cursor:
-            for row in cursor:
-                error_found = False  # Flag if error is found
-
-                # Check for an empty field
-                if in_field_type in ['Text', 'String']:
-                    if str(type(row[1])) == "<type 'str'>" and row[1] is not None:
-                        if row[1].isspace() and len(row[1]) > 1:
-                            error_found = True
-
-                # Check for correct NULL value for Numeric field types
-                if in_field_type in ['Double', 'Integer', 'SmallInteger']:
-                    if row[1] == -8888:  # Should be -9999 not -8888
-                        error_found = True
-                    elif row[1] is None:
-                        error_found = True
-
-                # Check for correct NULL value for Date field types
-                elif in_field_type == 'Date':
-                    if '8888' in str(row[1]):
-                        error_list.append(
-                            [str(row[0]), in_field + " value of 8/8/8888" +
-                             " is not an acceptable NULL value for applicable fields"])
-                    elif not row[1]:  # Date field is empty
-                        error_list.append([str(row[0]), in_field + " should not be NULL"])
-
-                    elif str(row[1]).strip() == '':  # Date field is empty
-                        error_list.append([str(row[0]), in_field + " should not be empty"])
-
-                # Append the error to the list if an error is found
-                if error_found:
-                    error_list.append([str(row[0]), in_field + " value of \"" + str(row[1]) +
-                                       "\" is not an acceptable NULL value for applicable fields"])
-
-        # Return the errors
-        return error_list
+        # Set the number of workers.  It comes as a string from ArcGIS and is empty (a #) for a
+        # serial run.
+        if str(in_workers).isdigit() and int(in_workers) > 1:
+            self.workers = min(int(in_workers), os.cpu_count() or 1)
+
+        # Standard checks run against the columns of each table
+        self.standard_checks = StandardChecks(self.dfirm_id, self.source_citations,
+                                              self.coded_check)
+
+        # Key values of the foreign tables, shared by the referential integrity checks
+        self.key_index = KeyIndexCache(self.__read_keys, self.__table_signature)
+
+    def __getstate__(self):
+        """Drops the caches and the errors when the instance is sent to a worker process"""
+        state = self.__dict__.copy()
+        del state['key_index']
+        del state['schema_cache']
+        state['errors'] = ErrorSink()
+        state['error_workbook'] = None
+        state['stage_log'] = None
+        return state
+
+    def __setstate__(self, state):
+        """Restores the instance in a worker process with its own caches and workspace"""
+        self.__dict__.update(state)
+        self.schema_cache = SchemaCache(self.__list_fields)
+        self.key_index = KeyIndexCache(self.__read_keys, self.__table_signature)
+        arcpy.env.workspace = self.workspace
 
     def __table_picker(self):
         """Determines which tables to process based on the MIP task"""
@@ -1059,57 +1069,31 @@ class QCChecks:
         elif self.mip_task == 'Survey Data Capture':
             self.task_tables = ['s_submittal_info', 'l_source_cit', 'l_survey_pt']
 
-    def __dfirm_id_check(self, in_table, id_field):
-        """Checks the DFIRM_ID against the DFIRM_ID in S_Submittal_Info"""
-        # List to hold the unique id number and the error
-        error_list = []
-
-        # Iterate through the rows
-        with SearchCursor(in_table, [id_field, 'DFIRM_ID']) as cursor:
-            for row in cursor:
-                if row[1] not in self.dfirm_id:
-                    error_list.append([str(row[0]), "DFIRM_ID value of \"" + str(row[1]) +
-                                       "\" does not match the DFIRM_ID value in S_Submittal_Info"])
-
-        # Return the errors
-        return error_list
-
-    def __domain_checks(self, in_table, field, domain_values, id_field, required_fields):
-        """Checks the domain values of the tables"""
-        # List to hold the unique id number and the error
-        error_list = []
-
-        # Iterate through the rows
-        with SearchCursor(in_table, [id_field, field]) as cursor:
-            for row in cursor:
-                # If checking coded values, get the keys from the dictionary
-                if self.coded_check:
-                    check_values = domain_values.keys()
-                # Else, if checking the text values, get the values from the dictionary
-                else:
-                    check_values = domain_values.values()
-                if row[1] not in check_values:
-                    # If it's a required field, it has to have a domain value.
-                    # It can't be empty or Null
-                    if field in required_fields:
-                        error_list.append(
-                            [str(row[0]),
-                             field + " value of \"" + str(row[1]) + "\" is not in domain"])
-
-                    # Else if it's an applicable field, it can be empty or Null
-                    elif not (str(row[1]).strip() != '' or row[1] != "None"):
-                        error_list.append(
-                            [str(row[0]),
-                             field + " value of \"" + str(row[1]) + "\" is not in domain"])
-
-        # Return the errors
-        return error_list
+    def __check_tables_parallel(self, table_paths):
+        """Checks the tables in a pool of worker processes.  Each table is checked by a copy of
+           this instance with its own error state.  The schema lookups of the workers are added
+           to the counters of this instance.  Returns a dictionary of the errors found for each
+           table path.  The errors of a table are all on disk by the time its worker returns, so
+           only the run file names are held here."""
+        self.__printer("Checking {} tables with {} worker processes".format(
+            len(table_paths), min(self.workers, len(table_paths))))
+
+        with worker_pool(min(self.workers, len(table_paths))) as executor:
+            futures = {executor.submit(self.check_table, table_path, True): table_path
+                       for table_path in table_paths}
+
+            table_errors = {}
+            for future in as_completed(futures):
+                errors, schema_counts = future.result()
+                self.schema_cache.add_counts(*schema_counts)
+                table_errors[futures[future]] = errors
+            return table_errors
 
     def __get_dfirm_id(self):
         """Gets the DFIRM_ID from the S_Submittal_Info table"""
         submittal_info = self.workspace + self.dataset + '\\S_Submittal_Info' + self.shp_ext
         if arcpy.Exists(submittal_info):
-            if 'DFIRM_ID' in [field.name for field in arcpy.ListFields(submittal_info)]:
+            if 'DFIRM_ID' in self.schema_cache.field_names(submittal_info):
                 dfirm_id_value = list(set([row[0] for row in SearchCursor(submittal_info,
                                                                           "DFIRM_ID")]))
 
@@ -1120,14 +1104,13 @@ class QCChecks:
         else:
             return ""
 
-    @staticmethod
-    def __get_field_dict(in_table, field_list):
+    def __get_field_dict(self, in_table, field_list):
         """Creates two dictionaries of required fields and applicable fields and their field types.
         The field_list parameter is a list of fields that are required for that table"""
         required_fields = {}
         applicable_fields = {}
 
-        for field in arcpy.ListFields(in_table):
+        for field in self.schema_cache.fields(in_table):
             # Skip these
             if field.name.lower() not in ['objectid', 'fid', 'shape', 'shape_length', 'shape_area']:
                 if field.name in field_list:  # Required fields
@@ -1146,7 +1129,7 @@ class QCChecks:
         table_fields = []
 
         # Get a list of the field names from the table
-        for field in arcpy.ListFields(in_table):
+        for field in self.schema_cache.fields(in_table):
             table_fields.append(field.name)
 
         # Check if the fields in field_list are in the table_fields list
@@ -1188,8 +1171,7 @@ class QCChecks:
                 v_datum = v_datum_list[0]
         return v_datum
 
-    @staticmethod
-    def __id_table_check(primary_table, primary_field, foreign_table,
+    def __id_table_check(self, primary_table, primary_field, foreign_table,
                          foreign_field, query="", error_message=""):
         """Checks if the all the values from the id field in the primary table have a
            matching value in the foreign table"""
@@ -1208,10 +1190,9 @@ class QCChecks:
         if len(primary_id_list) == 1 and primary_id_list[0] in ['None', '']:
             primary_id_list = []
 
-        # Get a list of unique values from the foreign table
+        # Get the set of unique values from the foreign table
         if arcpy.Exists(foreign_table):
-            foreign_id_list = sorted(list(set(
-                [str(row[0]) for row in SearchCursor(foreign_table, foreign_field)])))
+            foreign_id_list = self.key_index.keys(foreign_table, foreign_field)
 
             # Check for items in primary table are in foreign table
             for primary_id in primary_id_list:
@@ -1237,145 +1218,68 @@ class QCChecks:
             arcpy.AddMessage(in_message)
 
     @staticmethod
-    def __required_null_checks(in_table, in_field, in_field_type, id_field):
-        """Checks for appropriate null values for required fields"""
-        # List to hold the unique id number and the error
-        error_list = []
-
-        # Iterate through the rows
-        with SearchCursor(in_table, [id_field, in_field]) as cursor:
-            for row in cursor:
-                error_found = False  # Flag if error is found
-
-                # Check for an empty field
-                if in_field_type in ['Text', 'String']:
-                    if row[1] is None:
-                        error_found = True
-                    elif str(type(row[1])) in ["<type 'str'>", "<type 'unicode'>", "<class 'str'>"]:
-                        if row[1].isspace() or len(row[1]) == 0:
-                            error_found = True
-
-                elif in_field_type in ['Double', 'Integer', 'SmallInteger']:
-                    if row[1]:
-                        if row[1] == -9999:  # Should be -8888 not -9999
-                            error_found = True
-                    elif row[1] is None:
-                        error_found = True
-
-                elif in_field_type == 'Date':
-                    if '9999' in str(row[1]):  # Should be 8/8/8888 not 9/9/9999
-                        error_list.append([str(row[0]), in_field + " value of 9/9/9999" +
-                                           " is not an acceptable NULL value for required fields"])
-                    elif not row[1]:  # Date field is empty
-                        error_list.append([str(row[0]), in_field + " should not be NULL"])
-
-                    elif str(row[1]).strip() == '':  # Date field is empty
-                        error_list.append([str(row[0]), in_field + " should not be empty"])
-
-                if error_found:
-                    error_list.append([str(row[0]), in_field + " value of \"" + str(row[1]) +
-                                       "\" is not an acceptable NULL value for required fields"])
-
-        # Return the errors
-        return error_list
-
-    def __source_check(self, in_table, id_field):
-        """Checks for matching source citation between the input table and L_Source_Cit"""
-        # List to hold the unique id number and the error
-        error_list = []
-
-        # Check if the 'SOURCE_CIT' field exists
-        for field in arcpy.ListFields(in_table):
-            if field.name == 'SOURCE_CIT':
-                # Iterate through the rows
-                with SearchCursor(in_table, [id_field, 'Source_Cit']) as cursor:
-                    for row in cursor:
-                        if str(row[1]) not in self.source_citations:
-                            error_list.append([str(row[0]), "SOURCE_CIT value of \"" + str(row[1]) +
-                                               "\" does not match any values in L_Source_Cit"])
-
-        # Return the errors
-        return error_list
+    def __list_fields(in_table):
+        """Returns the field descriptions of the table from the catalog.  Used to load the
+           cached schemas."""
+        return [TableField(field.name, field.type, field.length, field.required)
+                for field in arcpy.ListFields(in_table)]
+
+    def __read_table(self, in_table, baseline_calls):
+        """Reads the attribute values of the table into columns with a single search cursor.
+           Receives the number of ListFields calls the checks made on the table before the
+           columnar read."""
+        fields = [field for field in self.schema_cache.fields(in_table, baseline_calls)
+                  if field.type not in ['Geometry', 'Blob', 'Raster']]
+
+        with SearchCursor(in_table, [field.name for field in fields]) as cursor:
+            return ColumnTable.from_rows(os.path.basename(in_table), fields, cursor)
 
     @staticmethod
-    def __space_check(in_table, id_field):
-        """Checks for extra spaces in each text field of the table"""
-        # List to hold the unique id number and the error
-        error_list = []
-
-        # Get a list of text fields in the table
-        field_names = list(field.name for field in arcpy.ListFields(in_table, "*", "String"))
-
-        # Remove the id_field and put it at the front of the list
-        field_names.remove(id_field)
-        field_names.insert(0, id_field)
-
-        # Iterate through the rows
-        with SearchCursor(in_table, field_names) as cursor:
-            for row in cursor:
-                # Column counter
-                col = 1  # Start at 1 to skip the id_field at the beginning of the list
-
-                # Iterate through the columns
-                while col < len(field_names):
-                    if row[col]:
-                        if len(row[col]) != len(row[col].strip()) and len(row[col]) > 1:
-                            error_list.append(
-                                [str(row[0]), field_names[col] + " has an extra space."])
-                    col += 1
-
-        # Return the errors
-        return error_list
+    def __read_keys(in_table, in_field):
+        """Returns the values of a key field.  Used to load the cached key sets."""
+        return [row[0] for row in SearchCursor(in_table, in_field)]
 
     def __standard_table_checks(self, in_table, id_field, field_domains,
                                 required_fields, applicable_fields, check_fields):
-        """Standard checks performed on all tables"""
-        errors = []  # Errors found
-
+        """Standard checks performed on all tables.  Yields the errors as they are found, so
+           they go straight to the error sink."""
         # Check if the field exists
         missing_fields = self.__field_checker(in_table, check_fields)
 
         # If there are missing fields, generate a warning and then return
         if missing_fields:
-            errors.append(["", "Missing fields: " + ", ".join(missing_fields)])
-            return errors
-
-        # Check the DFIRM_ID values
-        for error in self.__dfirm_id_check(in_table, id_field):
-            errors.append(error)
-
-        # Check the Source Citation values
-        for error in self.__source_check(in_table, id_field):
-            errors.append(error)
-
-        # Check for unique id
-        for error in self.__unique_id_check(in_table, id_field):
-            errors.append(error)
-
-        # Iterate through the field list and perform domain value checks
-        for field in arcpy.ListFields(in_table):
-            if field.name in field_domains.keys():
-                for error in self.__domain_checks(in_table, field.name, field_domains[field.name],
-                                                  id_field, required_fields):
-                    errors.append(error)
-
-        # Iterate through the required fields and perform null checks
-        for key in required_fields.keys():
-            for error in self.__required_null_checks(in_table, key, required_fields[key], id_field):
-                errors.append(error)
-
-        # Iterate through the applicable fields and perform null checks
-        for key in applicable_fields.keys():
-            for error in self.__applicable_null_checks(in_table, key,
-                                                       applicable_fields[key], id_field):
-                errors.append(error)
-
-        # Check for extra spaces
-        for error in self.__space_check(in_table, id_field):
-            errors.append(error)
-
-        # Return the errors found
-        return errors
+            yield ["", "Missing fields: " + ", ".join(missing_fields)]
+            return
+
+        # Read the table once and run every standard check against the columns.  The source,
+        # domain and space checks each listed the fields, and the null check of every applicable
+        # field listed them again.
+        table = self.__read_table(in_table, 3 + len(applicable_fields))
+        for error in self.standard_checks.run(table, id_field, field_domains,
+                                              required_fields, applicable_fields):
+            yield error
+
+        for warning in self.standard_checks.warnings:
+            self.__printer(warning, True)
+
+        # Summarize the values outside their domain that are repeated across rows
+        for field, value, count in self.standard_checks.domain_tally:
+            if count > 1:
+                self.__printer("\t" + field + " value of \"" + str(value) +
+                               "\" is not in domain in " + str(count) + " rows")
+
+    def __table_signature(self, in_table):
+        """Returns a signature of a table, read on every key lookup.  Cached key sets are
+           reloaded when it changes, such as when another tool edits the table during the run.
+           A shapefile or DBF table is signed by the modified time and size of its .dbf file,
+           which change with any edit.  A geodatabase table has no file of its own, so it's
+           signed by its row count, which the geodatabase stores.  An edit that keeps the row
+           count of a geodatabase table isn't seen."""
+        if self.dbf_ext:  # Shapefiles and DBF tables are their own files
+            dbf_stat = os.stat(os.path.splitext(in_table)[0] + '.dbf')
+            return dbf_stat.st_mtime, dbf_stat.st_size
+
+        return int(arcpy.GetCount_management(in_table)[0])
 
     @staticmethod
     def __unique_id_check(in_table, in_field, error_message="Duplicate unique id found in "):
@@ -1383,8 +1287,7 @@ class QCChecks:
         # List to hold the unique id number and the error
         error_list = []
 
-        values = [row[0] for row in SearchCursor(in_table, in_field)]
-        dupes = list(set([x for n, x in enumerate(values) if x in values[:n]]))
+        dupes = CountingIndex(row[0] for row in SearchCursor(in_table, in_field)).duplicates()
 
         # Check for duplicate unique ids
         for dupe in dupes:
@@ -1394,6 +1297,25 @@ class QCChecks:
         # Return the errors
         return error_list
 
+    def check_table(self, table_path, worker=False):
+        """Runs the QC check of a single table, starting from an empty error state.  Returns the
+           errors found.  In a worker process the spilled errors are left to the main process,
+           and the schema lookup counters are returned with them."""
+        self.errors = ErrorSink(table_key(table_path))
+        self.missing_field = False
+
+        # Run the check registered for the table
+        # Example:
+        # QC_RULES['s_base_index'].check(self, r'C:\temp\test.gdb\FIRM_Spatial_Layers\S_Base_Index')
+        QC_RULES[table_key(table_path)].check(self, table_path)
+
+        if worker:
+            # Spill the errors still in memory so the main process only receives run file names
+            self.errors.spill()
+            return self.errors.release(), self.schema_cache.counts()
+        return self.errors
+
+    @timed()
     def iterate_tables(self):
         """Iterates through the tables"""
         tables_found = []  # List of tables found in the workspace
@@ -1427,45 +1349,95 @@ class QCChecks:
                 if table_path not in tables_found:
                     tables_found.append(table_path)
 
-        # Iterate through the tables found
+        # Keep the tables that contain data and have a QC check
+        row_counts = {}
         for table_path in sorted(tables_found):
-            # Check if the table is empty
-            if int(arcpy.GetCount_management(table_path)[0]) != 0:
-                table_name = os.path.basename(table_path)
-                self.__printer('Checking ' + table_name)
-                self.errors = []
-                # Remove the .shp or .dbf extensions if shapefiles are found
-                table_name = table_name.replace(".shp", "")
-                table_name = table_name.replace(".dbf", "")
-                # Execute the function associated with the table
-                # Example:
-                # exec(self.s_base_index_check(r'C:\temp\test.gdb\FIRM_Spatial_Layers\S_Base_Index')
-                if table_name.lower() not in self.task_tables:
-                    arcpy.AddWarning(
-                        table_name +
-                        ' contains data but is not applicable for the choose MIP task.')
-                exec("self." + table_name.lower() + "_check(r'" + table_path + "')")
+            row_count = int(arcpy.GetCount_management(table_path)[0])
+            if row_count == 0:
+                continue
+            if table_key(table_path) not in QC_RULES:
+                arcpy.AddWarning(os.path.basename(table_path) +
+                                 " contains data but there is no QC check for it.  Skipping.")
+                continue
+            row_counts[table_path] = row_count
+        # Sorted by table name, the order of the worksheets, so tables in a feature dataset and
+        # stand-alone tables are mixed
+        table_paths = sorted(row_counts, key=lambda path: sheet_order(
+            os.path.splitext(os.path.basename(path))[0]))
+
+        # Check the tables in worker processes up front, the most expensive tables first.
+        # Otherwise each table is checked in turn below.
+        table_errors = {}
+        if self.workers > 1 and len(table_paths) > 1:
+            with self.stage_log.stage('check_tables_parallel', workers=self.workers) as record:
+                table_errors = self.__check_tables_parallel(QC_RULES.schedule(row_counts))
+                record['rows'] = sum(row_counts.values())
+
+        # Open the Excel file for the whole run.  It's saved once all the tables are written.
+        if self.excel_export:
+            checked_tables = [os.path.splitext(os.path.basename(table_path))[0]
+                              for table_path in table_paths]
+            self.error_workbook = ErrorWorkbook(self.out_folder + '\\Errors.xlsx', checked_tables)
+            self.__printer("Errors.xlsx is written once every table is checked.  It is not "
+                           "updated if the run stops early.")
+
+        # Iterate through the tables in sorted order and write out their errors
+        for table_path in table_paths:
+            table_name = os.path.basename(table_path)
+            self.__printer('Checking ' + table_name)
+            # Remove the .shp or .dbf extensions if shapefiles are found
+            table_name = table_name.replace(".shp", "")
+            table_name = table_name.replace(".dbf", "")
+            if table_name.lower() not in self.task_tables:
+                arcpy.AddWarning(
+                    table_name +
+                    ' contains data but is not applicable for the choose MIP task.')
+
+            with self.stage_log.stage('table', table=table_name) as record:
+                if table_path in table_errors:
+                    self.errors = table_errors[table_path]
+                else:
+                    self.check_table(table_path)
+                    record['rows'] = row_counts[table_path]
 
                 # Write out the errors to a DBF file
                 if self.shp_export:
-                    self.write_out_errors_dbf(sorted(self.errors), table_name)
+                    self.write_out_errors_dbf(self.errors, table_name)
 
                 # Write out the errors to an Excel file
                 if self.excel_export:
-                    self.write_out_errors_exel(sorted(self.errors), table_name)
+                    self.write_out_errors_exel(self.errors, table_name)
+                record['errors'] = len(self.errors)
+
+                # Remove any errors spilled to disk
+                self.errors.close()
+
+        # Save the Excel file
+        if self.excel_export:
+            with self.stage_log.stage('save_excel', rows=self.total_errors):
+                self.error_workbook.save()
+            self.error_workbook = None
 
         # Show total errors found
         self.__printer("\nTotal errors: {}".format(self.total_errors))
 
+        # Show how many ListFields calls the schema cache saved, against the calls the checks
+        # made before it
+        self.__printer("ListFields calls: {} (before the schema cache: {}, cache lookups: {})"
+                       .format(self.schema_cache.catalog_calls, self.schema_cache.baseline_calls,
+                               self.schema_cache.lookups))
+
+    @QC_RULES.register('S_Alluvial_Fan',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'ALLUVL_ID', 'ACTIVE_FAN', 'FANAPEX_DA',
+                               'AREA_UNITS', 'FANAPEX_Q', 'DISCH_UNIT', 'FLD_ZONE', 'ZONE_SUBTY',
+                               'SOURCE_CIT'),
+                       spec_list=('ALLUVL_ID', 'FANAPEX_DA', 'AREA_UNITS', 'FANAPEX_Q',
+                                  'DISCH_UNIT', 'FAN_VEL_MN', 'FAN_VEL_MX', 'VEL_UNIT', 'DEPTH',
+                                  'DEPTH_UNIT'))
     def s_alluvial_fan_check(self, in_feature_class):
         """QC check of S_Alluvial_Fan"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'ALLUVL_ID', 'ACTIVE_FAN', 'FANAPEX_DA',
-                  'AREA_UNITS', 'FANAPEX_Q', 'DISCH_UNIT', 'FLD_ZONE', 'ZONE_SUBTY', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'FANAPEX_DA', 'AREA_UNITS', 'FANAPEX_Q', 'DISCH_UNIT',
-                     'FAN_VEL_MN', 'FAN_VEL_MX', 'VEL_UNIT', 'DEPTH', 'DEPTH_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Alluvial_Fan')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -1556,13 +1528,14 @@ class QCChecks:
                             [unique_id,
                              "DEPTH_UNIT should not be populated when DEPTH is not populated"])
 
+    @QC_RULES.register('S_Base_Index',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'BASE_ID', 'FILENAME', 'BASE_DATE',
+                               'SOURCE_CIT'),
+                       spec_list=('BASE_ID', 'FILENAME'))
     def s_base_index_check(self, in_feature_class):
         """QC check of S_Base_Index"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'BASE_ID', 'FILENAME', 'BASE_DATE', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'FILENAME')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Base_Index')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -1596,14 +1569,14 @@ class QCChecks:
         for error in errors:
             self.errors.append(error)
 
+    @QC_RULES.register('S_BFE',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'BFE_LN_ID', 'ELEV', 'LEN_UNIT',
+                               'V_DATUM', 'SOURCE_CIT'),
+                       spec_list=('BFE_LN_ID', 'LEN_UNIT', 'V_DATUM', 'ELEV'))
     def s_bfe_check(self, in_feature_class):
         """QC check of S_BFE"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'BFE_LN_ID', 'ELEV',
-                  'LEN_UNIT', 'V_DATUM', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'LEN_UNIT', 'V_DATUM', 'ELEV')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_BFE')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -1640,17 +1613,18 @@ class QCChecks:
                     self.errors.append([unique_id, "V_DATUM value of " + str(row[3]) +
                                         " does not match the V_DATUM value in Study_Info"])
 
+    @QC_RULES.register('S_Cst_Gage',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'CSTGAGE_ID', 'GAGE_NM', 'AGENCY',
+                               'START_PD', 'END_PD', 'GAGE_TYPE', 'V_DATUM', 'TIDE_TF',
+                               'WVDIR_TF', 'WVSPEC_TF', 'WDSPD_TF', 'WDDIR_TF', 'SOURCE_CIT'),
+                       spec_list=('CSTGAGE_ID', 'REC_INTVL', 'TIME_UNIT', 'START_PD',
+                                  'START_TIME', 'END_PD', 'END_TIME', 'V_DATUM', 'TIDE_TF',
+                                  'TIDE_EPOCH', 'WDSPD_TF', 'WDDIR_TF', 'WDSTN_HT'),
+                       depends_on=('L_Cst_Model',))
     def s_cst_gage_check(self, in_feature_class):
         """QC check of S_Cst_Gage"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'CSTGAGE_ID', 'GAGE_NM', 'AGENCY', 'START_PD',
-                  'END_PD', 'GAGE_TYPE', 'V_DATUM', 'TIDE_TF', 'WVDIR_TF', 'WVSPEC_TF', 'WDSPD_TF',
-                  'WDDIR_TF', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'REC_INTVL', 'TIME_UNIT', 'START_PD', 'START_TIME', 'END_PD',
-                     'END_TIME', 'V_DATUM', 'TIDE_TF', 'TIDE_EPOCH', 'WDSPD_TF', 'WDDIR_TF',
-                     'WDSTN_HT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Cst_Gage')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -1759,17 +1733,19 @@ class QCChecks:
                             [unique_id,
                              "WDSTN_HT should be populated when WDSPD_TF or WDDIR_TF is True"])
 
+    @QC_RULES.register('S_Cst_Tsct_Ln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'TRAN_LN_ID', 'TBASELN_ID', 'TRAN_NO',
+                               'XCOORD', 'YCOORD', 'WTR_NM', 'V_DATUM', 'CSTLN_TYP', 'EVENT_TYP',
+                               'SWEL', 'LOC_DESC', 'RUP', 'ELEV_UNIT', 'WHAFIS_TF', 'OVERTOP_TF',
+                               'BW_HGT_TF', 'HVFLOW_TF', 'WAVE_02PCT', 'SOURCE_CIT'),
+                       spec_list=('TRAN_LN_ID', 'V_DATUM', 'SWEL', 'RUP', 'ELEV_UNIT',
+                                  'SETUP_DPTH', 'CON_HT', 'SIG_HT', 'MEAN_HT', 'SIG_PD', 'CON_PD',
+                                  'MEAN_PD', 'LEN_UNIT', 'TIME_UNIT'),
+                       depends_on=('L_Cst_Model', 'L_Cst_Tsct_Elev', 'S_Tsct_Basln'))
     def s_cst_tsct_ln_check(self, in_feature_class):
         """QC check of S_Cst_Tsct_Ln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'TRAN_LN_ID', 'TBASELN_ID', 'TRAN_NO', 'XCOORD',
-                  'YCOORD', 'WTR_NM', 'V_DATUM', 'CSTLN_TYP', 'EVENT_TYP', 'SWEL', 'LOC_DESC',
-                  'RUP', 'ELEV_UNIT', 'WHAFIS_TF', 'OVERTOP_TF', 'BW_HGT_TF', 'HVFLOW_TF',
-                  'WAVE_02PCT', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'V_DATUM', 'SWEL', 'RUP', 'ELEV_UNIT', 'SETUP_DPTH', 'CON_HT',
-                     'SIG_HT', 'MEAN_HT', 'SIG_PD', 'CON_PD', 'MEAN_PD', 'LEN_UNIT', 'TIME_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Cst_Tsct_Ln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -1864,14 +1840,14 @@ class QCChecks:
                          "TIME_UNIT should be populated when SIG_PD, CON_PD, or MEAN_PD  is "
                          "populated"])
 
+    @QC_RULES.register('S_Datum_Conv_Pt',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'DATCONPTID', 'FROM_DATUM', 'TO_DATUM',
+                               'CONVFACTOR', 'LEN_UNIT', 'SOURCE_CIT'),
+                       spec_list=('DATCONPTID', 'TO_DATUM', 'CONVFACTOR', 'LEN_UNIT'))
     def s_datum_conv_pt_check(self, in_feature_class):
         """QC check of S_Datum_Conv_Pt"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'DATCONPTID', 'FROM_DATUM', 'TO_DATUM', 'CONVFACTOR',
-                  'LEN_UNIT', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'TO_DATUM', 'CONVFACTOR', 'LEN_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Datum_Conv_Pt')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -1908,15 +1884,16 @@ class QCChecks:
                     self.errors.append(
                         [unique_id, "LEN_UNIT should be populated when CONVFACTOR is populated"])
 
+    @QC_RULES.register('S_FIRM_Pan',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'FIRM_ID', 'ST_FIPS', 'PCOMM', 'PANEL',
+                               'SUFFIX', 'FIRM_PAN', 'PANEL_TYP', 'SCALE', 'BASE_TYP',
+                               'SOURCE_CIT'),
+                       spec_list=('FIRM_ID', 'ST_FIPS', 'PCOMM', 'PANEL', 'SUFFIX', 'FIRM_PAN',
+                                  'PANEL_TYP', 'PNP_REASON', 'SCALE'))
     def s_firm_pan_check(self, in_feature_class):
         """QC check of S_FIRM_Pan"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'FIRM_ID', 'ST_FIPS', 'PCOMM', 'PANEL', 'SUFFIX',
-                  'FIRM_PAN', 'PANEL_TYP', 'SCALE', 'BASE_TYP', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'ST_FIPS', 'PCOMM', 'PANEL', 'SUFFIX', 'FIRM_PAN', 'PANEL_TYP',
-                     'PNP_REASON', 'SCALE')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_FIRM_Pan')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2032,15 +2009,15 @@ class QCChecks:
                     self.errors.append([unique_id,
                                         'PANEL_TYP is not printed and PNP_REASON is empty'])
 
+    @QC_RULES.register('S_Fld_Haz_Ar',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'FLD_AR_ID', 'STUDY_TYP', 'FLD_ZONE',
+                               'SFHA_TF', 'SOURCE_CIT'),
+                       spec_list=('FLD_AR_ID', 'STATIC_BFE', 'FLD_ZONE', 'V_DATUM', 'DEPTH',
+                                  'LEN_UNIT', 'VELOCITY', 'VEL_UNIT'))
     def s_fld_haz_ar_check(self, in_feature_class):
         """QC check of S_Fld_Haz_Ar"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'FLD_AR_ID', 'STUDY_TYP',
-                  'FLD_ZONE', 'SFHA_TF', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'STATIC_BFE', 'FLD_ZONE', 'V_DATUM', 'DEPTH', 'LEN_UNIT',
-                     'VELOCITY', 'VEL_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Fld_Haz_Ar')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2155,13 +2132,13 @@ class QCChecks:
                             self.errors.append(
                                 [unique_id, "VEL_UNIT field not populated for VELOCITY"])
 
+    @QC_RULES.register('S_Fld_Haz_Ln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'FLD_LN_ID', 'LN_TYP', 'SOURCE_CIT'),
+                       spec_list=())
     def s_fld_haz_ln_check(self, in_feature_class):
         """QC check of S_Fld_Haz_Ln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'FLD_LN_ID', 'LN_TYP', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Fld_Haz_Ln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2177,15 +2154,16 @@ class QCChecks:
         if self.missing_field:
             return
 
+    @QC_RULES.register('S_Gage',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'GAGE_ID', 'WTR_NM', 'AGENCY',
+                               'GAGE_DESC', 'GAGE_TYP', 'START_PD', 'END_PD', 'DRAIN_AREA',
+                               'AREA_UNIT', 'SOURCE_CIT'),
+                       spec_list=('GAGE_ID', 'GAGE_TYP', 'REC_INTRVL', 'TIME_UNIT', 'START_PD',
+                                  'END_PD', 'DRAIN_AREA', 'AREA_UNIT'))
     def s_gage_check(self, in_feature_class):
         """QC check of S_Gage"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'GAGE_ID', 'WTR_NM', 'AGENCY', 'GAGE_DESC', 'GAGE_TYP',
-                  'START_PD', 'END_PD', 'DRAIN_AREA', 'AREA_UNIT', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'GAGE_TYP', 'REC_INTRVL', 'TIME_UNIT', 'START_PD', 'END_PD',
-                     'DRAIN_AREA', 'AREA_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Gage')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2250,14 +2228,15 @@ class QCChecks:
                         [unique_id,
                          "If the DRAIN_AREA is not -8888, then AREA_UNIT should not be NP"])
 
+    @QC_RULES.register('S_Gen_Struct',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'STRUCT_ID', 'STRUCT_TYP', 'WTR_NM',
+                               'SHOWN_FIRM', 'SOURCE_CIT'),
+                       spec_list=('STRUCT_ID', 'STRUCT_TYP', 'STRUC_DESC', 'SHOWN_FIRM'),
+                       depends_on=('L_Cst_Struct',))
     def s_gen_struct_check(self, in_feature_class):
         """QC check of S_Gen_Struct"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'STRUCT_ID', 'STRUCT_TYP',
-                  'WTR_NM', 'SHOWN_FIRM', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'STRUCT_TYP', 'STRUC_DESC', 'SHOWN_FIRM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Gen_Struct')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2317,14 +2296,15 @@ class QCChecks:
                 if shown_firm == 'U':
                     self.errors.append([unique_id, 'SHOWN_FIRM should be \'T\' or \'F\' not \'U\''])
 
+    @QC_RULES.register('S_HWM',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'HWM_ID', 'WTR_NM', 'LOC_DESC',
+                               'EVENT_DT', 'ELEV', 'LEN_UNIT', 'V_DATUM', 'HWM_SOURCE',
+                               'APX_FREQ', 'SOURCE_CIT'),
+                       spec_list=('HWM_ID', 'ELEV', 'LEN_UNIT', 'V_DATUM'))
     def s_hwm_check(self, in_feature_class):
         """QC check of S_HWM"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'HWM_ID', 'WTR_NM', 'LOC_DESC', 'EVENT_DT', 'ELEV',
-                  'LEN_UNIT', 'V_DATUM', 'HWM_SOURCE', 'APX_FREQ', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'ELEV', 'LEN_UNIT', 'V_DATUM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_HWM')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2363,13 +2343,14 @@ class QCChecks:
                         self.errors.append([unique_id, "V_DATUM value of " + v_datum +
                                             " does not match the V_DATUM value in Study_Info"])
 
+    @QC_RULES.register('S_Hydro_Reach',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'REACH_ID', 'SOURCE_CIT'),
+                       spec_list=('REACH_ID', 'UP_NODE', 'DN_NODE'),
+                       depends_on=('S_Nodes',))
     def s_hydro_reach_check(self, in_feature_class):
         """QC check of S_Hydro_Reach"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'REACH_ID', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'UP_NODE', 'DN_NODE')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Hydro_Reach')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2401,13 +2382,15 @@ class QCChecks:
                 query=dn_node_field + " is not null and " + dn_node_field + " not in ('', ' ')"):
             self.errors.append(error)
 
+    @QC_RULES.register('S_Label_Ld',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LEADER_ID', 'LABEL_TYPE', 'FIRM_PAN',
+                               'SCALE'),
+                       spec_list=(),
+                       depends_on=('S_FIRM_Pan',))
     def s_label_ld_check(self, in_feature_class):
         """QC check of S_Label_Ld"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'LEADER_ID', 'LABEL_TYPE', 'FIRM_PAN', 'SCALE')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Label_Ld')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2434,14 +2417,16 @@ class QCChecks:
                 self.workspace + self.dataset + '\\S_FIRM_Pan' + self.shp_ext, 'FIRM_PAN'):
             self.errors.append(error)
 
+    @QC_RULES.register('S_Label_Pt',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LABEL_ID', 'LABEL', 'LABEL_TYPE',
+                               'FONT_SIZE', 'FONT_TYPE', 'FONT_STYLE', 'DEGREES', 'FIRM_PAN',
+                               'SCALE'),
+                       spec_list=('LABEL_ID', 'DEGREES'),
+                       depends_on=('S_FIRM_Pan',))
     def s_label_pt_check(self, in_feature_class):
         """QC check of S_Label_Pt"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'LABEL_ID', 'LABEL', 'LABEL_TYPE', 'FONT_SIZE',
-                  'FONT_TYPE', 'FONT_STYLE', 'DEGREES', 'FIRM_PAN', 'SCALE')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'DEGREES')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Label_Pt')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2480,22 +2465,22 @@ class QCChecks:
                     elif degrees > 359:
                         self.errors.append([unique_id, 'DEGREES greater than 359'])
 
+    @QC_RULES.register('S_Levee',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LEVEE_ID', 'FC_SYS_ID', 'LEVEE_NM',
+                               'LEVEE_TYP', 'WTR_NM', 'BANK_LOC', 'USACE_LEV', 'PL84_99TF',
+                               'LEVEE_STAT', 'OWNER', 'LEN_UNIT', 'SOURCE_CIT'),
+                       spec_list=('LEVEE_ID', 'USACE_LEV', 'DISTRICT', 'LEVEE_STAT', 'PAL_DATE',
+                                  'FREEBOARD', 'LEN_UNIT'))
     def s_levee_check(self, in_feature_class):
         """QC check of S_Levee"""
-        # Required fields
-        fields = ['DFIRM_ID', 'VERSION_ID', 'LEVEE_ID', 'FC_SYS_ID', 'LEVEE_NM', 'LEVEE_TYP',
-                  'WTR_NM', 'BANK_LOC', 'USACE_LEV', 'PL84_99TF', 'LEVEE_STAT', 'OWNER',
-                  'LEN_UNIT', 'SOURCE_CIT']
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Levee')
 
         # Update the fields if schema 2019 or 2020 are used
         if self.schema in ['2019', '2020']:
             fields.append('LEV_AN_TYP')
             fields.append('FC_SEG_ID')
 
-        # Fields for specific checks
-        spec_list = [fields[2], 'USACE_LEV', 'DISTRICT', 'LEVEE_STAT', 'PAL_DATE', 'FREEBOARD',
-                     'LEN_UNIT']
-
         # Update the specific fields if schema 2019 or 2020 are used
         if self.schema in ['2019', '2020']:
             spec_list.append('LEV_AN_TYP')
@@ -2598,13 +2583,13 @@ class QCChecks:
                                  "If LEVEE_STAT is not Non-Accredited, " +
                                  "then LEV_AN_TYP should not be populated"])
 
+    @QC_RULES.register('S_LiMWA',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LIMWA_ID', 'SHOWN_FIRM', 'SOURCE_CIT'),
+                       spec_list=('LIMWA_ID', 'SHOWN_FIRM'))
     def s_limwa_check(self, in_feature_class):
         """QC check of S_LiMWA"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'LIMWA_ID', 'SHOWN_FIRM', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'SHOWN_FIRM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_LiMWA')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2629,14 +2614,14 @@ class QCChecks:
                 if str(shown_firm) == 'U':
                     self.errors.append([unique_id, "SHOWN_FIRM should not be 'U'"])
 
+    @QC_RULES.register('S_LOMR',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LOMR_ID', 'EFF_DATE', 'CASE_NO',
+                               'STATUS', 'SOURCE_CIT'),
+                       spec_list=())
     def s_lomr_check(self, in_feature_class):
         """QC check of S_LOMR"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'LOMR_ID', 'EFF_DATE',
-                  'CASE_NO', 'STATUS', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_LOMR')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2652,14 +2637,16 @@ class QCChecks:
         if self.missing_field:
             return
 
+    @QC_RULES.register('S_Nodes',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'NODE_ID', 'WTR_NM', 'NODE_DESC',
+                               'MODEL_ID', 'SOURCE_CIT'),
+                       spec_list=(),
+                       depends_on=('L_Summary_Discharges', 'L_Summary_Elevations',
+                                   'S_Hydro_Reach', 'S_Subbasins'))
     def s_nodes_check(self, in_feature_class):
         """QC check of S_Nodes"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'NODE_ID', 'WTR_NM',
-                  'NODE_DESC', 'MODEL_ID', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Nodes')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2684,39 +2671,30 @@ class QCChecks:
         subbasins_id_list = []
 
         if arcpy.Exists(self.workspace + '\\L_Summary_Discharges' + self.dbf_ext):
-            discharges_id_list = sorted(
-                list(set([str(row[0]) for row in SearchCursor(
-                    self.workspace + '\\L_Summary_Discharges' + self.dbf_ext, 'NODE_ID')])))
+            discharges_id_list = self.key_index.keys(
+                self.workspace + '\\L_Summary_Discharges' + self.dbf_ext, 'NODE_ID')
 
         if arcpy.Exists(self.workspace + '\\L_Summary_Elevations' + self.dbf_ext):
-            elevations_id_list = sorted(
-                list(set([str(row[0]) for row in SearchCursor(
-                    self.workspace + '\\L_Summary_Elevations' + self.dbf_ext, 'NODE_ID')])))
+            elevations_id_list = self.key_index.keys(
+                self.workspace + '\\L_Summary_Elevations' + self.dbf_ext, 'NODE_ID')
 
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Hydro_Reach' + self.shp_ext):
-            reach_up_id_list = sorted(
-                list(set([str(row[0]) for row in
-                          SearchCursor(self.workspace + self.dataset +
-                                       '\\S_Hydro_Reach' + self.shp_ext, 'UP_NODE')])))
+            reach_up_id_list = self.key_index.keys(
+                self.workspace + self.dataset + '\\S_Hydro_Reach' + self.shp_ext, 'UP_NODE')
 
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Hydro_Reach' + self.shp_ext):
-            reach_down_id_list = sorted(
-                list(set([str(row[0]) for row in
-                          SearchCursor(self.workspace + self.dataset +
-                                       '\\S_Hydro_Reach' + self.shp_ext, 'DN_NODE')])))
+            reach_down_id_list = self.key_index.keys(
+                self.workspace + self.dataset + '\\S_Hydro_Reach' + self.shp_ext, 'DN_NODE')
 
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Subbasins' + self.shp_ext):
-            subbasins_id_list = sorted(
-                list(set([str(row[0]) for row in
-                          SearchCursor(self.workspace + self.dataset +
-                                       '\\S_Subbasins' + self.shp_ext, 'NODE_ID')])))
+            subbasins_id_list = self.key_index.keys(
+                self.workspace + self.dataset + '\\S_Subbasins' + self.shp_ext, 'NODE_ID')
 
         node_id_list = sorted(
             list(set([str(row[0]) for row in SearchCursor(in_feature_class, 'NODE_ID')])))
 
-        foreign_id_list = \
-            discharges_id_list + elevations_id_list + reach_up_id_list + \
-            reach_down_id_list + subbasins_id_list
+        foreign_id_list = set().union(discharges_id_list, elevations_id_list, reach_up_id_list,
+                                      reach_down_id_list, subbasins_id_list)
 
         for node_id in node_id_list:
             if node_id not in foreign_id_list:
@@ -2725,13 +2703,13 @@ class QCChecks:
                                     "L_Summary_Elevations (NODE_ID), S_Hydro_Reach "
                                     "(UP_NODE or DN_NODE) or S_Subbasins (NODE_ID)"])
 
+    @QC_RULES.register('S_PFD_Ln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'PFD_ID', 'VZONE_LIMT', 'SOURCE_CIT'),
+                       spec_list=())
     def s_pfd_ln_check(self, in_feature_class):
         """QC check of S_PFD_Ln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'PFD_ID', 'VZONE_LIMT', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_PFD_Ln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2747,13 +2725,13 @@ class QCChecks:
         if self.missing_field:
             return
 
+    @QC_RULES.register('S_PLSS_Ar',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'PLSS_AR_ID', 'SECT_NO', 'SOURCE_CIT'),
+                       spec_list=('PLSS_AR_ID', 'RANGE', 'SECT_NO', 'TWP'))
     def s_plss_ar_check(self, in_feature_class):
         """QC check of S_PLSS_Ar"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'PLSS_AR_ID', 'SECT_NO', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'RANGE', 'SECT_NO', 'TWP')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_PLSS_Ar')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2813,14 +2791,16 @@ class QCChecks:
                     else:
                         self.errors.append([unique_id, "SECT_NO should be between 0 and 36"])
 
+    @QC_RULES.register('S_Pol_Ar',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'POL_AR_ID', 'POL_NAME1', 'CO_FIPS',
+                               'ST_FIPS', 'COMM_NO', 'CID', 'ANI_TF', 'SOURCE_CIT'),
+                       spec_list=('POL_AR_ID', 'COMM_NO', 'CID', 'ST_FIPS', 'ANI_TF', 'ANI_FIRM',
+                                  'COM_NFO_ID'),
+                       depends_on=('L_Comm_Info',))
     def s_pol_ar_check(self, in_feature_class):
         """QC check of S_Pol_Ar"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'POL_AR_ID', 'POL_NAME1', 'CO_FIPS', 'ST_FIPS',
-                  'COMM_NO', 'CID', 'ANI_TF', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'COMM_NO', 'CID', 'ST_FIPS', 'ANI_TF', 'ANI_FIRM', 'COM_NFO_ID')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Pol_Ar')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2889,14 +2869,17 @@ class QCChecks:
                          "COM_NFO_ID field should be populated when COMM_NO is" +
                          " not ST, FED or OTHR"])
 
+    @QC_RULES.register('S_Profil_Basln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'BASELN_ID', 'WTR_NM', 'WATER_TYP',
+                               'STUDY_TYP', 'SHOWN_FIRM', 'R_ST_DESC', 'R_END_DESC', 'START_ID',
+                               'SOURCE_CIT'),
+                       spec_list=('BASELN_ID', 'SHOWN_FIRM', 'V_DATM_OFF', 'DATUM_UNIT',
+                                  'WATER_TYP', 'STUDY_TYP'),
+                       depends_on=('S_Stn_Start',))
     def s_profil_basln_check(self, in_feature_class):
         """QC check of S_Profil_Basln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'BASELN_ID', 'WTR_NM', 'WATER_TYP', 'STUDY_TYP',
-                  'SHOWN_FIRM', 'R_ST_DESC', 'R_END_DESC', 'START_ID', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'SHOWN_FIRM', 'V_DATM_OFF', 'DATUM_UNIT', 'WATER_TYP', 'STUDY_TYP')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Profil_Basln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2970,13 +2953,15 @@ class QCChecks:
                 if study_typ == 'NP':
                     self.errors.append([unique_id, "STUDY_TYP should not be 'NP'"])
 
+    @QC_RULES.register('S_Riv_Mrk',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'RIV_MRK_ID', 'START_ID', 'RIV_MRK_NO',
+                               'SOURCE_CIT'),
+                       spec_list=(),
+                       depends_on=('S_Stn_Start',))
     def s_riv_mrk_check(self, in_feature_class):
         """QC check of S_Riv_Mrk"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'RIV_MRK_ID', 'START_ID', 'RIV_MRK_NO', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Riv_Mrk')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -2998,13 +2983,15 @@ class QCChecks:
                 self.workspace + self.dataset + '\\S_Stn_Start' + self.shp_ext, 'START_ID'):
             self.errors.append(error)
 
+    @QC_RULES.register('S_Stn_Start',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'START_ID', 'START_DESC', 'LOC_ACC',
+                               'SOURCE_CIT'),
+                       spec_list=('START_ID', 'START_DESC'),
+                       depends_on=('S_Profil_Basln', 'S_Riv_Mrk', 'S_XS'))
     def s_stn_start_check(self, in_feature_class):
         """QC check of S_Stn_Start"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'START_ID', 'START_DESC', 'LOC_ACC', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'START_DESC')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Stn_Start')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3027,25 +3014,21 @@ class QCChecks:
         riv_mrk_list = []
 
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Profil_Basln' + self.shp_ext):
-            baseline_id_list = sorted(
-                list(set([str(row[0]) for row in SearchCursor(
-                    self.workspace + self.dataset + '\\S_Profil_Basln' + self.shp_ext,
-                    'START_ID')])))
+            baseline_id_list = self.key_index.keys(
+                self.workspace + self.dataset + '\\S_Profil_Basln' + self.shp_ext, 'START_ID')
 
         if arcpy.Exists(self.workspace + self.dataset + '\\S_XS' + self.dbf_ext):
-            cross_section_id_list = sorted(
-                list(set([str(row[0]) for row in SearchCursor(
-                    self.workspace + self.dataset + '\\S_XS' + self.dbf_ext, 'START_ID')])))
+            cross_section_id_list = self.key_index.keys(
+                self.workspace + self.dataset + '\\S_XS' + self.dbf_ext, 'START_ID')
 
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Riv_Mrk' + self.shp_ext):
-            riv_mrk_list = sorted(
-                list(set([str(row[0]) for row in SearchCursor(
-                    self.workspace + self.dataset + '\\S_Riv_Mrk' + self.shp_ext, 'START_ID')])))
+            riv_mrk_list = self.key_index.keys(
+                self.workspace + self.dataset + '\\S_Riv_Mrk' + self.shp_ext, 'START_ID')
 
         start_id_list = sorted(
             list(set([str(row[0]) for row in SearchCursor(in_feature_class, 'START_ID')])))
 
-        foreign_id_list = baseline_id_list + cross_section_id_list + riv_mrk_list
+        foreign_id_list = set().union(baseline_id_list, cross_section_id_list, riv_mrk_list)
 
         for start_id in start_id_list:
             if start_id not in foreign_id_list:
@@ -3062,14 +3045,16 @@ class QCChecks:
                 if str(start_desc) == 'NP':
                     self.errors.append([unique_id, "START_DESC value should not be 'NP'"])
 
+    @QC_RULES.register('S_Subbasins',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'SUBBAS_ID', 'SUBBAS_NM', 'HUC8',
+                               'WTR_NM', 'BASIN_DESC', 'SUB_AREA', 'AREA_UNIT', 'BASIN_TYP',
+                               'SOURCE_CIT'),
+                       spec_list=('SUBBAS_ID', 'HUC8', 'SUB_AREA', 'AREA_UNIT'),
+                       depends_on=('S_Nodes',))
     def s_subbasins_check(self, in_feature_class):
         """QC check of S_Subbasins"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'SUBBAS_ID', 'SUBBAS_NM', 'HUC8', 'WTR_NM',
-                  'BASIN_DESC', 'SUB_AREA', 'AREA_UNIT', 'BASIN_TYP', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'HUC8', 'SUB_AREA', 'AREA_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Subbasins')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3122,15 +3107,17 @@ class QCChecks:
                 if area_unit == 'NP':
                     self.errors.append([unique_id, "AREA_UNIT should not be 'NP'"])
 
+    @QC_RULES.register('S_Submittal_Info',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'SUBINFO_ID', 'CASE_NO', 'CASE_DESC',
+                               'SUBMIT_BY', 'METHOD_TYP', 'COMP_DATE', 'TASK_TYP', 'EFF_DATE',
+                               'CONTRCT_NO', 'SOURCE_CIT'),
+                       spec_list=('SUBINFO_ID', 'CASE_NO', 'CASE_DESC', 'SUBMIT_BY', 'COMP_DATE',
+                                  'TASK_TYP', 'METHOD_TYP'),
+                       depends_on=('L_Cst_Model',))
     def s_submittal_info_check(self, in_feature_class):
         """QC check of S_Submittal_Info"""
-        # Required fields
-        fields = ['DFIRM_ID', 'VERSION_ID', 'SUBINFO_ID', 'CASE_NO', 'CASE_DESC', 'SUBMIT_BY',
-                  'METHOD_TYP', 'COMP_DATE', 'TASK_TYP', 'EFF_DATE', 'CONTRCT_NO', 'SOURCE_CIT']
-
-        # Fields for specific checks
-        spec_list = [fields[2], 'CASE_NO', 'CASE_DESC', 'SUBMIT_BY', 'COMP_DATE', 'TASK_TYP',
-                     'METHOD_TYP']
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Submittal_Info')
 
         # Update fields, spec_list and domains if based on 2017 or 2018 specs
         if self.schema in ['2017', '2018']:
@@ -3214,13 +3201,13 @@ class QCChecks:
                             meth_study_typ != 'NP':
                         self.errors.append([unique_id, "METHOD should be 'NP' for this TASK_TYP"])
 
+    @QC_RULES.register('S_Topo_Confidence',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LOWCONF_ID', 'CONF_TYPE', 'SOURCE_CIT'),
+                       spec_list=())
     def s_topo_confidence_check(self, in_feature_class):
         """QC check of S_Topo_Confidence"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'LOWCONF_ID', 'CONF_TYPE', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Topo_Confidence')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3236,14 +3223,14 @@ class QCChecks:
         if self.missing_field:
             return
 
+    @QC_RULES.register('S_Trnsport_Ln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'TRANS_ID', 'MTFCC', 'FULLNAME',
+                               'ROUTE_TYP', 'SOURCE_CIT'),
+                       spec_list=())
     def s_trnsport_ln_check(self, in_feature_class):
         """QC check of S_Trnsport_Ln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'TRANS_ID', 'MTFCC',
-                  'FULLNAME', 'ROUTE_TYP', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Trnsport_Ln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3259,14 +3246,15 @@ class QCChecks:
         if self.missing_field:
             return
 
+    @QC_RULES.register('S_Tsct_Basln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'TBASELN_ID', 'TBASE_TYP', 'R_ST_DESC',
+                               'R_END_DESC', 'V_DATUM', 'WTR_NM', 'SOURCE_CIT'),
+                       spec_list=(),
+                       depends_on=('L_Cst_Model', 'S_Cst_Tsct_Ln'))
     def s_tsct_basln_check(self, in_feature_class):
         """QC check of S_Tsct_Basln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'TBASELN_ID', 'TBASE_TYP', 'R_ST_DESC', 'R_END_DESC',
-                  'V_DATUM', 'WTR_NM', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Tsct_Basln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3296,13 +3284,13 @@ class QCChecks:
                 query=cst_mdl_id_field + " is not null and " + cst_mdl_id_field + " not in ('', ' ')"):
             self.errors.append(error)
 
+    @QC_RULES.register('S_Wtr_Ar',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'WTR_AR_ID', 'WTR_NM', 'SOURCE_CIT'),
+                       spec_list=('WTR_AR_ID', 'SHOWN_FIRM', 'SHOWN_INDX'))
     def s_wtr_ar_check(self, in_feature_class):
         """QC check of S_Wtr_Ar"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'WTR_AR_ID', 'WTR_NM', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'SHOWN_FIRM', 'SHOWN_INDX')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Wtr_Ar')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3337,13 +3325,13 @@ class QCChecks:
                     if shown_indx == 'U':
                         self.errors.append([unique_id, "SHOWN_INDX should not be 'U'"])
 
+    @QC_RULES.register('S_Wtr_Ln',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'WTR_LN_ID', 'WTR_NM', 'SOURCE_CIT'),
+                       spec_list=('WTR_LN_ID', 'SHOWN_FIRM', 'SHOWN_INDX'))
     def s_wtr_ln_check(self, in_feature_class):
         """QC check of S_Wtr_Ln"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'WTR_LN_ID', 'WTR_NM', 'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'SHOWN_FIRM', 'SHOWN_INDX')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_Wtr_Ln')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3378,16 +3366,17 @@ class QCChecks:
                     if shown_indx == 'U':
                         self.errors.append([unique_id, "SHOWN_INDX should not be 'U'"])
 
+    @QC_RULES.register('S_XS',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'XS_LN_ID', 'WTR_NM', 'STREAM_STN',
+                               'START_ID', 'XS_LN_TYP', 'WSEL_REG', 'STRMBED_EL', 'LEN_UNIT',
+                               'V_DATUM', 'MODEL_ID', 'SOURCE_CIT'),
+                       spec_list=('XS_LN_ID', 'WTR_NM', 'STREAM_STN', 'START_ID', 'XS_LTR',
+                                  'XS_LN_TYP', 'LEN_UNIT', 'V_DATUM', 'WSEL_REG', 'STRMBED_EL'),
+                       depends_on=('L_XS_Elev', 'S_Stn_Start'))
     def s_xs_check(self, in_feature_class):
         """QC check of S_XS"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'XS_LN_ID', 'WTR_NM', 'STREAM_STN', 'START_ID',
-                  'XS_LN_TYP', 'WSEL_REG', 'STRMBED_EL', 'LEN_UNIT', 'V_DATUM', 'MODEL_ID',
-                  'SOURCE_CIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'WTR_NM', 'STREAM_STN', 'START_ID', 'XS_LTR', 'XS_LN_TYP',
-                     'LEN_UNIT', 'V_DATUM', 'WSEL_REG', 'STRMBED_EL')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('S_XS')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_feature_class, fields)
@@ -3477,18 +3466,20 @@ class QCChecks:
                             self.errors.append(
                                 [unique_id, "STRMBED_EL should be greater or equal to WSEL_REG"])
 
+    @QC_RULES.register('Study_Info',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'STD_NFO_ID', 'STUDY_NM', 'STATE_NM',
+                               'CNTY_NM', 'LG_PAN_NO', 'OPP_TF', 'H_DATUM', 'V_DATUM',
+                               'PROJECTION', 'PROJ_ZONE', 'PROJ_UNIT', 'LANDWD_VAL', 'CW_TF',
+                               'RTROFT_TF', 'META_NM', 'FIS_NM', 'LOGO_NM', 'INDX_EFFDT',
+                               'DBREV_DT'),
+                       spec_list=('STD_NFO_ID', 'LG_PAN_NO', 'OPP_TF', 'RTROFT_TF', 'META_NM',
+                                  'FIS_NM', 'H_DATUM', 'V_DATUM', 'PROJECTION', 'PROJ_ZONE',
+                                  'PROJ_UNIT', 'PROJ_SUNIT', 'PROJ_SECND', 'PROJ_SZONE', 'CW_TF'),
+                       depends_on=('S_FIRM_Pan',))
     def study_info_check(self, in_table):
         """QC check of Study_Info"""
-        # Required fields
-        fields = ['DFIRM_ID', 'VERSION_ID', 'STD_NFO_ID', 'STUDY_NM', 'STATE_NM', 'CNTY_NM',
-                  'LG_PAN_NO', 'OPP_TF', 'H_DATUM', 'V_DATUM', 'PROJECTION', 'PROJ_ZONE',
-                  'PROJ_UNIT', 'LANDWD_VAL', 'CW_TF', 'RTROFT_TF', 'META_NM', 'FIS_NM',
-                  'LOGO_NM', 'INDX_EFFDT', 'DBREV_DT']
-
-        # Fields for specific checks
-        spec_list = [fields[2], 'LG_PAN_NO', 'OPP_TF', 'RTROFT_TF', 'META_NM', 'FIS_NM',
-                     'H_DATUM', 'V_DATUM', 'PROJECTION', 'PROJ_ZONE', 'PROJ_UNIT',
-                     'PROJ_SUNIT', 'PROJ_SECND', 'PROJ_SZONE', 'CW_TF']
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('Study_Info')
 
         # Add field for the 2021 Updates.
         if self.schema == "2021":
@@ -3681,18 +3672,20 @@ class QCChecks:
                         self.errors.append(
                             [unique_id, "INDX_SUFFX should be a value from A-Z exluding I and O"])
 
+    @QC_RULES.register('L_Comm_Info',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'COM_NFO_ID', 'REPOS_ADR1', 'REPOS_CITY',
+                               'REPOS_ST', 'REPOS_ZIP', 'IN_ID_DAT', 'IN_NFIP_DT', 'IN_FHBM_DT',
+                               'IN_FRM_DAT', 'FST_CW_EFF', 'FST_CW_FIS', 'REVISIONS',
+                               'MULTICO_TF', 'FLOODPRONE', 'FIS_INCLUD', 'RECENT_FIS'),
+                       spec_list=('COM_NFO_ID', 'REPOS_ZIP', 'IN_ID_DAT', 'IN_FRM_DAT',
+                                  'FST_CW_EFF', 'RECENT_DAT', 'RECENT_FIS', 'IN_NFIP_DT',
+                                  'MULTICO_TF', 'FLOODPRONE', 'FIS_INCLUD', 'FST_CW_FIS',
+                                  'IN_FHBM_DT', 'REVISIONS'),
+                       depends_on=('S_Pol_Ar',))
     def l_comm_info_check(self, in_table):
         """QC check of L_Comm_Info"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'COM_NFO_ID', 'REPOS_ADR1', 'REPOS_CITY', 'REPOS_ST',
-                  'REPOS_ZIP', 'IN_ID_DAT', 'IN_NFIP_DT', 'IN_FHBM_DT', 'IN_FRM_DAT', 'FST_CW_EFF',
-                  'FST_CW_FIS', 'REVISIONS', 'MULTICO_TF', 'FLOODPRONE', 'FIS_INCLUD',
-                  'RECENT_FIS')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'REPOS_ZIP', 'IN_ID_DAT', 'IN_FRM_DAT', 'FST_CW_EFF', 'RECENT_DAT',
-                     'RECENT_FIS', 'IN_NFIP_DT', 'MULTICO_TF', 'FLOODPRONE', 'FIS_INCLUD',
-                     'FST_CW_FIS', 'IN_FHBM_DT', 'REVISIONS')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Comm_Info')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -3863,13 +3856,14 @@ class QCChecks:
                 if fis_includ == 'U':
                     self.errors.append([unique_id, "FIS_INCLUD should not be 'U'"])
 
+    @QC_RULES.register('L_Comm_Revis',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'COM_REV_ID', 'COM_NFO_ID', 'REVIS_DATE'),
+                       spec_list=(),
+                       depends_on=('L_Comm_Info',))
     def l_comm_revis_check(self, in_table):
         """QC check of L_Comm_Revis"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'COM_REV_ID', 'COM_NFO_ID', 'REVIS_DATE')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Comm_Revis')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -3890,14 +3884,15 @@ class QCChecks:
                                            'COM_NFO_ID'):
             self.errors.append(error)
 
+    @QC_RULES.register('L_Cst_Model',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'CST_MDL_ID', 'HUC8', 'WTR_NM',
+                               'LIMIT_FROM', 'LIMIT_TO', 'EROS_TF', 'PFD_TF', 'HAZARDEVAL'),
+                       spec_list=('CST_MDL_ID', 'HUC8', 'WTR_NM', 'LIMIT_FROM', 'LIMIT_TO'),
+                       depends_on=('S_Cst_Gage', 'S_Cst_Tsct_Ln', 'S_Submittal_Info'))
     def l_cst_model_check(self, in_table):
         """QC check of L_Cst_Model"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'CST_MDL_ID', 'HUC8', 'WTR_NM', 'LIMIT_FROM',
-                  'LIMIT_TO', 'EROS_TF', 'PFD_TF', 'HAZARDEVAL')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'HUC8', 'WTR_NM', 'LIMIT_FROM', 'LIMIT_TO')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Cst_Model')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -3922,30 +3917,23 @@ class QCChecks:
         # S_Submittal_Info or in S_Tsct_Basln
         gages_id_list = []
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Cst_Gage' + self.shp_ext):
-            gages_id_list = sorted(
-                list(set(
-                    [str(row[0]) for row in
-                     SearchCursor(self.workspace + '\\S_Cst_Gage' + self.shp_ext,
-                                  'CST_MDL_ID')])))
+            gages_id_list = self.key_index.keys(
+                self.workspace + '\\S_Cst_Gage' + self.shp_ext, 'CST_MDL_ID')
 
         transect_id_list = []
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Cst_Tsct_Ln' + self.shp_ext):
-            transect_id_list = sorted(
-                list(set([str(row[0]) for row in
-                          SearchCursor(self.workspace + '\\S_Cst_Tsct_Ln' + self.shp_ext,
-                                       'CST_MDL_ID')])))
+            transect_id_list = self.key_index.keys(
+                self.workspace + '\\S_Cst_Tsct_Ln' + self.shp_ext, 'CST_MDL_ID')
 
         subbasin_id_list = []
         if arcpy.Exists(self.workspace + self.dataset + '\\S_Submittal_Info' + self.shp_ext):
-            subbasin_id_list = sorted(
-                list(set([str(row[0]) for row in
-                          SearchCursor(self.workspace + '\\S_Submittal_Info' + self.shp_ext,
-                                       'CST_MDL_ID')])))
+            subbasin_id_list = self.key_index.keys(
+                self.workspace + '\\S_Submittal_Info' + self.shp_ext, 'CST_MDL_ID')
 
         node_id_list = sorted(
             list(set([str(row[0]) for row in SearchCursor(in_table, 'CST_MDL_ID')])))
 
-        foreign_id_list = gages_id_list + transect_id_list + subbasin_id_list
+        foreign_id_list = set().union(gages_id_list, transect_id_list, subbasin_id_list)
 
         for node_id in node_id_list:
             if node_id not in foreign_id_list:
@@ -3978,14 +3966,15 @@ class QCChecks:
                 if limit_to == 'NP':
                     self.errors.append([unique_id, "LIMIT_TO should not be 'NP'"])
 
+    @QC_RULES.register('L_Cst_Struct',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'CST_STR_ID', 'STRUCT_ID', 'WTR_NM',
+                               'CERT_STAT', 'STRUCT_LEN', 'LEN_UNIT', 'STRUCT_MTL'),
+                       spec_list=('CST_STR_ID', 'WTR_NM', 'STRUCT_LEN', 'LEN_UNIT'),
+                       depends_on=('S_Gen_Struct',))
     def l_cst_struct_check(self, in_table):
         """QC check of L_Cst_Struct"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'CST_STR_ID', 'STRUCT_ID', 'WTR_NM', 'CERT_STAT',
-                  'STRUCT_LEN', 'LEN_UNIT', 'STRUCT_MTL')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'WTR_NM', 'STRUCT_LEN', 'LEN_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Cst_Struct')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4033,13 +4022,14 @@ class QCChecks:
                 if len_unit == 'NP':
                     self.errors.append([unique_id, "LEN_UNIT should not be 'NP'"])
 
+    @QC_RULES.register('L_Cst_Tsct_Elev',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'CT_INFO_ID', 'TRAN_LN_ID', 'EVENT_TYP'),
+                       spec_list=(),
+                       depends_on=('S_Cst_Tsct_Ln',))
     def l_cst_tsct_elev_check(self, in_table):
         """QC check of L_Cst_Tsct_Elev"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'CT_INFO_ID', 'TRAN_LN_ID', 'EVENT_TYP')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Cst_Tsct_Elev')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4060,14 +4050,14 @@ class QCChecks:
                 self.workspace + self.dataset + '\\S_Cst_Tsct_Ln' + self.shp_ext, 'TRAN_LN_ID'):
             self.errors.append(error)
 
+    @QC_RULES.register('L_ManningsN',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'MANN_ID', 'WTR_NM', 'CHANNEL_N',
+                               'OVERBANK_N', 'LANDCOVER'),
+                       spec_list=('MANN_ID', 'WTR_NM', 'CHANNEL_N', 'OVERBANK_N', 'LANDCOVER'))
     def l_manningsn_check(self, in_table):
         """QC check of L_ManningsN"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'MANN_ID', 'WTR_NM', 'CHANNEL_N',
-                  'OVERBANK_N', 'LANDCOVER')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'WTR_NM', 'CHANNEL_N', 'OVERBANK_N', 'LANDCOVER')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_ManningsN')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4107,14 +4097,15 @@ class QCChecks:
                 if landcover == 'NP':
                     self.errors.append([unique_id, "LANDCOVER should not be 'NP'"])
 
+    @QC_RULES.register('L_Meetings',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'MTG_ID', 'COM_NFO_ID', 'MTG_TYP',
+                               'MTG_DATE', 'MTG_LOC', 'MTG_PURP', 'FIS_EFF_DT'),
+                       spec_list=('MTG_ID', 'MTG_TYP', 'MTG_DATE', 'MTG_LOC', 'MTG_PURP'),
+                       depends_on=('L_Comm_Info', 'L_Mtg_POC'))
     def l_meetings_check(self, in_table):
         """QC check of L_Meetings"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'MTG_ID', 'COM_NFO_ID', 'MTG_TYP', 'MTG_DATE',
-                  'MTG_LOC', 'MTG_PURP', 'FIS_EFF_DT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'MTG_TYP', 'MTG_DATE', 'MTG_LOC', 'MTG_PURP')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Meetings')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4166,14 +4157,15 @@ class QCChecks:
                 if mtg_purp == 'NP':
                     self.errors.append([unique_id, "MTG_PURP should not be 'NP'"])
 
+    @QC_RULES.register('L_Mt2_Lomr',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'LOMR_ID', 'CASE_NO', 'EFF_DATE',
+                               'WTR_NM', 'FIRM_PAN', 'STATUS', 'SCALE'),
+                       spec_list=('LOMR_ID', 'CASE_NO', 'EFF_DATE', 'WTR_NM', 'STATUS'),
+                       depends_on=('S_FIRM_Pan',))
     def l_mt2_lomr_check(self, in_table):
         """QC check of L_Mt2_Lomr"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'LOMR_ID', 'CASE_NO', 'EFF_DATE', 'WTR_NM',
-                  'FIRM_PAN', 'STATUS', 'SCALE')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'CASE_NO', 'EFF_DATE', 'WTR_NM', 'STATUS')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Mt2_Lomr')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4219,14 +4211,15 @@ class QCChecks:
                 if status == 'NP':
                     self.errors.append([unique_id, "STATUS should not be 'NP'"])
 
+    @QC_RULES.register('L_Mtg_Poc',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'POC_ID', 'MTG_ID', 'POC_NAME',
+                               'FIRST_NAME', 'LAST_NAME', 'AGENCY', 'CEO', 'FPA', 'SHMO', 'GIS'),
+                       spec_list=(),
+                       depends_on=('L_Meetings',))
     def l_mtg_poc_check(self, in_table):
         """QC check of L_Mtg_Poc"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'POC_ID', 'MTG_ID', 'POC_NAME', 'FIRST_NAME',
-                  'LAST_NAME', 'AGENCY', 'CEO', 'FPA', 'SHMO', 'GIS')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Mtg_Poc')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4247,13 +4240,15 @@ class QCChecks:
                                            'MTG_ID'):
             self.errors.append(error)
 
+    @QC_RULES.register('L_Pan_Revis',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'REVIS_ID', 'FIRM_PAN', 'REVIS_DATE',
+                               'REVIS_NOTE'),
+                       spec_list=(),
+                       depends_on=('S_FIRM_Pan',))
     def l_pan_revis_check(self, in_table):
         """QC check of L_Pan_Revis"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'REVIS_ID', 'FIRM_PAN', 'REVIS_DATE', 'REVIS_NOTE')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Pan_Revis')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4274,13 +4269,15 @@ class QCChecks:
                 self.workspace + self.dataset + '\\S_FIRM_Pan' + self.shp_ext, 'FIRM_PAN'):
             self.errors.append(error)
 
+    @QC_RULES.register('L_Pol_FHBM',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'FHBM_ID', 'COM_NFO_ID', 'FHBM_DATE',
+                               'FHBM_NOTE'),
+                       spec_list=(),
+                       depends_on=('L_Comm_Info',))
     def l_pol_fhbm_check(self, in_table):
         """QC check of L_Pol_FHBM"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'FHBM_ID', 'COM_NFO_ID', 'FHBM_DATE', 'FHBM_NOTE')
-
-        # Fields for specific checks
-        spec_list = ()
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Pol_FHBM')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4301,14 +4298,15 @@ class QCChecks:
                                            'COM_NFO_ID'):
             self.errors.append(error)
 
+    @QC_RULES.register('L_Profil_Bkwtr_El',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'PROF_BW_ID', 'WTR_NM', 'EVENT_TYP',
+                               'BKWTR_WSEL', 'LEN_UNIT', 'V_DATUM'),
+                       spec_list=('PROF_BW_ID', 'LEN_UNIT', 'V_DATUM'),
+                       depends_on=('L_XS_Elev', 'S_Profil_Basln', 'S_XS'))
     def l_profil_bkwtr_el_check(self, in_table):
         """QC check of L_Profil_Bkwtr_El"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'PROF_BW_ID', 'WTR_NM',
-                  'EVENT_TYP', 'BKWTR_WSEL', 'LEN_UNIT', 'V_DATUM')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'LEN_UNIT', 'V_DATUM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Profil_Bkwtr_El')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4407,14 +4405,15 @@ class QCChecks:
                              " event was greater than a L_XS_ELEV value. "
                              "'Check for Flooding Controlled By...'"])
 
+    @QC_RULES.register('L_Profil_Label',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'PROFLBL_ID', 'WTR_NM', 'STREAM_STN',
+                               'ELEV', 'DESCR', 'ORIENT', 'ADJUSTED', 'UNDERLINE', 'LEN_UNIT',
+                               'V_DATUM'),
+                       spec_list=('PROFLBL_ID', 'UNDERLINE', 'LEN_UNIT', 'V_DATUM', 'ELEV'))
     def l_profil_label_check(self, in_table):
         """QC check of L_Profil_Label"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'PROFLBL_ID', 'WTR_NM', 'STREAM_STN', 'ELEV', 'DESCR',
-                  'ORIENT', 'ADJUSTED', 'UNDERLINE', 'LEN_UNIT', 'V_DATUM')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'UNDERLINE', 'LEN_UNIT', 'V_DATUM', 'ELEV')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Profil_Label')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4458,16 +4457,17 @@ class QCChecks:
                 if (elev < 0 and elev != -8888) or elev == -8888:
                     self.errors.append([unique_id, "ELEV should not be -8888 or less than 0"])
 
+    @QC_RULES.register('L_Profil_Panel',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'PROFPAN_ID', 'WTR_NM', 'PANEL_NO',
+                               'FIS_PAN_NO', 'START_STN', 'END_STN', 'START_ELEV', 'END_ELEV',
+                               'ORIGIN_X', 'ORIGIN_Y', 'H_SCALE', 'V_SCALE', 'LEN_UNIT', 'V_DATUM'),
+                       spec_list=('PROFPAN_ID', 'PANEL_NO', 'START_STN', 'END_STN', 'START_ELEV',
+                                  'END_ELEV', 'ORIGIN_X', 'ORIGIN_Y', 'H_SCALE', 'LEN_UNIT',
+                                  'V_DATUM'))
     def l_profil_panel_check(self, in_table):
         """QC check of L_Profil_Panel"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'PROFPAN_ID', 'WTR_NM', 'PANEL_NO', 'FIS_PAN_NO',
-                  'START_STN', 'END_STN', 'START_ELEV', 'END_ELEV', 'ORIGIN_X', 'ORIGIN_Y',
-                  'H_SCALE', 'V_SCALE', 'LEN_UNIT', 'V_DATUM')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'PANEL_NO', 'START_STN', 'END_STN', 'START_ELEV', 'END_ELEV',
-                     'ORIGIN_X', 'ORIGIN_Y', 'H_SCALE', 'LEN_UNIT', 'V_DATUM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Profil_Panel')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4541,14 +4541,14 @@ class QCChecks:
                     self.errors.append([unique_id, "V_DATUM value of " + str(row[3]) +
                                         " does not match the V_DATUM value in Study_Info"])
 
+    @QC_RULES.register('L_Source_Cit',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'SOURCE_CIT', 'CITATION', 'PUBLISHER',
+                               'TITLE', 'PUB_DATE', 'MEDIA'),
+                       spec_list=('SOURCE_CIT', 'SRC_SCALE'))
     def l_source_cit_check(self, in_table):
         """QC check of L_Source_Cit"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'SOURCE_CIT', 'CITATION', 'PUBLISHER', 'TITLE',
-                  'PUB_DATE', 'MEDIA')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'SRC_SCALE')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Source_Cit')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4568,14 +4568,13 @@ class QCChecks:
         fc_list = arcpy.ListFeatureClasses("*", "All", self.dataset)  # List of the feature classes
         for feature_class in fc_list:
             # Get a list of fields for the current feature class
-            fc_field_list = arcpy.ListFields(os.path.join(self.workspace, feature_class))
+            fc_field_list = self.schema_cache.fields(os.path.join(self.workspace, feature_class))
             for field in fc_field_list:
                 # Only look for feature classes with a SOURCE_CIT field
                 if field.name == "SOURCE_CIT":
-                    # Get a list of source_cits for the current feature classes
-                    sources = \
-                        list(set([str(fc_row[0]) for fc_row in SearchCursor(
-                            os.path.join(self.workspace, feature_class), 'SOURCE_CIT')]))
+                    # Get the set of source_cits for the current feature classes
+                    sources = self.key_index.keys(
+                        os.path.join(self.workspace, feature_class), 'SOURCE_CIT')
                     # If the source exists in the L_Source_Cit table, remove it from the list
                     for source in sources:
                         if source in remaining_sources:
@@ -4602,14 +4601,17 @@ class QCChecks:
                         self.errors.append([unique_id, "WARNING: SRC_SCALE usually not" +
                                             " populated for REF sources"])
 
+    @QC_RULES.register('L_Summary_Discharges',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'SUMDSCH_ID', 'NODE_ID', 'NODE_DESC',
+                               'DRAIN_AREA', 'AREA_UNIT', 'EVENT_TYP', 'DISCH', 'DISCH_UNIT',
+                               'SHOWN_FIS'),
+                       spec_list=('SUMDSCH_ID', 'AREA_UNIT', 'DISCH_UNIT', 'WSEL_UNIT',
+                                  'SHOWN_FIS', 'V_DATUM'),
+                       depends_on=('S_Nodes',))
     def l_summary_discharges_check(self, in_table):
         """QC check of L_Summary_Discharges"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'SUMDSCH_ID', 'NODE_ID', 'NODE_DESC', 'DRAIN_AREA',
-                  'AREA_UNIT', 'EVENT_TYP', 'DISCH', 'DISCH_UNIT', 'SHOWN_FIS')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'AREA_UNIT', 'DISCH_UNIT', 'WSEL_UNIT', 'SHOWN_FIS', 'V_DATUM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Summary_Discharges')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4667,14 +4669,15 @@ class QCChecks:
                         self.errors.append([unique_id, "V_DATUM value of " + str(row[3]) +
                                             " does not match the V_DATUM value in Study_Info"])
 
+    @QC_RULES.register('L_Summary_Elevations',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'SUMELEV_ID', 'NODE_ID', 'EVENT_TYP',
+                               'WSEL', 'WSEL_UNIT', 'V_DATUM', 'SHOWN_FIS'),
+                       spec_list=('SUMELEV_ID', 'V_DATUM', 'SHOWN_FIS', 'WSEL', 'WSEL_UNIT'),
+                       depends_on=('S_Nodes',))
     def l_summary_elevations_check(self, in_table):
         """QC check of L_Summary_Elevations"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'SUMELEV_ID', 'NODE_ID', 'EVENT_TYP', 'WSEL',
-                  'WSEL_UNIT', 'V_DATUM', 'SHOWN_FIS')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'V_DATUM', 'SHOWN_FIS', 'WSEL', 'WSEL_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Summary_Elevations')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4725,15 +4728,16 @@ class QCChecks:
                 if wsel_unit == 'NP':
                     self.errors.append([unique_id, "WSEL_UNIT should not be 'NP'"])
 
+    @QC_RULES.register('L_Survey_Pt',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'SURVPT_ID', 'SURVSTR_ID', 'SURV_CODE',
+                               'STRUCTDESC', 'NORTHING', 'EASTING', 'ELEV', 'ELEV_UNIT',
+                               'H_DATUM', 'V_DATUM', 'PROJECTION', 'PROJ_ZONE', 'PROJ_UNIT'),
+                       spec_list=('SURVPT_ID', 'ELEV_UNIT', 'H_DATUM', 'V_DATUM', 'PROJECTION',
+                                  'PROJ_UNIT'))
     def l_survey_pt_check(self, in_table):
         """QC check of L_Survey_Pt"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'SURVPT_ID', 'SURVSTR_ID', 'SURV_CODE', 'STRUCTDESC',
-                  'NORTHING', 'EASTING', 'ELEV', 'ELEV_UNIT', 'H_DATUM', 'V_DATUM', 'PROJECTION',
-                  'PROJ_ZONE', 'PROJ_UNIT')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'ELEV_UNIT', 'H_DATUM', 'V_DATUM', 'PROJECTION', 'PROJ_UNIT')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_Survey_Pt')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -4782,17 +4786,18 @@ class QCChecks:
                 if proj_unit == 'NP':
                     self.errors.append([unique_id, "PROJ_UNIT should not be NP"])
 
+    @QC_RULES.register('L_XS_Elev',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'XS_ELEV_ID', 'XS_LN_ID', 'EVENT_TYP',
+                               'WSEL', 'LEN_UNIT', 'V_DATUM', 'LEVEE_TF', 'CALC_WO_BW'),
+                       spec_list=('XS_ELEV_ID', 'FW_WIDTH', 'FW_WIDTHIN', 'NE_WIDTH_L',
+                                  'NE_WIDTH_R', 'XS_AREA', 'AREA_UNIT', 'VELOCITY', 'VEL_UNIT',
+                                  'EVENT_TYP', 'WSEL', 'WSEL_WOFWY', 'WSEL_FLDWY', 'WSEL_INCRS',
+                                  'LEN_UNIT', 'V_DATUM', 'LEVEE_TF', 'LVSCENARIO', 'CALC_WO_BW'),
+                       depends_on=('S_XS',))
     def l_xs_elev_check(self, in_table):
         """QC check of L_XS_Elev"""
-        # Required fields
-        fields = ['DFIRM_ID', 'VERSION_ID', 'XS_ELEV_ID', 'XS_LN_ID', 'EVENT_TYP', 'WSEL',
-                  'LEN_UNIT', 'V_DATUM', 'LEVEE_TF', 'CALC_WO_BW']
-
-        # Fields for specific checks
-        spec_list = [fields[2], 'FW_WIDTH', 'FW_WIDTHIN', 'NE_WIDTH_L', 'NE_WIDTH_R', 'XS_AREA',
-                     'AREA_UNIT', 'VELOCITY', 'VEL_UNIT', 'EVENT_TYP', 'WSEL', 'WSEL_WOFWY',
-                     'WSEL_FLDWY', 'WSEL_INCRS', 'LEN_UNIT', 'V_DATUM', 'LEVEE_TF', 'LVSCENARIO',
-                     'CALC_WO_BW']
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_XS_Elev')
 
         # Add the EVAL_LN field if using 2020 spec
         if self.schema == '2020':
@@ -5004,15 +5009,16 @@ class QCChecks:
                     if eval_ln == 'U':
                         self.errors.append([unique_id, "EVAL_LN should not be 'U'"])
 
+    @QC_RULES.register('L_XS_Struct',
+                       fields=('DFIRM_ID', 'VERSION_ID', 'XS_STR_ID', 'XS_LN_ID', 'STRUCT_TYP',
+                               'WTR_NM', 'STRUC_FACE', 'STR_STN', 'LO_CHRD_EL', 'HI_CHRD_EL',
+                               'STRMBED_EL', 'LEN_UNIT', 'V_DATUM'),
+                       spec_list=('XS_STR_ID', 'STRUC_FACE', 'V_DATUM'),
+                       depends_on=('S_XS',))
     def l_xs_struct_check(self, in_table):
         """QC check of L_XS_Struct"""
-        # Required fields
-        fields = ('DFIRM_ID', 'VERSION_ID', 'XS_STR_ID', 'XS_LN_ID', 'STRUCT_TYP', 'WTR_NM',
-                  'STRUC_FACE', 'STR_STN', 'LO_CHRD_EL', 'HI_CHRD_EL', 'STRMBED_EL',
-                  'LEN_UNIT', 'V_DATUM')
-
-        # Fields for specific checks
-        spec_list = (fields[2], 'STRUC_FACE', 'V_DATUM')
+        # Required fields and fields for specific checks
+        fields, spec_list = QC_RULES.field_lists('L_XS_Struct')
 
         # Get a dictionary of applicable and required fields
         required_fields, applicable_fields = self.__get_field_dict(in_table, fields)
@@ -5065,38 +5071,13 @@ class QCChecks:
             self.__printer("\t" + str(len(in_errors)) + " error(s) found")
             self.total_errors += len(in_errors)
 
-        # Write out to DBF file
+        # Write out to DBF file.  The table is written directly in a single pass rather than
+        # through arcpy.
         out_filename = self.out_folder + '\\' + table_name.lower() + '_errors.dbf'
-        if arcpy.Exists(out_filename):
-            arcpy.Delete_management(out_filename)
-
-        # Create the table
-        arcpy.CreateTable_management(self.out_folder, table_name.lower() + '_errors.dbf')
-
-        # Add the fields
-        arcpy.AddField_management(out_filename, "Unique_ID", "TEXT", field_length=25)
-        arcpy.AddField_management(out_filename, "Error", "TEXT", field_length=254)
-        arcpy.AddField_management(out_filename, "Comment", "TEXT", field_length=254)
-        arcpy.AddField_management(out_filename, "Response", "TEXT", field_length=254)
-
-        # Drop the extra field that's created
-        arcpy.DeleteField_management(out_filename, "Field1")
-
-        # Add the errors to the table
-        rows = arcpy.InsertCursor(out_filename)
-
-        for error in in_errors:
-            row = rows.newRow()
-            row.setValue("Unique_ID", error[0])
-            row.setValue("Error", error[1])
-            rows.insertRow(row)
-
-        # Delete the cursor/row objects
-        del row
-        del rows
+        write_dbf(out_filename, ERROR_TABLE_FIELDS, in_errors)
 
     def write_out_errors_exel(self, in_errors, table_name):
-        """Writes out the errors to a DBF file"""
+        """Writes out the errors to a worksheet of the Excel file"""
         # Return if no errors are present
         if not in_errors:
             self.__printer("\tNo errors found")
@@ -5105,78 +5086,13 @@ class QCChecks:
         self.__printer("\t" + str(len(in_errors)) + " error(s) found")
         self.total_errors += len(in_errors)
 
-        # Excel file to write to
-        out_filename = self.out_folder + '\\Errors.xlsx'
-
-        # Check to see if the Excel file exists, if not create it.
-        if not os.path.exists(out_filename):
-            new_workbook = openpyxl.Workbook()
-            new_workbook.save(out_filename)
-
-        # Open the workbook for writing
-        workbook = openpyxl.load_workbook(out_filename)
-
-        # Get a list of worksheets
-        sheet_names = workbook.get_sheet_names()
-
-        # If the worksheet for the current table doesn't exist, create it
-        if table_name not in sheet_names:
-            workbook.create_sheet(title=table_name)
-
-        # Remove the first sheet
-        if 'Sheet' in sheet_names:
-            workbook.remove_sheet(workbook.get_sheet_by_name('Sheet'))
-
-        # Set the current sheet to active
-        sheet = workbook.get_sheet_by_name(table_name)
-
-        # Add the Header
-        sheet['A1'].font = Font(size=12, bold=True)
-        sheet['B1'].font = Font(size=12, bold=True)
-        sheet['C1'].font = Font(size=12, bold=True)
-        sheet['D1'].font = Font(size=12, bold=True)
-        sheet['A1'].border = Border(bottom=Side(border_style="thick", color="00000f"))
-        sheet['B1'].border = Border(bottom=Side(border_style="thick", color="00000f"))
-        sheet['C1'].border = Border(bottom=Side(border_style="thick", color="00000f"))
-        sheet['D1'].border = Border(bottom=Side(border_style="thick", color="00000f"))
-        sheet['A1'].fill = PatternFill("solid", fgColor="DDDDDD")
-        sheet['B1'].fill = PatternFill("solid", fgColor="DDDDDD")
-        sheet['C1'].fill = PatternFill("solid", fgColor="DDDDDD")
-        sheet['D1'].fill = PatternFill("solid", fgColor="DDDDDD")
-        sheet['A1'].alignment = Alignment(horizontal="center")
-        sheet['B1'].alignment = Alignment(horizontal="center")
-        sheet['C1'].alignment = Alignment(horizontal="center")
-        sheet['D1'].alignment = Alignment(horizontal="center")
-        sheet['A1'] = "ID From Table"
-        sheet['B1'] = "Error Found"
-        sheet['C1'] = "Comment"
-        sheet['D1'] = "Response"
-
-        # Freeze top row
-        sheet.freeze_panes = "A2"
-
-        # Set dimensions
-        sheet.column_dimensions['A'].width = 15
-        sheet.column_dimensions['B'].width = 100
-        sheet.column_dimensions['C'].width = 50
-        sheet.column_dimensions['D'].width = 50
-
-        # Set the initial row
-        row = 2
-
-        # Write the errors to the Worksheet
-        for error in in_errors:
-            sheet['A' + str(row)].alignment = Alignment(horizontal="center")
-            sheet['A' + str(row)] = error[0]
-            sheet['B' + str(row)] = error[1]
-            row += 1
-
-        # Save the file
-        workbook.save(out_filename)
+        # Write the errors to a worksheet for the table
+        self.error_workbook.add_table(table_name, in_errors)
 
 
 if __name__ == '__main__':
 
+    qc_check = None
     try:
         workspace = sys.argv[1]
         output_folder = sys.argv[2]
@@ -5186,9 +5102,10 @@ if __name__ == '__main__':
         coded_check = sys.argv[6]
         shapefile_export = sys.argv[7]
         excel_export = sys.argv[8]
+        workers = sys.argv[9] if len(sys.argv) > 9 else 1
 
         qc_check = QCChecks(workspace, output_folder, mip_task, schema, tables,
-                            coded_check, shapefile_export, excel_export)
+                            coded_check, shapefile_export, excel_export, workers)
         qc_check.iterate_tables()
 
     except arcpy.ExecuteError:
@@ -5196,6 +5113,10 @@ if __name__ == '__main__':
         print(arcpy.GetMessages(2))
 
     finally:
+        # Write out the last stage records
+        if qc_check is not None:
+            qc_check.stage_log.close()
+
         # Delete the feature layer
         if arcpy.Exists("fc_lyr"):
             arcpy.Delete_management("fc_lyr")
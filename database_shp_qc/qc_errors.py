@@ -0,0 +1,179 @@
+"""Collects the errors found in a table without holding them all in memory"""
+
+import heapq
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+# Number of errors held in memory before they are sorted and written to a run file
+SPILL_THRESHOLD = 100000
+
+# Number of errors pickled together in a run file
+RUN_BATCH_SIZE = 5000
+
+
+def sort_key(unique_id):
+    """Orders the unique ids without converting them: None first, then numbers in numeric
+       order, then text"""
+    if unique_id is None:
+        return 0, 0
+    if isinstance(unique_id, (int, float)) and not isinstance(unique_id, bool):
+        return 1, unique_id
+    if isinstance(unique_id, str):
+        return 2, unique_id
+    return 3, type(unique_id).__name__, str(unique_id)
+
+
+def record_key(record):
+    """Orders the (unique id, rule code, arguments) records by unique id, then by rule"""
+    return sort_key(record[0]), record[1], record[2]
+
+
+class ErrorSink:
+    """Collects the [unique id, error message] pairs of one table.  Each message is split at its
+       double quotes into a rule template and the quoted values, and an error is held as a
+       compact (unique id, rule code, arguments) record against the interned templates.  Past
+       the spill threshold the records are sorted and written to a temporary run file, and
+       iterating the sink merges the run files back together in sorted order.  The unique ids
+       keep their type, so numeric ids sort as numbers."""
+
+    def __init__(self, table_name='', threshold=SPILL_THRESHOLD, temp_folder=None):
+        """Constructor: Receives the table name, the number of errors held in memory before
+           spilling to disk, and an optional folder for the run files"""
+        self.table_name = table_name
+        self.threshold = threshold
+        self.temp_folder = temp_folder
+        self.records = []  # (unique id, rule code, arguments) held in memory
+        self.templates = []  # Rule templates indexed by rule code
+        self.rule_codes = {}  # Rule code of each template
+        self.run_files = []  # Sorted run files spilled to disk
+        self.count = 0  # Total number of errors
+        self.owns_run_files = True  # The run files are deleted with the sink
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        """Yields the errors as [unique id, message] lists in sorted order"""
+        self.records.sort(key=record_key)
+        runs = [self.__read_run(run_file) for run_file in self.run_files]
+        for unique_id, rule_code, args in heapq.merge(self.records, *runs, key=record_key):
+            yield [unique_id, self.message(rule_code, args)]
+
+    def __del__(self):
+        if self.owns_run_files:
+            self.close()
+
+    def append(self, error):
+        """Adds an error.  Receives a [unique id, message] pair the same as a list append."""
+        self.records.append((error[0],) + self.rule(error[1]))
+        self.count += 1
+
+        if len(self.records) >= self.threshold:
+            self.spill()
+
+    def rule(self, message):
+        """Returns the (rule code, arguments) pair of a message.  The quoted values are the
+           arguments and the text around them is the rule template."""
+        parts = message.split('"')
+        template = tuple(parts[0::2])
+        rule_code = self.rule_codes.get(template)
+        if rule_code is None:
+            rule_code = self.rule_codes[template] = len(self.templates)
+            self.templates.append(template)
+        return rule_code, tuple(parts[1::2])
+
+    def message(self, rule_code, args):
+        """Rebuilds the message of a rule code and its arguments"""
+        template = self.templates[rule_code]
+        parts = [template[0]]
+        for arg, text in zip(args, template[1:]):
+            parts.extend((arg, text))
+        return '"'.join(parts)
+
+    def extend(self, errors):
+        """Adds every error in an iterable"""
+        for error in errors:
+            self.append(error)
+
+    def spill(self):
+        """Sorts the errors held in memory and writes them to a new run file"""
+        if not self.records:
+            return
+
+        self.records.sort(key=record_key)
+        handle, run_file = tempfile.mkstemp(prefix='qc_errors_', suffix='.run',
+                                            dir=self.temp_folder)
+        with os.fdopen(handle, 'wb') as out_file:
+            for start in range(0, len(self.records), RUN_BATCH_SIZE):
+                pickle.dump(self.records[start:start + RUN_BATCH_SIZE], out_file,
+                            pickle.HIGHEST_PROTOCOL)
+        self.run_files.append(run_file)
+
+        # Start over with an empty buffer.  The templates are kept, the run files refer to them.
+        self.records = []
+
+    def close(self):
+        """Deletes the run files"""
+        for run_file in self.run_files:
+            if os.path.exists(run_file):
+                os.remove(run_file)
+        self.run_files = []
+
+    def release(self):
+        """Leaves the run files to the process that unpickles the sink, such as when a worker
+           process returns the errors of a table, so they are not deleted with this sink.
+           Returns the sink."""
+        self.owns_run_files = False
+        return self
+
+    def __setstate__(self, state):
+        """The unpickled sink owns the run files it was handed"""
+        self.__dict__.update(state)
+        self.owns_run_files = True
+
+    @staticmethod
+    def __read_run(run_file):
+        """Yields the errors of a run file in the order they were written"""
+        with open(run_file, 'rb') as in_file:
+            while True:
+                try:
+                    batch = pickle.load(in_file)
+                except EOFError:
+                    return
+                for record in batch:
+                    yield record
+
+
+if __name__ == '__main__':
+    # Compares the sink against a plain list of errors sorted by unique id.  The message count is
+    # kept small the same as a real table, where most errors repeat the same few rules.
+    #   python qc_errors.py [error count]
+    error_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    templates = ['FLD_ZONE value of "{}" is not in domain'.format(zone)
+                 for zone in ('X', 'AE', 'A', 'VE', '0.2 PCT')]
+    errors = [[random.randrange(error_count), random.choice(templates)]
+              for _ in range(error_count)]
+
+    start = time.time()
+    expected = sorted(errors, key=lambda error: error[0])
+    list_seconds = time.time() - start
+
+    start = time.time()
+    sink = ErrorSink('S_Fld_Haz_Ar')
+    sink.extend(errors)
+    run_count = len(sink.run_files)
+    merged = list(sink)
+    matches = ([error[0] for error in merged] == [error[0] for error in expected]
+               and sorted(merged) == sorted(errors))
+    sink.close()
+    sink_seconds = time.time() - start
+
+    print("{:,} errors: sorted list {:.2f} s, sink {:.2f} s with {} run file(s), "
+          "same order: {}".format(error_count, list_seconds, sink_seconds, run_count, matches))
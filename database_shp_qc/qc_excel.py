@@ -0,0 +1,108 @@
+"""Writes the errors of every table to a single Excel workbook in one pass"""
+
+import os
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Border, Side, PatternFill, Font, Alignment
+
+# Header of each worksheet and the width of its column
+HEADER = [("ID From Table", 15), ("Error Found", 100), ("Comment", 50), ("Response", 50)]
+
+# Styles shared by every cell that uses them
+HEADER_FONT = Font(size=12, bold=True)
+HEADER_BORDER = Border(bottom=Side(border_style="thick", color="00000f"))
+HEADER_FILL = PatternFill("solid", fgColor="DDDDDD")
+CENTER = Alignment(horizontal="center")
+
+
+def sheet_order(table_name):
+    """Sort key of the worksheets.  The tables are added and the old worksheets are carried
+       over in this order."""
+    return table_name.lower()
+
+
+class ErrorWorkbook:
+    """Errors.xlsx for a whole QC run.  Each table is streamed to a write-only worksheet as it
+       is added and the workbook is saved once at the end of the run, so nothing is written if
+       the run stops early.  Worksheets of tables from an earlier run that were not checked
+       again are carried over, in table order among the new worksheets."""
+
+    def __init__(self, out_filename, checked_tables=()):
+        """Constructor: Receives the path of the Excel file and the names of the tables checked
+           during this run"""
+        self.out_filename = out_filename
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet_names = []  # Worksheets written during this run
+
+        # Worksheets of the earlier run to carry over, in table order
+        self.previous = None
+        self.carried_sheets = []
+        if os.path.exists(self.out_filename):
+            self.previous = openpyxl.load_workbook(self.out_filename, read_only=True)
+            checked = set(name.lower() for name in checked_tables)
+            self.carried_sheets = sorted((name for name in self.previous.sheetnames
+                                          if name.lower() not in checked and name != 'Sheet'),
+                                         key=sheet_order)
+
+    def add_table(self, table_name, errors):
+        """Writes the errors of a table to a new worksheet.  Receives the table name and the
+           errors as [unique id, message] pairs in the order they are written.  The tables are
+           expected in sheet_order."""
+        self.__carry_over(table_name)
+        sheet = self.__create_sheet(table_name)
+        for error in errors:
+            id_cell = WriteOnlyCell(sheet, value=error[0])
+            id_cell.alignment = CENTER
+            sheet.append([id_cell, error[1]])
+
+    def save(self):
+        """Saves the workbook"""
+        # Carry over the rest of the worksheets of the tables that were not checked during this run
+        self.__carry_over(None)
+        if self.previous is not None:
+            self.previous.close()
+            self.previous = None
+
+        # A workbook needs at least one worksheet
+        if not self.workbook.worksheets:
+            self.workbook.create_sheet(title='Sheet')
+
+        self.workbook.save(self.out_filename)
+
+    def __carry_over(self, before_name):
+        """Copies the worksheets of the earlier run that come before a table name, or all of the
+           ones left when the name is None"""
+        while self.carried_sheets and (before_name is None or
+                                       sheet_order(self.carried_sheets[0]) < sheet_order(before_name)):
+            sheet_name = self.carried_sheets.pop(0)
+            sheet = self.__create_sheet(sheet_name)
+            for row in self.previous[sheet_name].iter_rows(min_row=2, values_only=True):
+                id_cell = WriteOnlyCell(sheet, value=row[0] if row else None)
+                id_cell.alignment = CENTER
+                sheet.append([id_cell] + list(row[1:]))
+
+    def __create_sheet(self, sheet_name):
+        """Creates a worksheet with the header row"""
+        sheet = self.workbook.create_sheet(title=sheet_name)
+        self.sheet_names.append(sheet_name)
+
+        # Freeze top row
+        sheet.freeze_panes = "A2"
+
+        # Set dimensions
+        for column, (title, width) in zip('ABCD', HEADER):
+            sheet.column_dimensions[column].width = width
+
+        # Add the Header
+        header = []
+        for title, width in HEADER:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = HEADER_FONT
+            cell.border = HEADER_BORDER
+            cell.fill = HEADER_FILL
+            cell.alignment = CENTER
+            header.append(cell)
+        sheet.append(header)
+
+        return sheet
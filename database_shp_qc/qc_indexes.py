@@ -0,0 +1,144 @@
+"""Hash-based indexes shared by the QC checks"""
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+
+class CountingIndex:
+    """Counts how many times each value occurs so duplicate values and their multiplicity are
+       found in a single linear pass"""
+
+    def __init__(self, values=()):
+        """Constructor: Receives an optional iterable of values to count"""
+        self.counts = Counter(values)
+
+    def __len__(self):
+        """Number of distinct values"""
+        return len(self.counts)
+
+    def add(self, value):
+        """Counts one occurrence of a value"""
+        self.counts[value] += 1
+
+    def update(self, values):
+        """Counts every value in an iterable"""
+        self.counts.update(values)
+
+    def count(self, value):
+        """Returns the number of times a value occurs"""
+        return self.counts[value]
+
+    def duplicates(self):
+        """Returns a dictionary of the values that occur more than once and their counts"""
+        return dict((value, count) for value, count in self.counts.items() if count > 1)
+
+
+class KeyIndexCache:
+    """Holds the set of key values of each (table, field) pair for the length of a QC run so
+       the referential integrity checks read each foreign table only once"""
+
+    def __init__(self, loader, signature):
+        """Constructor: Receives a function that returns the values of a field in a table, and a
+           function that returns a signature of a table (such as its modified time and row
+           count).  A cached key set is reloaded when the signature of its table changes."""
+        self.loader = loader
+        self.signature = signature
+        self.key_sets = {}  # (table, field) -> (signature, frozenset of keys)
+        self.loads = 0  # Number of times a key set was read from a table
+
+    def keys(self, table, field):
+        """Returns the key values of the field as a frozenset of strings"""
+        signature = self.signature(table)
+        cached = self.key_sets.get((table, field))
+        if cached is None or cached[0] != signature:
+            cached = (signature, frozenset(str(value) for value in self.loader(table, field)))
+            self.key_sets[(table, field)] = cached
+            self.loads += 1
+
+        return cached[1]
+
+    def clear(self):
+        """Drops every cached key set"""
+        self.key_sets = {}
+
+
+class SchemaCache:
+    """Holds the field descriptions of each table for the length of a QC run so the schema of
+       a table is only read from the catalog once.  Counts the catalog calls made, the lookups
+       served and the ListFields calls the checks made before the cache, so the savings can be
+       reported."""
+
+    def __init__(self, loader):
+        """Constructor: Receives a function that returns the field descriptions of a table"""
+        self.loader = loader
+        self.schemas = {}  # Normalized table path -> list of field descriptions
+        self.catalog_calls = 0  # Number of times a schema was read from the catalog
+        self.lookups = 0  # Number of times a schema was requested
+        self.baseline_calls = 0  # ListFields calls made by the checks before the cache
+
+    def fields(self, table, baseline_calls=1):
+        """Returns the field descriptions of the table.  Receives the number of ListFields calls
+           the checks made in place of this lookup before the cache."""
+        self.lookups += 1
+        self.baseline_calls += baseline_calls
+        key = os.path.normcase(os.path.normpath(table))
+        schema = self.schemas.get(key)
+        if schema is None:
+            schema = self.schemas[key] = list(self.loader(table))
+            self.catalog_calls += 1
+
+        return schema
+
+    def field_names(self, table):
+        """Returns the field names of the table"""
+        return [field.name for field in self.fields(table)]
+
+    def counts(self):
+        """Returns the lookup, catalog call and baseline call counters"""
+        return self.lookups, self.catalog_calls, self.baseline_calls
+
+    def add_counts(self, lookups, catalog_calls, baseline_calls):
+        """Adds the counters of a cache used in a worker process"""
+        self.lookups += lookups
+        self.catalog_calls += catalog_calls
+        self.baseline_calls += baseline_calls
+
+    def clear(self):
+        """Drops every cached schema"""
+        self.schemas = {}
+
+
+def legacy_duplicates(values):
+    """The quadratic duplicate search CountingIndex replaced.  Only used for the benchmark."""
+    return list(set([x for n, x in enumerate(values) if x in values[:n]]))
+
+
+if __name__ == '__main__':
+    # Benchmarks duplicate detection on synthetic id columns with 1% duplicate values.  The
+    # quadratic search is only timed up to the size passed as the first argument (10k default).
+    #   python qc_indexes.py [max legacy rows]
+    legacy_limit = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    for row_count in (10000, 100000, 1000000):
+        ids = [str(number) for number in range(row_count)]
+        for position in random.sample(range(row_count), row_count // 100):
+            ids[position] = ids[position - 1]
+
+        start = time.time()
+        dupes = CountingIndex(ids).duplicates()
+        index_seconds = time.time() - start
+
+        if row_count <= legacy_limit:
+            start = time.time()
+            legacy_count = len(legacy_duplicates(ids))
+            legacy_time = "{:.3f} s".format(time.time() - start)
+            if legacy_count != len(dupes):
+                legacy_time += " (mismatch: {} duplicates)".format(legacy_count)
+        else:
+            legacy_time = "skipped"
+
+        print("{:>9,} rows: counting index {:.3f} s, {:,} duplicate values, "
+              "quadratic search {}".format(row_count, index_seconds, len(dupes), legacy_time))
@@ -0,0 +1,65 @@
+"""Registry of the QC check for each table and the metadata used to schedule the checks"""
+
+from collections import namedtuple
+
+
+class QCRule(namedtuple('QCRule', ['table', 'check', 'fields', 'spec_list', 'depends_on'])):
+    """The QC check of a table.  'check' is the function that checks the table, 'fields' are the
+       required fields, 'spec_list' the fields read by the specific checks, and 'depends_on'
+       the other tables the check reads."""
+    __slots__ = ()
+
+    @property
+    def read_fields(self):
+        """Every field the check reads from its own table"""
+        return sorted(set(self.fields + self.spec_list))
+
+    def estimated_cost(self, row_count):
+        """Relative cost of checking the table, measured in values read"""
+        return row_count * (len(self.read_fields) + len(self.depends_on))
+
+
+class RuleRegistry:
+    """Maps the table names to their QC rules.  The checks are registered with the 'register'
+       decorator."""
+
+    def __init__(self):
+        """Constructor"""
+        self.rules = {}  # Lower case table name -> QCRule
+
+    def __contains__(self, table_name):
+        return table_name.lower() in self.rules
+
+    def __getitem__(self, table_name):
+        return self.rules[table_name.lower()]
+
+    def field_lists(self, table_name):
+        """Returns new lists of the required fields and the fields for specific checks of a
+           table.  The checks can extend the lists for older schemas without changing the
+           registered rule."""
+        rule = self[table_name]
+        return list(rule.fields), list(rule.spec_list)
+
+    def register(self, table, fields=(), spec_list=(), depends_on=()):
+        """Decorator that registers a check function as the QC rule of a table"""
+        def decorator(check):
+            self.rules[table.lower()] = QCRule(table, check, tuple(fields), tuple(spec_list),
+                                               tuple(depends_on))
+            return check
+
+        return decorator
+
+    def schedule(self, row_counts):
+        """Orders the tables from the largest estimated cost to the smallest so the longest
+           checks start first.  Receives a dictionary of table paths and their row counts, keyed
+           by path, and returns the paths.  Ties are ordered by path."""
+        def cost(table_path):
+            return self.rules[table_key(table_path)].estimated_cost(row_counts[table_path])
+
+        return sorted(row_counts, key=lambda table_path: (-cost(table_path), table_path))
+
+
+def table_key(table_path):
+    """Returns the lower case table name of a table path, without the shapefile extensions"""
+    table_name = table_path.replace('/', '\\').split('\\')[-1]
+    return table_name.lower().replace(".shp", "").replace(".dbf", "")
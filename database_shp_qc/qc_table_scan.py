@@ -0,0 +1,339 @@
+"""Reads a table once into columns and runs the standard QC checks against those columns"""
+
+import datetime
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from qc_indexes import CountingIndex
+
+# The DBF module is shared with the tools in the parent folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dbf_tools import read_dbf, write_dbf
+
+# Field description used by the column tables.  Mirrors the arcpy.ListFields attributes used
+# by the QC checks.
+TableField = namedtuple('TableField', ['name', 'type', 'length', 'required'])
+
+# Compiled lookups of the domain dictionaries, keyed by the id of the dictionary
+DOMAIN_LOOKUPS = {}
+
+
+class DomainLookup:
+    """Frozen hash sets of the coded values and the text values of a domain"""
+
+    def __init__(self, domain_values):
+        """Constructor: Receives a domain dictionary of coded values and their text values"""
+        self.coded = frozenset(domain_values.keys())
+        self.text = frozenset(domain_values.values())
+
+    def check_values(self, coded_check):
+        """Returns the set of valid values when checking coded values or text values"""
+        return self.coded if coded_check else self.text
+
+
+def compile_domains(domains):
+    """Compiles each domain dictionary into a DomainLookup.  Called once at startup with the
+       module-level domain dictionaries."""
+    for domain_values in domains:
+        DOMAIN_LOOKUPS[id(domain_values)] = (domain_values, DomainLookup(domain_values))
+
+
+def domain_lookup(domain_values):
+    """Returns the compiled lookup of a domain dictionary, compiling it if needed"""
+    compiled = DOMAIN_LOOKUPS.get(id(domain_values))
+    if compiled is None or compiled[0] is not domain_values:
+        compile_domains([domain_values])
+        compiled = DOMAIN_LOOKUPS[id(domain_values)]
+
+    return compiled[1]
+
+
+class ColumnTable:
+    """The attribute values of a table held as one list per field"""
+
+    def __init__(self, name, fields, columns):
+        """Constructor: Receives the table name, a list of TableFields and a list of columns
+           in the same order as the fields"""
+        self.name = name
+        self.fields = fields
+        self.columns = dict(zip([field.name for field in fields], columns))
+        self.row_count = len(columns[0]) if columns else 0
+
+    def __len__(self):
+        return self.row_count
+
+    def column(self, field_name):
+        """Returns the list of values for a field"""
+        return self.columns[field_name]
+
+    def field_names(self, field_type=None):
+        """Returns the field names in table order, optionally only for a single field type"""
+        return [field.name for field in self.fields
+                if field_type is None or field.type == field_type]
+
+    @classmethod
+    def from_rows(cls, name, fields, rows):
+        """Builds the column table from an iterable of rows, such as a SearchCursor.  The text
+           values of each column are pooled so repeated values are only held in memory once."""
+        columns = [[] for _ in fields]
+        appenders = []
+        for field, column in zip(fields, columns):
+            if field.type == 'String':
+                pool = {}
+                appenders.append(lambda value, append=column.append, intern=pool.setdefault:
+                                 append(intern(value, value)))
+            else:
+                appenders.append(column.append)
+
+        for row in rows:
+            for append, value in zip(appenders, row):
+                append(value)
+
+        return cls(name, fields, columns)
+
+    @classmethod
+    def from_dbf(cls, path, encoding='latin-1'):
+        """Builds the column table from a DBF file.  Used to run the checks without ArcGIS."""
+        dbf_fields, records = read_dbf(path, encoding)
+        fields = [TableField(field.name, field.type, field.length, False) for field in dbf_fields]
+        name = os.path.splitext(os.path.basename(path))[0]
+        return cls.from_rows(name, fields, records)
+
+
+class StandardChecks:
+    """Standard checks performed on all tables.  Each check reads the columns of a ColumnTable
+       so the table only has to be read from disk once, and yields its errors as it finds them."""
+
+    def __init__(self, dfirm_id, source_citations, coded_check):
+        """Constructor: Receives the DFIRM_ID value(s) from S_Submittal_Info, the source
+           citations from L_Source_Cit, and whether to check coded values or text values"""
+        self.dfirm_id = dfirm_id
+        self.source_citations = source_citations
+        self.coded_check = coded_check
+        self.domain_tally = []  # (field, value, row count) of the values not in their domain
+        self.warnings = []  # Warnings of the last run, such as the fields missing in the table
+
+    def run(self, table, id_field, field_domains, required_fields, applicable_fields):
+        """Runs every standard check against the table and yields the errors as they are found.
+           The domain tally and the warnings are complete once every error has been read."""
+        self.domain_tally = []
+        self.warnings = []
+
+        # Check the DFIRM_ID values
+        yield from self.dfirm_id_check(table, id_field)
+
+        # Check the Source Citation values
+        yield from self.source_check(table, id_field)
+
+        # Check for unique id
+        yield from self.unique_id_check(table, id_field)
+
+        # Iterate through the field list and perform domain value checks
+        for field_name in table.field_names():
+            if field_name in field_domains.keys():
+                yield from self.domain_checks(table, field_name, field_domains[field_name],
+                                              id_field, required_fields)
+
+        # Iterate through the required fields and perform null checks
+        for key in required_fields.keys():
+            yield from self.required_null_checks(table, key, required_fields[key], id_field)
+
+        # Iterate through the applicable fields and perform null checks
+        for key in applicable_fields.keys():
+            yield from self.applicable_null_checks(table, key, applicable_fields[key],
+                                                   id_field)
+
+        # Check for extra spaces
+        yield from self.space_check(table, id_field)
+
+    def applicable_null_checks(self, table, in_field, in_field_type, id_field):
+        """Checks for appropriate null values for applicable fields"""
+        # Check for missing fields
+        if in_field not in table.columns:
+            self.warnings.append(in_field + ' missing in ' + table.name)
+            return
+
+        # Iterate through the rows
+        for unique_id, value in zip(table.column(id_field), table.column(in_field)):
+            error_found = False  # Flag if error is found
+
+            # Check for an empty field
+            if in_field_type in ['Text', 'String']:
+                if str(type(value)) == "<type 'str'>" and value is not None:
+                    if value.isspace() and len(value) > 1:
+                        error_found = True
+
+            # Check for correct NULL value for Numeric field types
+            if in_field_type in ['Double', 'Integer', 'SmallInteger']:
+                if value == -8888:  # Should be -9999 not -8888
+                    error_found = True
+                elif value is None:
+                    error_found = True
+
+            # Check for correct NULL value for Date field types
+            elif in_field_type == 'Date':
+                if '8888' in str(value):
+                    yield [str(unique_id), in_field + " value of 8/8/8888" +
+                           " is not an acceptable NULL value for applicable fields"]
+                elif not value:  # Date field is empty
+                    yield [str(unique_id), in_field + " should not be NULL"]
+
+                elif str(value).strip() == '':  # Date field is empty
+                    yield [str(unique_id), in_field + " should not be empty"]
+
+            # Yield the error if an error is found
+            if error_found:
+                yield [str(unique_id), in_field + " value of \"" + str(value) +
+                       "\" is not an acceptable NULL value for applicable fields"]
+
+    def dfirm_id_check(self, table, id_field):
+        """Checks the DFIRM_ID against the DFIRM_ID in S_Submittal_Info"""
+        # Check if the 'DFIRM_ID' field exists
+        if 'DFIRM_ID' not in table.columns:
+            return
+
+        # Iterate through the rows
+        for unique_id, dfirm_id in zip(table.column(id_field), table.column('DFIRM_ID')):
+            if dfirm_id not in self.dfirm_id:
+                yield [str(unique_id), "DFIRM_ID value of \"" + str(dfirm_id) +
+                       "\" does not match the DFIRM_ID value in S_Submittal_Info"]
+
+    def domain_checks(self, table, field, domain_values, id_field, required_fields):
+        """Checks the domain values of the tables.  The rows of each value that is not in the
+           domain are tallied so the error message is only built once per value."""
+        # Coded values or text values of the domain
+        check_values = domain_lookup(domain_values).check_values(self.coded_check)
+
+        # Tally the unique ids of the rows for each value not in the domain
+        invalid_values = {}
+        for unique_id, value in zip(table.column(id_field), table.column(field)):
+            if value not in check_values:
+                invalid_values.setdefault(value, []).append(unique_id)
+
+        for value, unique_ids in invalid_values.items():
+            # If it's a required field, it has to have a domain value.
+            # It can't be empty or Null.
+            # Else if it's an applicable field, it can be empty or Null
+            if field in required_fields or not (str(value).strip() != '' or value != "None"):
+                message = field + " value of \"" + str(value) + "\" is not in domain"
+                for unique_id in unique_ids:
+                    yield [str(unique_id), message]
+                self.domain_tally.append((field, value, len(unique_ids)))
+
+    @staticmethod
+    def required_null_checks(table, in_field, in_field_type, id_field):
+        """Checks for appropriate null values for required fields"""
+        # Iterate through the rows
+        for unique_id, value in zip(table.column(id_field), table.column(in_field)):
+            error_found = False  # Flag if error is found
+
+            # Check for an empty field
+            if in_field_type in ['Text', 'String']:
+                if value is None:
+                    error_found = True
+                elif isinstance(value, str):
+                    if value.isspace() or len(value) == 0:
+                        error_found = True
+
+            elif in_field_type in ['Double', 'Integer', 'SmallInteger']:
+                if value:
+                    if value == -9999:  # Should be -8888 not -9999
+                        error_found = True
+                elif value is None:
+                    error_found = True
+
+            elif in_field_type == 'Date':
+                if '9999' in str(value):  # Should be 8/8/8888 not 9/9/9999
+                    yield [str(unique_id), in_field + " value of 9/9/9999" +
+                           " is not an acceptable NULL value for required fields"]
+                elif not value:  # Date field is empty
+                    yield [str(unique_id), in_field + " should not be NULL"]
+
+                elif str(value).strip() == '':  # Date field is empty
+                    yield [str(unique_id), in_field + " should not be empty"]
+
+            if error_found:
+                yield [str(unique_id), in_field + " value of \"" + str(value) +
+                       "\" is not an acceptable NULL value for required fields"]
+
+    def source_check(self, table, id_field):
+        """Checks for matching source citation between the input table and L_Source_Cit"""
+        # Check if the 'SOURCE_CIT' field exists
+        if 'SOURCE_CIT' in table.columns:
+            # Iterate through the rows
+            for unique_id, source_cit in zip(table.column(id_field),
+                                             table.column('SOURCE_CIT')):
+                if str(source_cit) not in self.source_citations:
+                    yield [str(unique_id), "SOURCE_CIT value of \"" + str(source_cit) +
+                           "\" does not match any values in L_Source_Cit"]
+
+    @staticmethod
+    def space_check(table, id_field):
+        """Checks for extra spaces in each text field of the table"""
+        # Get a list of text fields in the table
+        field_names = table.field_names('String')
+
+        # Remove the id_field and put it at the front of the list
+        field_names.remove(id_field)
+        field_names.insert(0, id_field)
+        columns = [table.column(field_name) for field_name in field_names]
+
+        # Iterate through the rows
+        for row in zip(*columns):
+            # Column counter
+            col = 1  # Start at 1 to skip the id_field at the beginning of the list
+
+            # Iterate through the columns
+            while col < len(field_names):
+                if row[col]:
+                    if len(row[col]) != len(row[col].strip()) and len(row[col]) > 1:
+                        yield [str(row[0]), field_names[col] + " has an extra space."]
+                col += 1
+
+    @staticmethod
+    def unique_id_check(table, in_field, error_message="Duplicate unique id found in "):
+        """Checks for unique id values"""
+        dupes = CountingIndex(table.column(in_field)).duplicates()
+
+        # Check for duplicate unique ids
+        for dupe in dupes:
+            yield [dupe, error_message + in_field]
+
+
+if __name__ == '__main__':
+    # Times the standard checks against a DBF table without ArcGIS.  Every text field other
+    # than the id field is treated as a required field.  Without a table, a fixture of
+    # S_Fld_Haz_Ar rows with 10% bad values is written to the temp folder and checked.
+    #   python qc_table_scan.py [<table.dbf> <id field> [rows]]
+    if len(sys.argv) > 2:
+        table_path, table_id_field = sys.argv[1], sys.argv[2]
+    else:
+        table_path, table_id_field = os.path.join(tempfile.gettempdir(), 'S_Fld_Haz_Ar.dbf'), 'FLD_AR_ID'
+        row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+        write_dbf(table_path, [('FLD_AR_ID', 'C', 25, 0), ('DFIRM_ID', 'C', 6, 0),
+                               ('FLD_ZONE', 'C', 17, 0), ('SOURCE_CIT', 'C', 11, 0),
+                               ('STATIC_BFE', 'N', 19, 11), ('EFF_DATE', 'D', 8, 0)],
+                  ([str(number), '48001C' if number % 10 else '48002C',
+                    'AE' if number % 10 else 'AE ', 'STUDY1' if number % 10 else 'STUDY9',
+                    100.5 if number % 10 else None, datetime.datetime(2020, 1, 1)]
+                   for number in range(row_count)))
+
+    start = time.time()
+    dbf_table = ColumnTable.from_dbf(table_path)
+    read_seconds = time.time() - start
+
+    required = dict((field.name, field.type) for field in dbf_table.fields
+                    if field.type == 'String' and field.name != table_id_field)
+    applicable = dict((field.name, field.type) for field in dbf_table.fields
+                      if field.type != 'String')
+    checks = StandardChecks(['48001C'], ['STUDY1'], True)
+    start = time.time()
+    found = sum(1 for _ in checks.run(dbf_table, table_id_field, {}, required, applicable))
+    check_seconds = time.time() - start
+
+    print("{} rows, {} fields".format(len(dbf_table), len(dbf_table.fields)))
+    print("Read: {:.2f} seconds".format(read_seconds))
+    print("Checks: {:.2f} seconds, {} error(s)".format(check_seconds, found))
@@ -0,0 +1,355 @@
+"""Reads, writes and edits the dBASE (.dbf) attribute tables of shapefiles without arcpy.  The QC
+checks read their local tables and write their error tables with it as well."""
+import codecs
+import datetime
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # Only fill_dbf_nulls needs NumPy
+    np = None
+
+# The field types arcpy.ListFields reports for the dBASE field types
+FIELD_TYPES = {'C': 'String', 'D': 'Date', 'F': 'Double', 'L': 'String', 'N': 'Double'}
+
+# Records read and written at a time when a .dbf file is written
+WRITE_BATCH_SIZE = 10000
+
+
+class DbfField(namedtuple('DbfField', ['name', 'dbf_type', 'length', 'decimals', 'offset'], defaults=(0,))):
+    """Field descriptor from a .dbf header.  The offset is the byte position of the field within
+    a record, after the deletion flag.  Fields that are only written don't need one."""
+    __slots__ = ()
+
+    @property
+    def type(self):
+        """The field type arcpy reports for the field of a shapefile"""
+        if self.dbf_type == 'N' and self.decimals == 0:
+            return 'SmallInteger' if self.length <= 4 else 'Integer' if self.length <= 9 else 'Double'
+        return FIELD_TYPES.get(self.dbf_type, 'String')
+
+    def parse(self, raw, encoding='latin-1'):
+        """Converts the bytes of the field in one record to a value.  A blank field is None, except
+        for text, which is an empty string."""
+        if self.dbf_type == 'C':
+            return raw.decode(encoding, 'replace').rstrip(' \x00')
+        text = raw.strip(b' \x00')
+        if not text or text.startswith(b'*'):
+            return None
+        if self.dbf_type in ('N', 'F'):
+            return float(text) if self.type == 'Double' else int(text)
+        if self.dbf_type == 'D':
+            if not text.strip(b'0'):
+                return None
+            return datetime.datetime.strptime(text.decode('ascii'), '%Y%m%d')
+        if self.dbf_type == 'L':
+            return text.decode('ascii').upper()
+        return text.decode(encoding, 'replace')
+
+    def encode(self, value, encoding='latin-1'):
+        """Converts a value to the fixed-width bytes of the field.  None is a blank field.  Dates
+        can be a datetime or a m/d/yyyy string.  Raises ValueError for a whole number wider than
+        its field."""
+        if value is None:
+            return b' ' * self.length
+        if self.dbf_type in ('N', 'F'):
+            if self.decimals:
+                # A value too large for its decimals gives them up, and then falls back to exponent notation
+                number = float(value)
+                for decimals in range(self.decimals, -1, -1):
+                    text = f'{number:.{decimals}f}'
+                    if len(text) <= self.length:
+                        break
+                else:
+                    text = f'{number:.{max(self.length - 8, 0)}e}'
+            else:
+                text = str(int(float(value)))
+            if len(text) > self.length:
+                raise ValueError(f'{value} does not fit in {self.name} ({self.length} characters)')
+            return text.rjust(self.length).encode('ascii')
+        if self.dbf_type == 'D':
+            if isinstance(value, str):
+                value = datetime.datetime.strptime(value, '%m/%d/%Y')
+            return value.strftime('%Y%m%d').encode('ascii')
+        if self.dbf_type == 'L':
+            return b'T' if value in (True, 'T', 'Y') else b'F' if value in (False, 'F', 'N') else b'?'
+        data = str(value).encode(encoding, 'replace')
+        if len(data) > self.length:
+            # Cut at the last whole character, as a multibyte character can't be split
+            data = data[:self.length].decode(encoding, 'ignore').encode(encoding)
+        return data.ljust(self.length)
+
+
+def read_header(dbf_path):
+    """Returns the record count, header length, record length and fields of a .dbf file"""
+    with open(dbf_path, 'rb') as dbf_file:
+        record_count, header_length, record_length = struct.unpack('<IHH', dbf_file.read(32)[4:12])
+        fields = []
+        offset = 1  # Byte 0 of each record is the deletion flag
+        while True:
+            descriptor = dbf_file.read(32)
+            if not descriptor or descriptor[0] == 0x0D:
+                break
+            name = descriptor[:11].split(b'\x00')[0].decode('ascii')
+            fields.append(DbfField(name, chr(descriptor[11]), descriptor[16], descriptor[17], offset))
+            offset += descriptor[16]
+    return record_count, header_length, record_length, fields
+
+
+def read_dbf(dbf_path, encoding='latin-1'):
+    """Reads a .dbf file.  Returns its fields and a generator of the records that aren't deleted,
+    as tuples of values in field order."""
+    record_count, header_length, record_length, fields = read_header(dbf_path)
+
+    def records():
+        with open(dbf_path, 'rb') as dbf_file:
+            dbf_file.seek(header_length)
+            for _ in range(record_count):
+                record = dbf_file.read(record_length)
+                if len(record) < record_length:
+                    break
+                if record[:1] == b'*':  # Deleted record
+                    continue
+                yield tuple(field.parse(record[field.offset:field.offset + field.length], encoding)
+                            for field in fields)
+
+    return fields, records()
+
+
+def dbf_encoding(dbf_path):
+    """Returns the text encoding of a .dbf file from the .cpg file next to it, or latin-1 without one"""
+    cpg_path = os.path.splitext(dbf_path)[0] + '.cpg'
+    if os.path.exists(cpg_path):
+        with open(cpg_path) as cpg_file:
+            name = cpg_file.read().strip()
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            pass
+    return 'latin-1'
+
+
+def write_header(dbf_file, fields, record_count, language_driver=0):
+    """Writes the header of a .dbf file for DbfField descriptors.  Returns the record length."""
+    today = datetime.date.today()
+    header_length = 32 + 32 * len(fields) + 1
+    record_length = 1 + sum(field.length for field in fields)
+    dbf_file.write(struct.pack('<BBBBIHH17xB2x', 0x03, today.year - 1900, today.month, today.day,
+                               record_count, header_length, record_length, language_driver))
+    for field in fields:
+        dbf_file.write(struct.pack('<11sc4xBB14x', field.name.encode('ascii')[:10],
+                                   field.dbf_type.encode('ascii'), field.length, field.decimals))
+    dbf_file.write(b'\x0D')
+    return record_length
+
+
+def write_dbf(dbf_path, fields, records, encoding='latin-1'):
+    """Writes a .dbf file.  Receives a DbfField or (name, dbf type, length, decimals) for each field
+    and an iterable of records, each a sequence of values in field order.  Fields missing at the end
+    of a record are left blank.  The records are written in batches and the record count is filled
+    in once they are all written.  Returns the number of records written."""
+    fields = [DbfField(*field[:4]) for field in fields]
+    record_count = 0
+    with open(dbf_path, 'wb') as dbf_file:
+        write_header(dbf_file, fields, 0)
+        batch = []
+        for record in records:
+            values = list(record) + [None] * (len(fields) - len(record))
+            batch.append(b' ' + b''.join(field.encode(value, encoding) for field, value in zip(fields, values)))
+            if len(batch) == WRITE_BATCH_SIZE:
+                dbf_file.write(b''.join(batch))
+                record_count += len(batch)
+                batch = []
+        dbf_file.write(b''.join(batch))
+        record_count += len(batch)
+        dbf_file.write(b'\x1A')
+
+        # Fill in the record count
+        dbf_file.seek(4)
+        dbf_file.write(struct.pack('<I', record_count))
+
+    return record_count
+
+
+def domain_description_value(code, description):
+    """The value a code field gets from its domain description field.  A code with a digit in it
+    takes the description, as does a code shorter than its description.  A blank code without a
+    description is 'NP'."""
+    value = code
+    if description and any(x.isdigit() for x in code):
+        value = description
+    if len(description) > len(value):
+        value = description
+    elif value in ('', ' ') and description in ('', ' '):
+        value = 'NP'
+    return value
+
+
+def substitute_domain_descriptions(dbf_path, field_pairs, keep_temp=False, encoding='latin-1'):
+    """Writes the domain descriptions of a .dbf file into their code fields in one pass.  field_pairs
+    holds (code field, description field) pairs, applied in order.  The records are read once and the
+    final table is written to a temporary file that replaces the original, without the description
+    fields.  Each code field is widened to the length of its description fields, up to 254 characters.
+    With keep_temp, each code field keeps its original values in a <code field>_t field.  Deleted
+    records are copied as they are, so the records still line up with the shapes.  Returns
+    the record count and the number of values changed per code field."""
+    record_count, header_length, record_length, fields = read_header(dbf_path)
+    by_name = dict((field.name, field) for field in fields)
+    with open(dbf_path, 'rb') as dbf_file:
+        language_driver = dbf_file.read(32)[29]
+
+    # Only text codes can take a description
+    pairs = [(by_name[code], by_name[description]) for code, description in field_pairs
+             if by_name[code].dbf_type == 'C']
+    codes = []
+    for code, description in pairs:
+        if code not in codes:
+            codes.append(code)
+    drop = set(description for code, description in field_pairs)
+
+    # Each code field is widened to its longest description field, so no description is cut short
+    widths = dict((code.name, code.length) for code in codes)
+    for code, description in pairs:
+        widths[code.name] = min(max(widths[code.name], description.length), 254)
+
+    # The other kept fields are copied from their place in the input records
+    out_fields = [field for field in fields if field.name not in drop]
+    written_fields = [field._replace(length=widths[field.name]) if field.name in widths else field
+                      for field in out_fields]
+    temp_fields = []
+    if keep_temp:
+        for code in codes:
+            name = code.name + '_t' if len(code.name) <= 8 else code.name[:8] + '_t'
+            temp_fields.append(DbfField(name, 'C', code.length, 0, code.offset))
+
+    def text(record, field):
+        return record[field.offset:field.offset + field.length].decode(encoding, 'replace').strip(' \x00')
+
+    field_changes = dict((code.name, 0) for code in codes)
+    temp_path = dbf_path + '.tmp'
+    with open(dbf_path, 'rb') as dbf_file, open(temp_path, 'wb') as out_file:
+        write_header(out_file, written_fields + temp_fields, record_count, language_driver)
+        dbf_file.seek(header_length)
+        remaining = record_count
+        while remaining:
+            batch = min(remaining, WRITE_BATCH_SIZE)
+            data = dbf_file.read(batch * record_length)
+            remaining -= batch
+            out_records = []
+            for start in range(0, batch * record_length, record_length):
+                record = data[start:start + record_length]
+                values = {}
+                if record[0:1] != b'*':
+                    for code, description in pairs:
+                        value = values.get(code.name, text(record, code))
+                        values[code.name] = domain_description_value(value, text(record, description))
+                    for code in codes:
+                        if values[code.name] != text(record, code):
+                            field_changes[code.name] += 1
+                        else:
+                            del values[code.name]
+                parts = [record[0:1]]
+                for field, written in zip(out_fields, written_fields):
+                    if field.name in values:
+                        parts.append(written.encode(values[field.name], encoding))
+                    elif written is not field:
+                        parts.append(written.encode(text(record, field), encoding))
+                    else:
+                        parts.append(record[field.offset:field.offset + field.length])
+                for field in temp_fields:
+                    parts.append(record[field.offset:field.offset + field.length])
+                out_records.append(b''.join(parts))
+            out_file.write(b''.join(out_records))
+        out_file.write(b'\x1A')
+    os.replace(temp_path, dbf_path)
+
+    return record_count, field_changes
+
+
+def fill_dbf_nulls(dbf_path, plan, field_names, dry_run=False, on_change=None):
+    """Writes the FEMA NULL values into the blank cells of a .dbf file in place.  The file is
+    memory-mapped as a NumPy array of fixed-width records, so finding the blank cells of a field is
+    one comparison over the whole column.  plan is the NullRulePlan of the fields named in
+    field_names, the same plan as the cursor-based calculation.  A blank numeric or date cell is a
+    NULL, and a blank text cell is an empty string.  on_change is called with the field name, the
+    record numbers, the old value and the new value of each field that changes.  Returns the record
+    count and the number of cells changed per field."""
+    record_count, header_length, record_length, fields = read_header(dbf_path)
+    by_name = dict((field.name, field) for field in fields)
+    field_changes = {}
+    if record_count == 0 or not plan.steps:
+        return record_count, field_changes
+
+    records = np.memmap(dbf_path, dtype=np.uint8, mode='r' if dry_run else 'r+', offset=header_length,
+                        shape=(record_count, record_length))
+    live = records[:, 0] != ord('*')  # Skip deleted records
+
+    for i, blanks, replacement in plan.steps:
+        field = by_name[field_names[i]]
+        if field.dbf_type == 'L':  # Logical fields only hold T, F or ?, not the NULL values
+            continue
+        # The value a blank cell has when it's read through a cursor
+        blank_value = "" if field.type == 'String' else None
+        if blank_value not in blanks:
+            continue
+        try:
+            new_bytes = field.encode(replacement)
+        except ValueError:  # The field is too narrow to hold the NULL value
+            continue
+        if not new_bytes.strip():  # The replacement is a blank cell as well
+            continue
+
+        column = records[:, field.offset:field.offset + field.length]
+        blank = ((column == 0x20) | (column == 0)).all(axis=1) & live
+        count = int(blank.sum())
+        if count:
+            field_changes[field.name] = count
+            if on_change:
+                on_change(field.name, np.flatnonzero(blank), blank_value, replacement)
+            if not dry_run:
+                column[blank] = np.frombuffer(new_bytes, dtype=np.uint8)
+
+    if not dry_run:
+        records.flush()
+    del records
+
+    return record_count, field_changes
+
+
+if __name__ == '__main__':
+    from null_rules import NullRulePlan
+
+    # Generates a .dbf fixture with 10% blank cells, fills its NULLs and substitutes its domain
+    # descriptions
+    #   python dbf_tools.py <fixture.dbf> [rows]
+    fixture_path = sys.argv[1]
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    fixture_fields = [('FLD_AR_ID', 'C', 25, 0), ('FLD_ZONE', 'C', 17, 0), ('SFHA_TF', 'C', 1, 0),
+                      ('STATIC_BFE', 'N', 13, 2), ('DEPTH', 'N', 13, 2), ('EFF_DATE', 'D', 8, 0),
+                      ('BFE_REVERT', 'N', 13, 2), ('SEQ', 'N', 9, 0), ('d_FLD_ZONE', 'C', 50, 0)]
+    fixture_values = ['1', 'AE', 'T', 100.5, 2.0, datetime.datetime(2020, 1, 1), 1.0, 1, 'Zone AE']
+    rows = [[None if n % 10 == column else value for column, value in enumerate(fixture_values)]
+            for n in range(row_count)]
+    write_dbf(fixture_path, fixture_fields, rows)
+
+    header_fields = read_header(fixture_path)[3]
+    names = [field.name for field in header_fields]
+    fixture_plan = NullRulePlan(header_fields, ["STATIC_BFE", "DEPTH", "BFE_REVERT"], ["OBJECTID"])
+    start = time.time()
+    fixture_count, changes = fill_dbf_nulls(fixture_path, fixture_plan, names)
+    print(f'{fixture_count:,} records filled in {time.time() - start:.3f} s: {changes}')
+    print(f'Nothing left to fill: {fill_dbf_nulls(fixture_path, fixture_plan, names, True)[1] == {}}')
+    print(f'{os.path.basename(fixture_path)}: {os.path.getsize(fixture_path):,} bytes')
+
+    start = time.time()
+    fixture_count, changes = substitute_domain_descriptions(fixture_path, [('FLD_ZONE', 'd_FLD_ZONE')])
+    print(f'{fixture_count:,} records substituted in {time.time() - start:.3f} s: {changes}')
+    print(f'Fields left: {[field.name for field in read_header(fixture_path)[3]]}')
+
+    start = time.time()
+    read_count = sum(1 for _ in read_dbf(fixture_path)[1])
+    print(f'{read_count:,} records read back in {time.time() - start:.3f} s')
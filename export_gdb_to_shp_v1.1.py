@@ -4,19 +4,183 @@ import arcpy
 import sys
 import os
 import time
+import json
+import hashlib
+import struct
 import logging
+from concurrent.futures import as_completed
+from arc_workers import worker_pool
 from static_tools import StaticTools
+from dbf_tools import dbf_encoding, read_header, substitute_domain_descriptions
+from shp_tools import DBF_FIELD_TYPES, DROP_FIELDS, SHAPE_TYPES, export_rows
+from stage_timing import StageLog
+
+# Fingerprints of the exported layers, kept in the output folder between runs
+MANIFEST_NAME = 'export_manifest.json'
+
+# Rows read from the start of a layer for the checksum of its fingerprint
+SAMPLE_ROWS = 1000
+
+# Files that make up an exported shapefile or table
+OUTPUT_EXTENSIONS = ['.shp', '.shx', '.dbf', '.prj', '.cpg', '.sbn', '.sbx', '.shp.xml', '.dbf.xml']
+
+
+def row_count(inpath):
+    """Returns the number of rows in a feature class or table.  Geodatabases store the count, so
+    GetCount doesn't read the rows.  If GetCount fails, the cursor stops after the first row and the
+    result only tells if the table is empty (0) or not (1)."""
+    try:
+        return int(arcpy.management.GetCount(inpath)[0])
+    except arcpy.ExecuteError:
+        with arcpy.da.SearchCursor(inpath, ['OID@']) as cursor:
+            return 1 if next(iter(cursor), None) is not None else 0
+
+
+def layer_summary(inpath, count, kind):
+    """Returns the part of a layer's fingerprint that's read from its metadata: its row count, a hash of
+    its schema and its extent.  No rows are read."""
+    fields = arcpy.ListFields(inpath)
+    schema = repr([(field.name, field.type, field.length, field.domain) for field in fields])
+    extent = None
+    if kind == 'fc':
+        description = arcpy.Describe(inpath)
+        if description.extent:
+            extent = [description.extent.XMin, description.extent.YMin, description.extent.XMax,
+                      description.extent.YMax]
+    return {'count': count, 'schema': hashlib.sha1(schema.encode('utf-8')).hexdigest(), 'extent': extent}
+
+
+def rows_checksum(inpath, kind):
+    """Returns a checksum of the first SAMPLE_ROWS rows of a layer.  The cursor stops after them, so a
+    large layer isn't read in full."""
+    names = [field.name for field in arcpy.ListFields(inpath) if field.type in DBF_FIELD_TYPES]
+    if kind == 'fc':
+        names.append('SHAPE@WKB')
+    checksum = hashlib.sha1()
+    with arcpy.da.SearchCursor(inpath, names) as cursor:
+        for n, row in enumerate(cursor):
+            if n == SAMPLE_ROWS:
+                break
+            checksum.update(repr(row).encode('utf-8'))
+    return checksum.hexdigest()
+
+
+def output_complete(outpath, count, kind):
+    """Tells if the files of an export are all there and hold the expected number of records"""
+    base = os.path.splitext(outpath)[0]
+    try:
+        if read_header(base + '.dbf')[0] != count:
+            return False
+        if kind == 'fc':
+            # The .shp header holds the file length it was finished with
+            with open(base + '.shp', 'rb') as shp_file:
+                shp_length, = struct.unpack('>i', shp_file.read(100)[24:28])
+            return (shp_length * 2 == os.path.getsize(base + '.shp')
+                    and (os.path.getsize(base + '.shx') - 100) // 8 == count)
+    except (OSError, struct.error):
+        return False
+    return True
+
+
+def inventory_dataset(workspace, output_folder, dataset=None):
+    """Lists the feature classes of a feature dataset, or the stand-alone tables when no dataset is
+    given, with their row counts.  Returns (input path, output path, row count, kind, summary) for each
+    one, where the summary is the metadata part of the fingerprint.  Empty ones have no summary."""
+    arcpy.env.workspace = workspace
+    if dataset is None:
+        names, kind, ext = sorted(arcpy.ListTables()), 'table', 'dbf'
+    else:
+        names, kind, ext = sorted(arcpy.ListFeatureClasses("", "", dataset)), 'fc', 'shp'
+
+    items = []
+    for name in names:
+        inpath = os.path.join(workspace, dataset, name) if dataset else os.path.join(workspace, name)
+        outpath = os.path.join(output_folder, f'{name}.{ext}')
+        count = row_count(inpath)
+        items.append((inpath, outpath, count, kind, layer_summary(inpath, count, kind) if count else None))
+
+    return items
+
+
+def export_job(inpath, outpath, output_folder, kind):
+    """Exports one feature class to a shapefile, or one table to a DBF file.  Returns the name and the
+    seconds it took."""
+    start = time.time()
+    name = os.path.split(inpath)[1]
+    if kind == 'fc':
+        arcpy.env.transferDomains = True
+        arcpy.conversion.FeatureClassToFeatureClass(inpath, output_folder, name)
+        arcpy.AddSpatialIndex_management(outpath)
+        arcpy.management.RepairGeometry(outpath, validation_method='OGC')
+    else:
+        arcpy.conversion.TableToDBASE(inpath, output_folder)
+    return name, time.time() - start
+
+
+def coded_domains(workspace):
+    """Returns the coded value domains of the workspace, domain name -> {code: description}"""
+    domains = {}
+    for domain in arcpy.da.ListDomains(workspace):
+        if domain.domainType == 'CodedValue':
+            domains[domain.name] = dict((str(code), str(value)) for code, value in domain.codedValues.items())
+    return domains
+
+
+def native_export_job(inpath, outpath, output_folder, kind, domains, keep_temp):
+    """Exports one feature class to a shapefile, or one table to a DBF file, with the shp_tools writer.
+    The domain descriptions, read once for the workspace by coded_domains, and the field drops are
+    applied while the rows are written, and no .cpg or .xml files are made.  Returns the name and the
+    seconds it took."""
+    start = time.time()
+    name = os.path.split(inpath)[1]
+    description = arcpy.Describe(inpath)
+    shape_type, prj, drop = None, None, ()
+    if kind == 'fc':
+        if description.hasZ or description.hasM or description.shapeType not in SHAPE_TYPES:
+            # The writer doesn't hold Z or M values, so these go through arcpy.  Their "d_" fields and
+            # extra files are left for substitute_domain_fields and remove_extra_files.
+            export_job(inpath, outpath, output_folder, kind)
+            drop = [field.name for field in arcpy.ListFields(outpath)
+                    if field.name in DROP_FIELDS and not field.required]
+            if drop:
+                arcpy.management.DeleteField(outpath, drop)
+            return name, time.time() - start
+        shape_type = SHAPE_TYPES[description.shapeType]
+        prj = description.spatialReference.exportToString().split(';')[0]
+        drop = DROP_FIELDS
+
+    fields = [field for field in arcpy.ListFields(inpath) if field.type in DBF_FIELD_TYPES]
+    if kind == 'fc':
+        with arcpy.da.SearchCursor(inpath, ['SHAPE@WKB'] + [field.name for field in fields]) as cursor:
+            export_rows(outpath, shape_type, fields, cursor, domains, drop, keep_temp, prj)
+    else:
+        with arcpy.da.SearchCursor(inpath, [field.name for field in fields]) as cursor:
+            export_rows(outpath, None, fields, ((None,) + row for row in cursor), domains, drop, keep_temp)
+    return name, time.time() - start
 
 
 class ExportShapefiles:
     """Exports all the feature classes and tables within a workspace that contain data"""
 
-    def __init__(self, workspace, output_folder, keep_temp):
+    def __init__(self, workspace, output_folder, keep_temp, workers=1, backend='arcpy'):
         """Constructor"""
         self.workspace = workspace
         self.output_folder = output_folder
 
         self.keep_temp = keep_temp
+        self.workers = workers  # Worker processes for the inventory and the exports
+        self.backend = backend  # 'arcpy' conversion tools or the 'native' shapefile writer
+        self.format_input_values()  # keep_temp is stored in the manifest as a bool
+
+        # Inventory of the workspace: input path -> (output path, row count, kind, summary).  Taken
+        # once and used by the later stages.
+        self.inventory = None
+
+        # Fingerprints of the layers already exported: input path -> {'output', 'fingerprint', 'options',
+        # 'exported'}
+        self.manifest_path = os.path.join(self.output_folder, MANIFEST_NAME)
+        self.manifest = self.load_manifest()
+        self.checksums = {}  # Row checksums read during this run: input path -> checksum
 
         # Table and FC dictionaries
         self.fc_dict = {}
@@ -25,6 +189,7 @@ class ExportShapefiles:
         self.domain_fields = {}
 
         self.exported = []
+        self.job_times = {}  # Seconds taken by each export job
 
         # Set the workspace
         arcpy.env.workspace = self.workspace
@@ -60,61 +225,115 @@ class ExportShapefiles:
 
         return root_folder, run_options
 
-    def find_feature_classes(self):
-        """Exports the feature classes that have data to shapefiles"""
-        # List of feature datasets
-        datasets = arcpy.ListDatasets()
-
-        # Dictionary of items to export
-        export_dict = {}
-        record_counts = {}
-
-        # Walk through each in_dataset
-        for dataset in datasets:
-            fc_list = arcpy.ListFeatureClasses("", "", dataset)
-            fc_list.sort()
-
-            # Walk through the feature classes and store them
-            for fc in fc_list:
-                # Generate in/out paths
-                inpath = os.path.join(self.workspace, dataset, fc)
-                outpath = os.path.join(self.output_folder, f'{fc}.shp')
-
-                # If not empty and not already in output, add to dictionary
-                if os.path.exists(outpath):
-                    arcpy.AddWarning(str(fc) + " already exists.  Skipping.")
-                else:
-                    count = sum(1 for row in arcpy.da.SearchCursor(inpath, ['OID@']))
-                    if count != 0:
-                        export_dict[inpath] = outpath
-                        record_counts[inpath] = count
-
-        self.fc_dict = export_dict
-        self.record_counts = record_counts
+    def take_inventory(self):
+        """Lists the feature classes of every dataset and the stand-alone tables with their row
+        counts.  The datasets are listed concurrently when more than one worker is allowed."""
+        jobs = sorted(arcpy.ListDatasets()) + [None]
+        workers = min(self.workers, len(jobs))
 
-    def find_tables(self):
-        """Exports the tables that have data to shapefiles"""
-        # List of tables
-        table_list = arcpy.ListTables()
-        table_list.sort()
+        if workers > 1:
+            with worker_pool(workers) as executor:
+                results = list(executor.map(inventory_dataset, [self.workspace] * len(jobs),
+                                            [self.output_folder] * len(jobs), jobs))
+        else:
+            results = [inventory_dataset(self.workspace, self.output_folder, dataset) for dataset in jobs]
+        arcpy.env.workspace = self.workspace
 
-        table_dict = {}
+        inventory = {}
+        for items in results:
+            for inpath, outpath, count, kind, summary in items:
+                inventory[inpath] = (outpath, count, kind, summary)
+        self.inventory = inventory
+
+    def load_manifest(self):
+        """Reads the manifest of an earlier run, or starts an empty one"""
+        try:
+            with open(self.manifest_path) as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self):
+        """Writes the manifest to a temporary file that replaces the old one, so a crash leaves the last
+        complete manifest behind"""
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def export_options(self):
+        """The options that change the exported files.  A layer exported with other options is exported
+        again."""
+        return {'backend': self.backend, 'keep_temp': self.keep_temp}
+
+    def checksum(self, inpath):
+        """Returns the row checksum of a layer, read once per run"""
+        if inpath not in self.checksums:
+            self.checksums[inpath] = rows_checksum(inpath, self.inventory[inpath][2])
+        return self.checksums[inpath]
+
+    def is_current(self, inpath):
+        """Tells if a layer's export is complete, was made with the same options and its source hasn't
+        changed since.  The rows are only read for the checksum once the metadata and the output
+        match."""
+        outpath, count, kind, summary = self.inventory[inpath]
+        entry = self.manifest.get(inpath)
+        if (entry is None or entry['output'] != outpath or entry.get('options') != self.export_options()
+                or any(entry['fingerprint'].get(key) != value for key, value in summary.items())
+                or not output_complete(outpath, count, kind)):
+            return False
+        return entry['fingerprint'].get('checksum') == self.checksum(inpath)
+
+    def record_export(self, inpath):
+        """Adds an exported layer to the manifest and saves it"""
+        outpath, count, kind, summary = self.inventory[inpath]
+        layer_fingerprint = dict(summary, checksum=self.checksum(inpath))
+        self.manifest[inpath] = {'output': outpath, 'fingerprint': layer_fingerprint,
+                                 'options': self.export_options(), 'exported': time.time()}
+        self.save_manifest()
+
+    def forget_export(self, inpath):
+        """Removes the output and the manifest entry of a layer that no longer has data"""
+        entry = self.manifest.pop(inpath, None)
+        if entry is not None:
+            arcpy.AddMessage(f'{os.path.split(inpath)[1]} is now empty.  Removing its earlier export.')
+            self.clear_output(entry['output'])
+            self.save_manifest()
+
+    def find_layers(self, layer_kind):
+        """Finds the layers of a kind that have data to export and aren't already exported and unchanged.
+        A layer that's now empty has its earlier export removed.  Returns input path -> output path."""
+        if self.inventory is None:
+            self.take_inventory()
+
+        layers = {}
+        for inpath, (outpath, count, kind, summary) in self.inventory.items():
+            if kind != layer_kind:
+                continue
+            if count == 0:
+                self.forget_export(inpath)
+                continue
+            if self.is_current(inpath):
+                arcpy.AddWarning(os.path.split(inpath)[1] + " is already exported and unchanged.  Skipping.")
+                continue
+            layers[inpath] = outpath
+            self.record_counts[inpath] = count
+        return layers
 
-        for table in table_list:
-            inpath = os.path.join(self.workspace, table)
-            outpath = os.path.join(self.output_folder, f'{table}.dbf')
+    def find_feature_classes(self):
+        """Finds the feature classes that have data to export to shapefiles"""
+        self.fc_dict = self.find_layers('fc')
 
-            # Add the table if it's not empty and doesn't already exist
-            if os.path.exists(outpath):
-                print(str(table) + " already exists.  Skipping.")
-                arcpy.AddWarning(str(table) + " already exists.  Skipping.")
-            else:
-                count = sum(1 for row in arcpy.da.SearchCursor(inpath, ['OID@']))
-                if count != 0:
-                    table_dict[inpath] = outpath
-                    self.record_counts[inpath] = count
+    def find_tables(self):
+        """Finds the tables that have data to export to DBF files"""
+        self.table_dict = self.find_layers('table')
 
-        self.table_dict = table_dict
+    def clear_output(self, outpath):
+        """Removes the files left by an earlier export of a layer, complete or not"""
+        base = os.path.splitext(outpath)[0]
+        for ext in OUTPUT_EXTENSIONS:
+            if os.path.exists(base + ext):
+                os.remove(base + ext)
 
     def drop_fields(self):
         """Drop fields from the exported shapefiles"""
@@ -173,250 +392,120 @@ class ExportShapefiles:
         if arcpy.Exists(self.output_folder + os.sep + 'X_MASK.shp'):
             arcpy.Delete_management(self.output_folder + os.sep + 'X_MASK.shp')
 
+    def export_jobs(self):
+        """Returns the export jobs, (input path, output path, kind), largest first so the biggest layers
+        don't start last and hold up the run"""
+        jobs = [(inpath, outpath, 'fc') for inpath, outpath in self.fc_dict.items()]
+        jobs += [(inpath, outpath, 'table') for inpath, outpath in self.table_dict.items()]
+        return sorted(jobs, key=lambda job: (-self.record_counts.get(job[0], 0), job[0]))
+
     def export_files(self):
 
         exported = []
+        jobs = self.export_jobs()
+        if self.backend == 'native':
+            job_function, job_args = native_export_job, (coded_domains(self.workspace), self.keep_temp)
+        else:
+            job_function, job_args = export_job, ()
+        workers = min(self.workers, len(jobs))
 
-        for inpath, outpath in self.fc_dict.items():
-            name = os.path.split(inpath)[1]
-            arcpy.env.transferDomains = True
-            arcpy.conversion.FeatureClassToFeatureClass(inpath, self.output_folder, name)
-            arcpy.AddSpatialIndex_management(outpath)
-            arcpy.management.RepairGeometry(outpath, validation_method='OGC')
-            arcpy.AddMessage(f'  {name}\n   exported to  {self.output_folder}\n')
-            exported.append(name)
+        # Outputs of changed layers and of runs that stopped part way are exported again
+        for inpath, outpath, kind in jobs:
+            self.clear_output(outpath)
+            self.manifest.pop(inpath, None)
 
-        for inpath, outpath in self.table_dict.items():
-            name = os.path.split(inpath)[1]
-            arcpy.conversion.TableToDBASE(inpath, self.output_folder)
-            arcpy.AddMessage(f'  {name}\n   exported to {self.output_folder}\n')
+        def finished(inpath, name, seconds):
+            arcpy.AddMessage(f'  {name}\n   exported to {self.output_folder} in {seconds:.1f} seconds\n')
             exported.append(name)
+            self.job_times[name] = seconds
+            self.record_export(inpath)
+
+        if workers > 1:
+            # Each job writes its own files, so the jobs run in a pool of worker processes
+            with worker_pool(workers) as executor:
+                futures = dict((executor.submit(job_function, inpath, outpath, self.output_folder, kind, *job_args),
+                                inpath) for inpath, outpath, kind in jobs)
+                for future in as_completed(futures):
+                    finished(futures[future], *future.result())
+        else:
+            for inpath, outpath, kind in jobs:
+                finished(inpath, *job_function(inpath, outpath, self.output_folder, kind, *job_args))
 
         self.exported = exported
 
-    def populate_domain_fields(self):
-
-        arcpy.env.workspace = self.output_folder
-
-        # Populate dictionary with: domain description fields AND their associated code fields
+    def substitute_domain_fields(self):
+        """Writes the domain descriptions of the "d_" fields into their code fields and removes the "d_"
+        fields.  Each DBF file is read and rewritten once, with every field pair resolved in the same pass."""
         domain_dict = {}
 
-        fc_list = arcpy.ListFeatureClasses() + arcpy.ListTables()
-        for fc in fc_list:
-            fields_todelete = []
-            field_pairs = []
-            fc_path = os.path.join(self.output_folder, fc)
-            domain_dict[fc_path] = {'Del Field List': fields_todelete, 'Field Pairs': field_pairs}
+        for filename in sorted(os.listdir(str(self.output_folder))):
+            if not filename.lower().endswith('.dbf'):
+                continue
+            dbf_path = os.path.join(self.output_folder, filename)
 
-            field_list = [f.name for f in arcpy.ListFields(fc)]
-            # arcpy.AddMessage(f'{fc}: {field_list}')
+            # Pair each domain description field with its code fields
+            field_pairs = []
+            field_list = [field.name for field in read_header(dbf_path)[3]]
             for fname in field_list:
-
                 if fname.startswith('d_'):
-                    arcpy.AddMessage(f' |{fc}|\n  - Found {fname}')
+                    arcpy.AddMessage(f' |{filename}|\n  - Found {fname}')
                     domain_postfix = fname.split('d_')[1]
                     for fema_field in field_list:
                         if fema_field.startswith(domain_postfix):
                             field_pairs.append((fema_field, fname))
-                            fields_todelete.append(fname)
-            # arcpy.AddMessage(f'{fc} has {len(fields_todelete)} domain fields to delete...')
+            domain_dict[dbf_path] = field_pairs
+            if not field_pairs:
+                continue
 
-            # Add field pairs and fields to delete to dictionary
-            domain_dict[fc_path]['Del Field List'] = fields_todelete
-            domain_dict[fc_path]['Field Pairs'] = field_pairs
+            arcpy.AddMessage(f'  Populating {len(field_pairs)} domain-sourced fields for {filename}')
+            arcpy.AddMessage(f'Field Pairs: {field_pairs}')
+            record_count, field_changes = substitute_domain_descriptions(dbf_path, field_pairs, self.keep_temp,
+                                                                         dbf_encoding(dbf_path))
+            arcpy.AddMessage(f' Removed all "d_" fields from {filename} ({record_count} records, '
+                             f'{sum(field_changes.values())} values replaced)')
 
         self.domain_fields = domain_dict
 
-    def create_temp_field(self):
-
-        for shp_path, dictionary in self.domain_fields.items():
-            shp_name = os.path.split(shp_path)[1]
-
-            field_pair_list = dictionary['Field Pairs']
-            field_pair_list_static = field_pair_list.copy()
-            if len(field_pair_list) > 0:
-                arcpy.AddMessage(f'  Populating {len(field_pair_list)} domain-sourced fields for {shp_name}')
-                arcpy.AddMessage(f'Field Pairs: {field_pair_list}')
-            for pair in field_pair_list_static:
-                target_field = pair[0]
-                source_field = pair[1]
-
-                # Create new field to hold original field values
-                new_field_name = target_field + "_t"
-                arcpy.management.AddField(shp_path, new_field_name, "Text", field_length='500')
-
-                # Update field "pairs" to include temp
-                old_pair = pair
-                add_pair = (new_field_name,)
-                # arcpy.AddMessage(f'Type of old_pair: {type(old_pair)}, Type of add_pair: {type(add_pair)}')
-                # arcpy.AddMessage(f'Old Pair: {old_pair}, New Pair: {add_pair}')
-                new_pair = old_pair + add_pair
-                field_pair_list.remove(pair)
-                field_pair_list.append(new_pair)
-
-                # Add delete field *if* not a mix of domains and values
-                if not self.keep_temp:
-                    del_fields = self.domain_fields[shp_path]['Del Field List']
-                    del_fields.append(new_field_name)
-
-    def update_domain_fields(self):
-
-        # Update fields with domain descriptions found earlier
-        for shp_path, dictionary in self.domain_fields.items():
-            shp_name = os.path.split(shp_path)[1]
-
-            field_pair_list = dictionary['Field Pairs']
-            # arcpy.AddMessage(f'SHP: {shp_name}, Pairs: {field_pair_list}')
-            if len(field_pair_list) > 0:
-                arcpy.AddMessage(f'  Populating {len(field_pair_list)} domain-sourced fields for {shp_name}')
-            for pair in field_pair_list:
-                target_field = pair[0]
-                source_field = pair[1]
-                temp_field = pair[2]
-
-                with arcpy.da.UpdateCursor(shp_path, [target_field, source_field, temp_field]) as u_cursor:
-                    for urow in u_cursor:
-                        urow[2] = urow[0]
-
-                        target = urow[0]
-                        source = urow[1]
-
-                        for x in target:
-                            if x.isdigit():
-                                if source is not None and source != '':
-                                    target = source
-                                    break
-                                break
-                        if len(source) > len(target):
-                            target = source
-                        elif target in [None, '', ' '] and source in [None, '', ' ']:
-                            target = 'NP'
-
-                        urow[0] = target
-                        u_cursor.updateRow(urow)
-                del u_cursor
-
-    def delete_domain_description_fields(self):
-
-        arcpy.env.workspace = self.output_folder
-        # Delete domain-description fields transferred to SHP files
-        for shp_path, dictionary in self.domain_fields.items():
-            f_del_list = dictionary['Del Field List']
-            shp_name = os.path.split(shp_path)[1]
-            if len(f_del_list) > 0:
-                try:
-                    arcpy.management.DeleteField(shp_path, f_del_list)
-                    arcpy.AddMessage(f' Successfully deleted all "d_" fields from {shp_name}')
-                except:
-                    del_count = 0
-                    for field in f_del_list:
-                        arcpy.management.DeleteField(shp_path, [field])
-                        del_count += 1
-                        f_del_list.remove(field)
-                    if del_count >= len(f_del_list):
-                        arcpy.AddMessage(f' Individually deleted all "d_" fields from {shp_name}')
-                    else:
-                        arcpy.AddMessage(f' Was not able to delete: {f_del_list} in {shp_name}')
-
     def run_all(self):
         """Run all required methods"""
-
-        # Start timer
-        times_recorded = {'Start': time.time()}
         rootfolder, run_options = self.get_rootdir_get_runoptions()
-        timer = TimeReports(workspace=rootfolder, options=run_options)
-
-        self.find_feature_classes()
-        self.find_tables()
-        times_recorded['Found GDB files'] = time.time()
-
-        self.export_files()
-        times_recorded[f'Exported {len(self.exported)} files'] = time.time()
-        timer.time_reporter(times=times_recorded, new_iter=True, class_name='ExportShapefiles')
-
-        self.populate_domain_fields()
-        self.create_temp_field()
-        self.update_domain_fields()
-        times_recorded['Populated fields with domain descriptions'] = time.time()
-        timer.time_reporter(times=times_recorded, new_iter=False, class_name='ExportShapefiles')
-
-        self.delete_domain_description_fields()
-        times_recorded['Deleted "d_" fields'] = time.time()
-        timer.time_reporter(times=times_recorded, new_iter=False, class_name='ExportShapefiles')
-
-        # self.remove_fmd_compliance()
-        self.remove_extra_files()
-        self.drop_fields()
-        times_recorded['Dropped extra fields and files'] = time.time()
-        timer.time_reporter(times=times_recorded, new_iter=False, class_name='ExportShapefiles')
-
-
-class TimeReports:
-
-    def __init__(self, workspace, options):
-
-        self.times_dictionary = None
-        self.start_time = None
-        self.printed = []
-
-        self.workspace = workspace
-        self.options = options
-
-    def get_start_time(self):
-
-        start_time = 0
-        for heading, a_time in self.times_dictionary.items():
-            if 'start' in heading.lower():
-                start_time = a_time
-                break
-        self.start_time = start_time
-
-    def append_dictionary(self, times):
-
-        if not self.times_dictionary:
-            self.times_dictionary = times
-        else:
-            self.times_dictionary = self.times_dictionary.update(times)
-
-    def time_reporter(self, times, new_iter, class_name):
-
-        # Check for existing values
-        self.append_dictionary(times)
-        if not self.start_time:
-            self.get_start_time()
-
-        time_results = os.path.join(self.workspace, f"time_results_{class_name}.txt")
-        time_printout = open(time_results, "a")
-        if new_iter:
-            time_printout.writelines(f"\n\n    ---- THIS IS A NEW ITERATION ----\n\n")
-            for option_def, option in self.options.items():
-                time_printout.writelines(f'\n{option_def}: {option}')
-        time_printout.close()
-
-        timenames = list(times.keys())
-        elapsed_times = {}
-        self.times_dictionary = self.times_dictionary.update(times)
-
-        for timename in timenames:
-            if timename not in self.printed:
-                total_seconds = times[timename]
-                elapsed = total_seconds - self.start_time
-                hours = elapsed // 3600
-                elapsed = elapsed - 3600 * hours
-                minutes = elapsed // 60
-                elapsed = elapsed - 60 * minutes
-                seconds = round(elapsed, 2)
-                elapsed_times[timename] = (hours, minutes, seconds)
-                print(f"{timename} processing finished after: {hours} hours, {minutes} minutes, {seconds} seconds")
-                time_printout = open(time_results, "a")
-                time_printout.writelines(f"\n{timename}: \n{hours} hours, {minutes} minutes, {seconds} seconds\n")
-                time_printout.close()
-                self.printed.append(timename)
+        stage_log = StageLog('ExportShapefiles', rootfolder, workspace=self.workspace,
+                             output_folder=self.output_folder, backend=self.backend, workers=self.workers)
+
+        with stage_log.stage('run_all'):
+            with stage_log.stage('find_gdb_files') as record:
+                self.find_feature_classes()
+                self.find_tables()
+                record['rows'] = sum(self.record_counts.values())
+
+            with stage_log.stage('export_files') as record:
+                self.export_files()
+                record['rows'] = sum(self.record_counts.values())
+                record['files'] = len(self.exported)
+                # The jobs are timed in the worker processes
+                rows = dict((os.path.split(path)[1], count) for path, count in self.record_counts.items())
+                for name, seconds in sorted(self.job_times.items(), key=lambda item: -item[1]):
+                    stage_log.add('export_job', seconds, rows.get(name), layer=name)
+
+            # The native writer has already replaced the domain codes and left out the extra fields and
+            # files.  These passes only find work in the layers it handed to arcpy.
+            with stage_log.stage('substitute_domain_fields') as record:
+                self.substitute_domain_fields()
+                record['files'] = len(self.domain_fields)
+
+            with stage_log.stage('drop_extra_fields_and_files'):
+                # self.remove_fmd_compliance()
+                self.remove_extra_files()
+                if self.backend != 'native':
+                    self.drop_fields()
+        stage_log.close()
 
 
 if __name__ == "__main__":
     try:
-        export_shapefiles = ExportShapefiles(sys.argv[1], sys.argv[2], sys.argv[3])
+        worker_count = int(sys.argv[4]) if len(sys.argv) > 4 and sys.argv[4].isdigit() else 1
+        export_backend = sys.argv[5] if len(sys.argv) > 5 and sys.argv[5] not in ['#', ''] else 'arcpy'
+        export_shapefiles = ExportShapefiles(sys.argv[1], sys.argv[2], sys.argv[3], worker_count, export_backend)
         export_shapefiles.run_all()
 
     except arcpy.ExecuteError:
@@ -0,0 +1,130 @@
+"""Compiled FEMA NULL value rules for the fields of a table.  Has no arcpy dependency."""
+import random
+import sys
+import time
+from collections import namedtuple
+
+# FEMA NULL values for applicable fields by field type.  Empty text is set to a real NULL.
+APPLICABLE_NULLS = {'String': None, 'Date': "9/9/9999", 'Double': '-9999'}
+
+# FEMA NULL values for required fields by field type.  True/false (1 character) text fields get 'U'.
+REQUIRED_NULLS = {'String': "NP", 'Date': "8/8/8888", 'Double': '-8888'}
+
+# Values replaced in applicable fields.  A NULL is already correct for an applicable field.
+APPLICABLE_BLANKS = frozenset(["", " "])
+
+# Values replaced in required fields
+REQUIRED_BLANKS = frozenset(["", " ", None])
+
+# Field description used for the benchmark.  arcpy Field objects have the same attributes.
+NullField = namedtuple('NullField', ['name', 'type', 'length'])
+
+
+class NullRulePlan:
+    """The NULL rule of each field of a table, compiled once per table.  Each field that can
+    change is a step of (field index, values to replace, replacement value).  Every other field
+    is a no-op and isn't looked at by the row loop."""
+
+    def __init__(self, fields, applicable_fields, skip_fields):
+        """Receives the fields in cursor order, the applicable fields of the table and the
+        fields to skip"""
+        self.steps = []  # (field index, values to replace, replacement value)
+        self.applicable_count = 0  # Applicable fields per row
+        self.required_count = 0  # Required fields per row
+
+        for i, field in enumerate(fields):
+            if field.name in skip_fields:
+                continue
+
+            if field.name in applicable_fields:
+                self.applicable_count += 1
+                blanks = APPLICABLE_BLANKS
+                nulls = APPLICABLE_NULLS
+            else:
+                self.required_count += 1
+                blanks = REQUIRED_BLANKS
+                nulls = REQUIRED_NULLS
+
+            if field.type in nulls:
+                replacement = nulls[field.type]
+                if field.type == 'String' and nulls is REQUIRED_NULLS and field.length == 1:
+                    replacement = "U"  # True/false fields
+                self.steps.append((i, blanks, replacement))
+
+    def changes(self, row):
+        """Returns the (field index, old value, new value) of each cell in the row that changes"""
+        return [(i, row[i], replacement) for i, blanks, replacement in self.steps if row[i] in blanks]
+
+    def apply(self, row):
+        """Writes the NULL values into a row list.  Returns the number of cells changed."""
+        changed = 0
+        for i, blanks, replacement in self.steps:
+            if row[i] in blanks:
+                row[i] = replacement
+                changed += 1
+        return changed
+
+
+def legacy_null_value(applicable_fields, skip_fields, field, value):
+    """The per-cell rule CalculateNull used before the plans.  Only used for the benchmark."""
+    new_value = value
+    if field.name in applicable_fields and field.name not in skip_fields:
+        correct_nulls = (None, "9/9/9999", '-9999')
+        if value in ["", " ", None] and value not in correct_nulls:
+            if field.type == 'String':
+                new_value = None
+            elif field.type == 'Date':
+                new_value = "9/9/9999"
+            elif field.type == 'Double':
+                new_value = '-9999'
+    elif field.name not in skip_fields:
+        correct_nulls = ('U', "8/8/8888", '-8888', "NP", -8888)
+        if value in ["", " ", None] and value not in correct_nulls:
+            if field.type == 'String':
+                if field.length == 1:  # True/false fields
+                    new_value = "U"
+                else:
+                    new_value = "NP"
+            elif field.type == 'Date':
+                new_value = "8/8/8888"
+            elif field.type == 'Double':
+                new_value = '-8888'
+    return new_value
+
+
+if __name__ == '__main__':
+    # Compares the per-cell rule against the compiled plan on a synthetic table of 20 fields with
+    # 10% blank cells.  The first argument is the number of cells (1M by default).
+    #   python null_rules.py [cells]
+    cell_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    skip = ["OBJECTID", "SHAPE", "SHAPE_Length", "SHAPE_Area", "X_SCALE"]
+    table_fields = [NullField('OBJECTID', 'OID', 4)]
+    for n in range(19):
+        table_fields.append(NullField(f'FIELD_{n}', ('String', 'Double', 'Date')[n % 3], 1 if n == 0 else 50))
+    applicable = [field.name for field in table_fields[1::2]]
+    samples = {'OID': [1], 'String': ['A', 'B', '', ' ', None], 'Double': [1.5, 2.0, None],
+               'Date': ['1/1/2020', None, '']}
+    rows = []
+    for oid in range(cell_count // len(table_fields)):
+        rows.append([oid] + [random.choice(samples[f.type]) if random.random() < 0.1 else samples[f.type][0]
+                             for f in table_fields[1:]])
+    cells = len(rows) * len(table_fields)
+
+    start = time.time()
+    legacy_changes = 0
+    for row in rows:
+        for field, value in zip(table_fields, row):
+            if legacy_null_value(applicable, skip, field, value) != value:
+                legacy_changes += 1
+    legacy_seconds = time.time() - start
+
+    start = time.time()
+    plan = NullRulePlan(table_fields, applicable, skip)
+    plan_changes = 0
+    for row in rows:
+        plan_changes += plan.apply(row)
+    plan_seconds = time.time() - start
+
+    print(f'{cells:,} cells, {plan_changes:,} changes (per-cell rule found {legacy_changes:,})')
+    print(f'Per-cell rule: {cells / legacy_seconds:,.0f} cells/s')
+    print(f'Compiled plan: {cells / plan_seconds:,.0f} cells/s')
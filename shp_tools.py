@@ -0,0 +1,298 @@
+"""Writes shapefiles (.shp, .shx, .dbf and .prj) from WKB geometry and attribute rows without arcpy"""
+import math
+import os
+import random
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from dbf_tools import DbfField, domain_description_value, read_header, write_header
+
+# Shapefile shape types by the shape type arcpy describes
+SHAPE_TYPES = {'Point': 1, 'Polyline': 3, 'Polygon': 5, 'Multipoint': 8}
+
+# DBF (type, length, decimals) by arcpy field type.  Text fields keep their own length up to 254.
+# Integers have room for their sign.  Doubles that don't fit 11 decimals are written with fewer.
+DBF_FIELD_TYPES = {'SmallInteger': ('N', 6, 0), 'Integer': ('N', 11, 0), 'BigInteger': ('N', 20, 0),
+                   'Single': ('N', 19, 11), 'Double': ('N', 19, 11), 'Date': ('D', 8, 0),
+                   'String': ('C', 254, 0), 'GUID': ('C', 38, 0), 'GlobalID': ('C', 38, 0)}
+
+# Fields dropped from the exported feature classes, the same as ExportShapefiles.drop_fields
+DROP_FIELDS = ('SHAPE_Leng', 'SHAPE_Area', 'OBJECTID')
+
+# Source field description.  arcpy Field objects have the same attributes.
+SourceField = namedtuple('SourceField', ['name', 'type', 'length', 'domain'])
+
+
+def read_wkb(data, offset=0, parts=None, outer=None):
+    """Reads the points of a WKB geometry into parts, each a list of (x, y).  outer gets a flag per
+    part that's True for the first ring of each polygon.  Z and M values are dropped.  Returns the
+    offset after the geometry, the parts and the flags."""
+    parts = [] if parts is None else parts
+    outer = [] if outer is None else outer
+    order = '<' if data[offset] == 1 else '>'
+    wkb_type, = struct.unpack_from(order + 'I', data, offset + 1)
+    offset += 5
+    if wkb_type & 0x20000000:  # EWKB with an SRID
+        offset += 4
+    dimensions = 2 + bool(wkb_type & 0x80000000) + bool(wkb_type & 0x40000000)
+    wkb_type &= 0x0FFFFFFF
+    dimensions += (0, 1, 1, 2)[wkb_type // 1000]  # ISO Z, M and ZM types
+    wkb_type %= 1000
+
+    def read_points(position):
+        count, = struct.unpack_from(order + 'I', data, position)
+        values = struct.unpack_from(f'{order}{count * dimensions}d', data, position + 4)
+        return list(zip(values[0::dimensions], values[1::dimensions])), position + 4 + 8 * count * dimensions
+
+    if wkb_type == 1:
+        values = struct.unpack_from(order + 'd' * dimensions, data, offset)
+        if not math.isnan(values[0]):  # An empty point is NaN
+            parts.append([values[:2]])
+            outer.append(False)
+        return offset + 8 * dimensions, parts, outer
+    if wkb_type == 2:
+        points, offset = read_points(offset)
+        parts.append(points)
+        outer.append(False)
+        return offset, parts, outer
+    if wkb_type == 3:
+        ring_count, = struct.unpack_from(order + 'I', data, offset)
+        offset += 4
+        for n in range(ring_count):
+            points, offset = read_points(offset)
+            parts.append(points)
+            outer.append(n == 0)
+        return offset, parts, outer
+    if wkb_type in (4, 5, 6, 7):  # Multi-part geometries and collections
+        count, = struct.unpack_from(order + 'I', data, offset)
+        offset += 4
+        for _ in range(count):
+            offset = read_wkb(data, offset, parts, outer)[0]
+        return offset, parts, outer
+    raise ValueError(f'Unsupported WKB geometry type {wkb_type}')
+
+
+def ring_area(ring):
+    """Twice the signed area of a ring.  Positive when the ring runs counterclockwise."""
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:]))
+
+
+def shape_content(shape_type, parts, outer):
+    """Returns the .shp record content of a shape and its bounding box.  Polygon rings are closed and
+    turned clockwise for outer rings and counterclockwise for holes, as shapefiles require."""
+    parts = [part for part in parts if part]
+    if not parts:
+        return struct.pack('<i', 0), None  # Null shape
+
+    if shape_type == 5:
+        rings = []
+        for ring, is_outer in zip(parts, outer):
+            if ring[0] != ring[-1]:
+                ring = ring + [ring[0]]
+            if (ring_area(ring) > 0) == is_outer:
+                ring = ring[::-1]
+            rings.append(ring)
+        parts = rings
+
+    points = [point for part in parts for point in part]
+    if shape_type == 1:
+        x, y = points[0]
+        return struct.pack('<idd', 1, x, y), (x, y, x, y)
+
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    box = (min(xs), min(ys), max(xs), max(ys))
+    coordinates = struct.pack(f'<{2 * len(points)}d', *[value for point in points for value in point])
+    if shape_type == 8:
+        return struct.pack('<i4di', 8, *box, len(points)) + coordinates, box
+
+    starts = []
+    start = 0
+    for part in parts:
+        starts.append(start)
+        start += len(part)
+    return struct.pack(f'<i4d2i{len(parts)}i', shape_type, *box, len(parts), len(points), *starts) + coordinates, box
+
+
+class ShapefileWriter:
+    """Streams shapes and attribute records into a shapefile.  The headers are written with
+    placeholder counts and bounds and completed by close().  Without a shape type only the .dbf file
+    is written, for stand-alone tables."""
+
+    def __init__(self, path, shape_type, fields, prj=None, encoding='utf-8'):
+        """Receives the output path, the shapefile shape type, (name, dbf type, length, decimals) for
+        each field and the projection WKT"""
+        base = os.path.splitext(path)[0]
+        self.shape_type = shape_type
+        self.fields = [DbfField(name, dbf_type, length, decimals, 0) for name, dbf_type, length, decimals in fields]
+        self.encoding = encoding
+        self.count = 0
+        self.box = None
+        self.shp_length = 50  # In 16-bit words, the unit of the .shp and .shx headers
+
+        self.shp_file = self.shx_file = None
+        if shape_type is not None:
+            self.shp_file = open(base + '.shp', 'wb')
+            self.shx_file = open(base + '.shx', 'wb')
+            self.shp_file.write(bytes(100))
+            self.shx_file.write(bytes(100))
+            if prj:
+                with open(base + '.prj', 'w') as prj_file:
+                    prj_file.write(prj)
+        self.dbf_file = open(base + '.dbf', 'wb')
+        write_header(self.dbf_file, self.fields, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, parts, outer, record):
+        """Writes a shape, as parts and outer ring flags from read_wkb, and its attribute values"""
+        if self.shape_type is not None:
+            content, box = shape_content(self.shape_type, parts, outer)
+            words = len(content) // 2
+            self.shx_file.write(struct.pack('>ii', self.shp_length, words))
+            self.shp_file.write(struct.pack('>ii', self.count + 1, words))
+            self.shp_file.write(content)
+            self.shp_length += 4 + words
+            if box:
+                if self.box is None:
+                    self.box = box
+                else:
+                    self.box = (min(self.box[0], box[0]), min(self.box[1], box[1]),
+                                max(self.box[2], box[2]), max(self.box[3], box[3]))
+        self.dbf_file.write(b' ' + b''.join(field.encode(value, self.encoding)
+                                            for field, value in zip(self.fields, record)))
+        self.count += 1
+
+    def close(self):
+        """Completes the headers with the record count, file lengths and bounds and closes the files"""
+        if self.dbf_file.closed:
+            return
+        if self.shape_type is not None:
+            box = self.box or (0.0, 0.0, 0.0, 0.0)
+            for out_file, length in ((self.shp_file, self.shp_length), (self.shx_file, 50 + 4 * self.count)):
+                out_file.seek(0)
+                out_file.write(struct.pack('>7i', 9994, 0, 0, 0, 0, 0, length))
+                out_file.write(struct.pack('<2i8d', 1000, self.shape_type, *box, 0, 0, 0, 0))
+                out_file.close()
+        self.dbf_file.write(b'\x1A')
+        self.dbf_file.seek(0)
+        write_header(self.dbf_file, self.fields, self.count)
+        self.dbf_file.close()
+
+
+def dbf_fields(fields):
+    """Returns (name, dbf type, length, decimals) for source fields, with the names cut to the 10
+    characters a .dbf allows and kept unique"""
+    out_fields = []
+    names = set()
+    for field in fields:
+        dbf_type, length, decimals = DBF_FIELD_TYPES[field.type]
+        if field.type == 'String':
+            length = min(max(field.length, 1), 254)
+        name = field.name[:10]
+        n = 1
+        while name.upper() in names:
+            name = f'{field.name[:10 - len(str(n)) - 1]}_{n}'
+            n += 1
+        names.add(name.upper())
+        out_fields.append((name, dbf_type, length, decimals))
+    return out_fields
+
+
+def export_rows(path, shape_type, fields, rows, domains=None, drop_fields=(), keep_temp=False, prj=None,
+                encoding='utf-8'):
+    """Writes a feature class or table to a shapefile, or a .dbf file without a shape type, in one
+    pass.  rows are (WKB geometry, value, ...) with a value for each of fields.  Fields of types a .dbf
+    can't hold, like the OID and the geometry, are skipped.  Text fields with a coded value
+    domain in domains ({domain name: {code: description}}) get their descriptions by the same rule as
+    ExportShapefiles.substitute_domain_fields, and with keep_temp their original values are kept in a
+    <field>_t field.  Those fields are widened to their longest description.  Fields whose .dbf names
+    are in drop_fields aren't written.  Returns the record count."""
+    domains = domains or {}
+    source = [(i, field) for i, field in enumerate(fields) if field.type in DBF_FIELD_TYPES]
+    kept = []
+    out_fields = []
+    for (i, field), out_field in zip(source, dbf_fields([field for i, field in source])):
+        if out_field[0] not in drop_fields:
+            kept.append((i, field))
+            out_fields.append(out_field)
+
+    # Coded value lookups by position in the record
+    lookups = []
+    for position, (i, field) in enumerate(kept):
+        if field.type == 'String' and field.domain in domains:
+            lookups.append((position, domains[field.domain]))
+    temp_fields = []
+    if keep_temp:
+        for position, lookup in lookups:
+            name, dbf_type, length, decimals = out_fields[position]
+            temp_name = name + '_t' if len(name) <= 8 else name[:8] + '_t'
+            temp_fields.append((temp_name, dbf_type, length, decimals))
+
+    # A field with a domain is widened to its longest description, so no description is cut short
+    for position, lookup in lookups:
+        name, dbf_type, length, decimals = out_fields[position]
+        longest = max([len(description.encode(encoding, 'replace')) for description in lookup.values()] + [length])
+        out_fields[position] = (name, dbf_type, min(longest, 254), decimals)
+
+    with ShapefileWriter(path, shape_type, out_fields + temp_fields, prj, encoding) as writer:
+        for row in rows:
+            record = [row[i + 1] for i, field in kept]
+            originals = []
+            for position, lookup in lookups:
+                code = record[position] if record[position] is not None else ''
+                originals.append(code)
+                record[position] = domain_description_value(code, lookup.get(code, ''))
+            if keep_temp:
+                record += originals
+            if shape_type is not None and row[0]:
+                offset, parts, outer = read_wkb(row[0])
+            else:
+                parts, outer = [], []
+            writer.write(parts, outer, record)
+        return writer.count
+
+
+if __name__ == '__main__':
+    # Writes a fixture of square polygons with a hole and a coded domain field, and reads back its headers
+    #   python shp_tools.py <fixture.shp> [rows]
+    fixture_path = sys.argv[1]
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    fixture_fields = [SourceField('OBJECTID', 'OID', 4, None), SourceField('SHAPE', 'Geometry', 0, None),
+                      SourceField('FLD_AR_ID', 'String', 25, None), SourceField('FLD_ZONE', 'String', 17, 'D_Zone'),
+                      SourceField('STATIC_BFE', 'Double', 8, None), SourceField('SHAPE_Length', 'Double', 8, None),
+                      SourceField('SHAPE_Area', 'Double', 8, None)]
+    zones = {'A': 'A', '1PCT': '1 PCT ANNUAL CHANCE FLOOD HAZARD', 'X': 'X'}
+
+    def square(x, y):
+        rings = [[(x, y), (x + 10, y), (x + 10, y + 10), (x, y + 10), (x, y)],
+                 [(x + 2, y + 2), (x + 4, y + 2), (x + 4, y + 4), (x + 2, y + 4), (x + 2, y + 2)]]
+        data = struct.pack('<BII', 1, 3, len(rings))
+        for ring in rings:
+            data += struct.pack('<I', len(ring)) + struct.pack(f'<{2 * len(ring)}d', *[v for p in ring for v in p])
+        return data
+
+    fixture_rows = [(square(n % 1000 * 20.0, n // 1000 * 20.0), n + 1, None, f'{n}', random.choice(list(zones)),
+                     100.5, 40.0, 96.0) for n in range(row_count)]
+
+    start = time.time()
+    written = export_rows(fixture_path, SHAPE_TYPES['Polygon'], fixture_fields, fixture_rows, {'D_Zone': zones},
+                          DROP_FIELDS, prj='GEOGCS["GCS_North_American_1983"]')
+    seconds = time.time() - start
+    base_path = os.path.splitext(fixture_path)[0]
+    size = sum(os.path.getsize(base_path + ext) for ext in ('.shp', '.shx', '.dbf', '.prj'))
+    print(f'{written:,} shapes written in {seconds:.3f} s ({size / seconds / 1e6:.1f} MB/s)')
+
+    with open(base_path + '.shp', 'rb') as shp:
+        header = shp.read(100)
+    print(f'.shp length matches: {struct.unpack(">i", header[24:28])[0] * 2 == os.path.getsize(base_path + ".shp")}, '
+          f'bounds: {struct.unpack("<4d", header[36:68])}')
+    print(f'.shx records: {(os.path.getsize(base_path + ".shx") - 100) // 8:,}, '
+          f'.dbf records: {read_header(base_path + ".dbf")[0]:,}, '
+          f'fields: {[field.name for field in read_header(base_path + ".dbf")[3]]}')
@@ -0,0 +1,172 @@
+"""Times the stages of the tools and writes them as JSON lines.  Has no arcpy dependency."""
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource  # Not on Windows
+except ImportError:
+    resource = None
+
+# Log the stages are appended to, in the folder each tool passes.  Every tool writes to the same
+# file so runs can be compared across tools.
+STAGE_LOG_NAME = 'stage_times.jsonl'
+
+# Environment variable that sends every tool's stages to one log instead
+STAGE_LOG_VARIABLE = 'FEMA_STAGE_LOG'
+
+
+def peak_rss():
+    """Returns the peak resident memory of this process in bytes, or None if it can't be read"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # Kilobytes on Linux
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (ImportError, AttributeError, OSError):
+        pass
+    return None
+
+
+class StageLog:
+    """Records the stages of one run of a tool.  Each stage is written as a JSON line when it ends,
+    with its wall time, CPU time, the peak memory of the process so far and the rows it processed.
+    Stages nest, and each record holds the path of the stages it ran inside.  The log file is opened
+    once per run and flushed after every line, so a crash keeps the stages that finished."""
+
+    def __init__(self, tool, folder=None, **context):
+        """Receives the tool name, the folder the log is written to and fields added to every record,
+        like the workspace.  Without a folder or FEMA_STAGE_LOG, the stages are only printed."""
+        self.tool = tool
+        self.context = context
+        self.path = os.environ.get(STAGE_LOG_VARIABLE) or (os.path.join(folder, STAGE_LOG_NAME) if folder else None)
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.stack = []  # Names of the open stages
+        self.log_file = None
+
+    def __getstate__(self):
+        # Worker processes get a log without the open file
+        state = self.__dict__.copy()
+        state['log_file'] = None
+        return state
+
+    @contextmanager
+    def stage(self, name, rows=None, **fields):
+        """Times the block as a stage.  The block can set 'rows' and other fields on the record it
+        receives."""
+        record = {'rows': rows}
+        record.update(fields)
+        self.stack.append(name)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        status = 'ok'
+        try:
+            yield record
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            stage_path = '/'.join(self.stack)
+            self.stack.pop()
+            self.write(name, stage_path, time.perf_counter() - start_wall, time.process_time() - start_cpu,
+                       status, record)
+
+    def add(self, name, wall_seconds, rows=None, **fields):
+        """Records a stage timed somewhere else, like a job in a worker process.  It's placed inside
+        the open stages."""
+        record = {'rows': rows}
+        record.update(fields)
+        self.write(name, '/'.join(self.stack + [name]), wall_seconds, None, 'ok', record)
+
+    def write(self, name, stage_path, wall_seconds, cpu_seconds, status, record):
+        """Writes the JSON line of a finished stage"""
+        rows = record.pop('rows', None)
+        line = {'run': self.run_id, 'tool': self.tool, 'stage': name, 'path': stage_path,
+                'depth': stage_path.count('/'), 'time': time.time(), 'wall_s': round(wall_seconds, 6),
+                'cpu_s': None if cpu_seconds is None else round(cpu_seconds, 6), 'peak_rss': peak_rss(),
+                'rows': rows, 'rows_per_s': round(rows / wall_seconds, 1) if rows and wall_seconds > 0 else None,
+                'status': status, 'pid': os.getpid()}
+        line.update(self.context)
+        line.update(record)
+        print(f"{'  ' * line['depth']}{name}: {wall_seconds:.2f} s" + ('' if rows is None else f', {rows} rows'))
+
+        if self.path:
+            if self.log_file is None:
+                self.log_file = open(self.path, 'a')
+            self.log_file.write(json.dumps(line, default=str) + '\n')
+            self.log_file.flush()
+
+    def close(self):
+        """Closes the log file"""
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+
+def timed(name=None, rows=None):
+    """Method decorator that times each call as a stage of the instance's stage_log.  rows is a
+    function of the instance and the return value that gives the rows processed.  Calls are not
+    timed while the instance has no stage_log, as in worker processes."""
+    def decorator(method):
+        stage_name = name or method.__name__.strip('_')
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stage_log = getattr(self, 'stage_log', None)
+            if stage_log is None:
+                return method(self, *args, **kwargs)
+            with stage_log.stage(stage_name) as record:
+                result = method(self, *args, **kwargs)
+                if rows is not None:
+                    record['rows'] = rows(self, result)
+                return result
+        return wrapper
+    return decorator
+
+
+def summarize(paths):
+    """Reads stage logs and returns (tool, stage path) -> wall seconds of each run, oldest first.  A
+    stage that ran more than once in a run, like a stage per table, is added up."""
+    runs = {}
+    for path in paths:
+        with open(path) as log_file:
+            for line in log_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                stage_runs = runs.setdefault((record['tool'], record['path']), {})
+                first_time, wall_seconds = stage_runs.get(record['run'], (record['time'], 0.0))
+                stage_runs[record['run']] = (min(first_time, record['time']), wall_seconds + record['wall_s'])
+    return dict((key, [seconds for t, seconds in sorted(stage_runs.values())]) for key, stage_runs in runs.items())
+
+
+if __name__ == '__main__':
+    # Compares the latest run of each stage against the median of the runs before it
+    #   python stage_timing.py <stage_times.jsonl> [...]
+    for (tool, stage_path), wall_times in sorted(summarize(sys.argv[1:]).items()):
+        latest = wall_times[-1]
+        if len(wall_times) > 1:
+            median = statistics.median(wall_times[:-1])
+            change = f'{latest / median - 1:+.0%}' if median else ''
+            print(f'{tool} {stage_path}: latest {latest:.2f} s, median {median:.2f} s over {len(wall_times) - 1} '
+                  f'runs {change}')
+        else:
+            print(f'{tool} {stage_path}: {latest:.2f} s')
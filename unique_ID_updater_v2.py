@@ -2,12 +2,46 @@
 import arcpy
 import os
 import sys
+import time
+from arc_workers import worker_pool
+from stage_timing import StageLog, timed
+
+# Primary ID fields that other tables refer to, and the (table, field) pairs that refer to them.  These
+# fields are in the IDUpdater skip list and are only renumbered by IDRemapper.
+ID_REFERENCES = {
+    ('L_Comm_Info', 'COM_NFO_ID'): [('S_Pol_Ar', 'COM_NFO_ID'), ('L_Comm_Revis', 'COM_NFO_ID'),
+                                    ('L_Meetings', 'COM_NFO_ID'), ('L_Pol_FHBM', 'COM_NFO_ID')],
+    ('L_Cst_Model', 'CST_MDL_ID'): [('S_Cst_Gage', 'CST_MDL_ID'), ('S_Cst_Tsct_Ln', 'CST_MDL_ID'),
+                                    ('S_Submittal_Info', 'CST_MDL_ID'), ('S_Tsct_Basln', 'CST_MDL_ID')],
+    ('L_Meetings', 'MTG_ID'): [('L_Mtg_POC', 'MTG_ID')],
+    ('S_Cst_Tsct_Ln', 'TRAN_LN_ID'): [('L_Cst_Tsct_Elev', 'TRAN_LN_ID')],
+    ('S_Gen_Struct', 'STRUCT_ID'): [('L_Cst_Struct', 'STRUCT_ID')],
+    ('S_Nodes', 'NODE_ID'): [('S_Hydro_Reach', 'UP_NODE'), ('S_Hydro_Reach', 'DN_NODE'), ('S_Subbasins', 'NODE_ID'),
+                             ('L_Summary_Discharges', 'NODE_ID'), ('L_Summary_Elevations', 'NODE_ID')],
+    ('S_Stn_Start', 'START_ID'): [('S_Profil_Basln', 'START_ID'), ('S_Riv_Mrk', 'START_ID'), ('S_XS', 'START_ID')],
+    ('S_Tsct_Basln', 'TBASELN_ID'): [('S_Cst_Tsct_Ln', 'TBASELN_ID')],
+    ('S_XS', 'XS_LN_ID'): [('L_XS_Elev', 'XS_LN_ID'), ('L_XS_Struct', 'XS_LN_ID')],
+}
+
+
+def renumber_workspace_tables(tables, incremental=False):
+    """Renumbers the tables of one workspace in turn.  Run in a worker process."""
+    IDUpdater(tables, incremental).run_id_updater()
+    return tables
 
 
 class IDUpdater:
-    def __init__(self, tables):
+    def __init__(self, tables, incremental=False, workers=1, stage_log=None):
         """Constructor for the class"""
         self.tables = tables
+        self.incremental = incremental  # Only write the IDs that change
+        self.workers = workers  # Number of worker processes
+        self.stage_log = stage_log or StageLog('IDUpdater')  # Stage times, only printed without a log
+
+        # List of fields with 'ID' in their name that should be skipped
+        self.skip_fields = ['COM_NFO_ID', 'CST_MDL_ID', 'DFIRM_ID', 'FC_SEG_ID', 'FC_SYS_ID', 'GAGE_OWNID',
+                            'MODEL_ID', 'MTG_ID', 'NODE_ID', 'START_ID', 'STRUCT_ID', 'SURVSTR_ID', 'TBASELN_ID',
+                            'TRAN_LN_ID', 'VERSION_ID', 'XS_LN_ID']
 
     def get_paths(self):
 
@@ -22,6 +56,7 @@ class IDUpdater:
                     arcpy.AddMessage(f'Table, {table}:\n   {new_path}')
         self.tables = table_pathlist
 
+    @timed()
     def update_unique_id(self):
         # Start an edit session
         for table in self.tables:
@@ -29,17 +64,12 @@ class IDUpdater:
             # Get a list of fields that have a type of 'DOUBLE'
             field_list = arcpy.ListFields(table.replace("'", ""), field_type='String')
 
-            # List of fields with 'ID' in their name that should be skipped
-            skip_fields = ['COM_NFO_ID', 'CST_MDL_ID', 'DFIRM_ID', 'FC_SEG_ID', 'FC_SYS_ID', 'GAGE_OWNID', 'MODEL_ID',
-                           'MTG_ID', 'NODE_ID', 'START_ID', 'STRUCT_ID', 'SURVSTR_ID', 'TBASELN_ID', 'TRAN_LN_ID',
-                           'VERSION_ID', 'XS_LN_ID']
-
             record_num = 1  # Record number
 
             # Iterate through the list of fields
             for field in field_list:
                 field_name = str(field.name).upper()
-                if field_name.endswith("_ID") and field_name not in skip_fields:
+                if field_name.endswith("_ID") and field_name not in self.skip_fields:
                     arcpy.AddMessage('\t' + field.name)
 
                     # Create an UpdateCursor
@@ -54,20 +84,256 @@ class IDUpdater:
                     del cursor
                     del row
 
+    def id_fields(self, table):
+        """Returns the names of the unique ID fields of a table"""
+        return [field.name for field in arcpy.ListFields(table, field_type='String')
+                if str(field.name).upper().endswith("_ID") and str(field.name).upper() not in self.skip_fields]
+
+    @timed()
+    def update_unique_id_incremental(self):
+        """Numbers each ID field of a table from 1 in a single cursor pass.  Rows whose IDs already
+        match the sequence aren't written, so re-running on a numbered table only reads it."""
+        for table in self.tables:
+            table_path = str(table).replace("'", "")
+            id_fields = self.id_fields(table_path)
+            if not id_fields:
+                continue
+            arcpy.AddMessage('\t' + ', '.join(id_fields))
+
+            rows_read = 0
+            rows_written = 0
+            with self.stage_log.stage('table', table=table_path) as record:
+                with arcpy.da.UpdateCursor(table_path, id_fields) as cursor:
+                    for row in cursor:
+                        rows_read += 1
+                        target_id = str(rows_read)
+                        if any(value != target_id for value in row):
+                            cursor.updateRow([target_id] * len(id_fields))
+                            rows_written += 1
+                record['rows'] = rows_read
+                record['updates'] = rows_written
+
+            arcpy.AddMessage(f'\t{rows_written} of {rows_read} rows renumbered')
+
+    @staticmethod
+    def table_workspace(table):
+        """Returns the geodatabase of a table, or the folder of a shapefile or .dbf table"""
+        path = os.path.normpath(str(table).replace("'", ""))
+        parts = path.split(os.sep)
+        for i, part in enumerate(parts):
+            if os.path.splitext(part)[1].lower() in ('.gdb', '.mdb', '.sde'):
+                return os.sep.join(parts[:i + 1])
+        return os.path.dirname(path)
+
+    def workspace_groups(self):
+        """Groups the tables by workspace, keeping their order within each workspace"""
+        groups = {}
+        for table in self.tables:
+            groups.setdefault(self.table_workspace(table), []).append(table)
+        return groups
+
+    @timed()
+    def run_parallel(self):
+        """Renumbers the workspaces concurrently.  The tables of a workspace are renumbered in turn
+        by one worker, so there is only one writer per geodatabase.  The numbering of each table
+        doesn't depend on any other table, so the IDs are the same as a serial run."""
+        groups = self.workspace_groups()
+        workers = min(self.workers, len(groups))
+        arcpy.AddMessage(f'Renumbering {len(self.tables)} tables in {len(groups)} workspaces with {workers} workers')
+
+        with worker_pool(workers) as executor:
+            futures = [executor.submit(renumber_workspace_tables, tables, self.incremental)
+                       for workspace, tables in sorted(groups.items())]
+            for future in futures:
+                for table in future.result():
+                    arcpy.AddMessage(f'\t{table}')
+
+    @timed(rows=lambda self, result: len(self.tables))
     def run_id_updater(self):
 
-        self.update_unique_id()
+        if self.workers > 1 and len(self.workspace_groups()) > 1:
+            self.run_parallel()
+        elif self.incremental:
+            self.update_unique_id_incremental()
+        else:
+            self.update_unique_id()
+
+
+class IDRemapper:
+    """Renumbers the primary ID fields in ID_REFERENCES and carries the new IDs into every table that
+    refers to them.  Each table is updated in one pass that renumbers its primary IDs, building their
+    old -> new mappings, and rewrites its references with dictionary lookups.  The tables are updated
+    after the primary tables they refer to, so the whole database costs one pass per table."""
+
+    def __init__(self, workspace, stage_log=None):
+        """Constructor.  Expects a geodatabase or a folder of shapefiles."""
+        self.workspace = workspace
+        self.stage_log = stage_log  # Stage times, not recorded without a log
+        self.tables = self.find_tables(workspace)  # Table name -> path
+        self.id_maps = {}  # (primary table, field) -> {old ID: new ID}
+
+    @staticmethod
+    def find_tables(workspace):
+        """Returns the paths of the tables in the workspace, keyed by table name"""
+        arcpy.env.workspace = workspace
+        names = []
+        for dataset in arcpy.ListDatasets("*", "Feature") or []:
+            names += [os.path.join(dataset, fc) for fc in arcpy.ListFeatureClasses("*", "ALL", dataset)]
+        names += arcpy.ListFeatureClasses() or []
+        names += arcpy.ListTables() or []
+        return dict((os.path.splitext(os.path.basename(name))[0].upper(), os.path.join(workspace, name))
+                    for name in names)
+
+    def table_path(self, table_name):
+        return self.tables.get(table_name.upper())
+
+    def has_field(self, table_name, field_name):
+        """Whether the table is in the workspace and has the field"""
+        table = self.table_path(table_name)
+        return bool(table) and field_name.upper() in [field.name.upper() for field in arcpy.ListFields(table)]
+
+    @timed()
+    def remap_table(self, table_name, id_fields, references):
+        """Numbers the primary ID fields of a table from 1 and replaces the old IDs in its referring fields
+        with the new IDs, in one pass.  Receives the primary ID fields and a list of (field, old -> new
+        mapping).  Only the rows that change are written, and referring IDs without a match are left as
+        they are.  Returns the old -> new mapping of each primary ID field."""
+        ref_fields = [field for field, id_map in references]
+        ref_maps = [id_map for field, id_map in references]
+        new_maps = dict((field, {}) for field in id_fields)
+        duplicates = dict((field, 0) for field in id_fields)
+        renumbered = dict((field, 0) for field in id_fields)
+        rows_written = 0
+        unmatched = 0
+        with arcpy.da.UpdateCursor(self.table_path(table_name), list(id_fields) + ref_fields) as cursor:
+            for record_num, row in enumerate(cursor, 1):
+                new_id = str(record_num)
+                new_row = []
+                for field, value in zip(id_fields, row):
+                    if value in new_maps[field]:
+                        duplicates[field] += 1  # The first row keeps the references
+                    else:
+                        new_maps[field][value] = new_id
+                    if value != new_id:
+                        renumbered[field] += 1
+                    new_row.append(new_id)
+                for value, id_map in zip(row[len(id_fields):], ref_maps):
+                    if value in id_map:
+                        new_row.append(id_map[value])
+                    else:
+                        new_row.append(value)
+                        if value not in (None, '', ' '):
+                            unmatched += 1
+                if new_row != list(row):
+                    cursor.updateRow(new_row)
+                    rows_written += 1
+
+        for field in id_fields:
+            arcpy.AddMessage(f'\t{table_name}.{field}: {renumbered[field]} rows renumbered')
+            if duplicates[field]:
+                arcpy.AddWarning(f'\t{table_name}.{field} has {duplicates[field]} duplicate IDs.  '
+                                 f'References to them point at the first row.')
+        if ref_fields:
+            arcpy.AddMessage(f'\t{table_name} ({", ".join(ref_fields)}): {rows_written} rows updated')
+        if unmatched:
+            arcpy.AddWarning(f'\t{table_name} has {unmatched} IDs without a matching primary ID')
+        return new_maps
+
+    @timed()
+    def run_remap(self):
+        # Group the primary ID fields and the referring fields by table so each table is updated in a
+        # single pass
+        id_fields = {}
+        referring_fields = {}
+        for (table_name, id_field), referring in sorted(ID_REFERENCES.items()):
+            if not self.has_field(table_name, id_field):
+                continue
+            id_fields.setdefault(table_name, []).append(id_field)
+            for referring_table, referring_field in referring:
+                if self.has_field(referring_table, referring_field):
+                    referring_fields.setdefault(referring_table, []).append(
+                        (referring_field, (table_name, id_field)))
+
+        # A table is updated once the primary tables it refers to are renumbered, so a table that is
+        # both a primary table and a referring table gets their mappings in its own pass
+        pending = sorted(set(id_fields) | set(referring_fields))
+        while pending:
+            ready = [table_name for table_name in pending
+                     if all(primary_key in self.id_maps
+                            for field, primary_key in referring_fields.get(table_name, []))]
+            if not ready:
+                raise ValueError(f'ID_REFERENCES refers in a cycle between {", ".join(pending)}')
+            for table_name in ready:
+                references = [(field, self.id_maps[primary_key])
+                              for field, primary_key in referring_fields.get(table_name, [])]
+                new_maps = self.remap_table(table_name, id_fields.get(table_name, []), references)
+                for id_field, id_map in new_maps.items():
+                    self.id_maps[(table_name, id_field)] = id_map
+                pending.remove(table_name)
+
+
+def benchmark(folder, table_count=50, workspace_count=5, row_count=5000, workers=4):
+    """Renumbers synthetic tables serially and in parallel, checks the IDs match and reports the
+    wall time of each run"""
+    def create_tables(prefix):
+        tables = []
+        for w in range(workspace_count):
+            gdb = arcpy.management.CreateFileGDB(folder, f'{prefix}_{w}.gdb')[0]
+            for t in range(w, table_count, workspace_count):
+                table = arcpy.management.CreateTable(gdb, f'L_Bench_{t}')[0]
+                for field_name in ('BENCH_ID', 'ALT_ID', 'MODEL_ID'):
+                    arcpy.management.AddField(table, field_name, 'TEXT', field_length=25)
+                with arcpy.da.InsertCursor(table, ['BENCH_ID', 'ALT_ID', 'MODEL_ID']) as cursor:
+                    for n in range(row_count):
+                        cursor.insertRow(['X', 'X', 'X'])
+                tables.append(table)
+        return sorted(tables)
+
+    def read_ids(tables):
+        return [[row for row in arcpy.da.SearchCursor(table, ['BENCH_ID', 'ALT_ID', 'MODEL_ID'])]
+                for table in tables]
+
+    serial_tables = create_tables('serial')
+    start = time.time()
+    IDUpdater(serial_tables, True).run_id_updater()
+    serial_seconds = time.time() - start
+
+    parallel_tables = create_tables('parallel')
+    start = time.time()
+    IDUpdater(parallel_tables, True, workers).run_id_updater()
+    parallel_seconds = time.time() - start
+
+    same_ids = read_ids(serial_tables) == read_ids(parallel_tables)
+    print(f'{table_count} tables x {row_count} rows in {workspace_count} geodatabases')
+    print(f'Serial: {serial_seconds:.2f} s, {workers} workers: {parallel_seconds:.2f} s, same IDs: {same_ids}')
 
 
 if __name__ == '__main__':
+    # Benchmark of 50 synthetic tables, written to an empty folder:
+    #   python unique_ID_updater_v2.py --benchmark <folder>
+    if len(sys.argv) > 2 and sys.argv[1] == '--benchmark':
+        benchmark(sys.argv[2])
+        sys.exit(0)
+
     try:
         # Values for sys.argv that come from ArcToolbox are a single string with the input values separated
         # by a semicolon.  Therefore, they need to be split out to a list.  If the input value is empty, ArcToolbox uses
         # a '#', so skip the code if the value is empty (a #)
         if sys.argv[1] and sys.argv[1] != '#':
             table_list = sorted(sys.argv[1].split(";"))
-            id_update = IDUpdater(table_list)
+            incremental_update = len(sys.argv) > 2 and sys.argv[2] in ['true', 'True']
+            worker_count = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else 1
+            log_folder = os.path.dirname(IDUpdater.table_workspace(table_list[0]))
+            id_update = IDUpdater(table_list, incremental_update, worker_count,
+                                  StageLog('IDUpdater', log_folder, workers=worker_count))
             id_update.run_id_updater()
+            id_update.stage_log.close()
+
+        # Renumber the cross-referenced IDs of a whole database and carry them into the referring tables
+        if len(sys.argv) > 4 and sys.argv[4] not in ['', '#']:
+            remap_log = StageLog('IDRemapper', os.path.dirname(os.path.normpath(sys.argv[4])), workspace=sys.argv[4])
+            IDRemapper(sys.argv[4], remap_log).run_remap()
+            remap_log.close()
 
     except arcpy.ExecuteError:
         arcpy.AddError(arcpy.GetMessages(2))